@@ -0,0 +1,180 @@
+import sqlite3
+import threading
+
+ADATBAZIS_KORNYEZETI_VALTOZO = "LASER_MAZE_ADATBAZIS"   # Ha meg van adva, a profilok ebben az SQLite fájlban vannak
+
+_SEMA = """
+CREATE TABLE IF NOT EXISTS profilok (
+    gamertag TEXT PRIMARY KEY,
+    osszpontszam INTEGER NOT NULL,
+    teljesitett INTEGER NOT NULL,
+    osszido INTEGER NOT NULL,
+    dicsosegpont INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS profilok_rangsor ON profilok (dicsosegpont DESC, gamertag);
+CREATE TABLE IF NOT EXISTS eredmenyek (
+    gamertag TEXT NOT NULL REFERENCES profilok (gamertag) ON DELETE CASCADE,
+    palya_id INTEGER NOT NULL,
+    nehezseg INTEGER NOT NULL,
+    ido INTEGER NOT NULL,
+    PRIMARY KEY (gamertag, palya_id)
+) WITHOUT ROWID;
+"""
+
+
+class ProfilAdatbazis:
+    """
+    A profilok és a pályánkénti legjobb idők SQLite adatbázisban, a profilok mappája helyett. A gamertag
+    szerinti keresés és a dicsőségpontok szerinti rangsor indexelt, így egyik sem jár fájlok bejárásával.
+    A pályák (pálya azonosító, nehézségi sorszám, idő) hármasokként szerepelnek, mint a profilfajl modulban.
+    A kapcsolatot több szál is használhatja (például a háttérben mentő hatteriro.HatterIro); a műveletek
+    egymás után, zárral védve futnak.
+
+    :ivar fajlnev: Az adatbázis fájl neve.
+    """
+
+    def __init__(self, fajlnev: str) -> None:
+
+        self.fajlnev = fajlnev
+        self._kapcsolat = sqlite3.connect(fajlnev, check_same_thread=False)
+        self._zar = threading.RLock()
+        self._kapcsolat.execute("PRAGMA foreign_keys = ON")
+        self._kapcsolat.executescript(_SEMA)
+
+
+    def __enter__(self) -> "ProfilAdatbazis":
+        return self
+
+
+    def __exit__(self, *kivetel) -> None:
+        self.bezaras()
+
+
+    def __len__(self) -> int:
+        with self._zar:
+            return self._kapcsolat.execute("SELECT COUNT(*) FROM profilok").fetchone()[0]
+
+
+    def letezik(self, gamertag: str) -> bool:
+        """
+        :param gamertag: A játékos felhasználóneve.
+        :type gamertag: str
+        :return: Igaz, ha van ilyen profil.
+        :rtype: bool
+        """
+        with self._zar:
+            return self._kapcsolat.execute("SELECT 1 FROM profilok WHERE gamertag = ?", (gamertag,)).fetchone() is not None
+
+
+    def gamertagek(self) -> list:
+        """
+        :return: Az összes profil gamertagje ábécésorrendben.
+        :rtype: list[str]
+        """
+        with self._zar:
+            return [sor[0] for sor in self._kapcsolat.execute("SELECT gamertag FROM profilok ORDER BY gamertag")]
+
+
+    def mentes(self, gamertag: str, palyak: list, osszpontszam: int, osszido: int, dicsosegpont: int) -> None:
+        """
+        Elmenti (vagy lecseréli) a profilt egyetlen tranzakcióban.
+
+        :param gamertag: A játékos felhasználóneve.
+        :param palyak: A teljesített pályák (pálya azonosító, nehézségi sorszám, idő) hármasai.
+        :param osszpontszam: A játékos összpontszáma.
+        :param osszido: A játékban eltöltött összes idő másodpercben.
+        :param dicsosegpont: A játékos dicsőségpontjai (a rangsorhoz).
+        :type gamertag: str
+        :type palyak: list[tuple[int, int, int]]
+        :type osszpontszam: int
+        :type osszido: int
+        :type dicsosegpont: int
+        """
+        with self._zar, self._kapcsolat:
+            self._profil_iras(gamertag, palyak, osszpontszam, osszido, dicsosegpont)
+
+
+    def atvetel(self, profilok) -> int:
+        """
+        Egy üres adatbázisba egyetlen tranzakcióban átveszi a profilokat: egy megszakadt átvétel nem hagy
+        félig feltöltött adatbázist. Ha közben egy másik kapcsolat már feltöltötte, nem ír semmit.
+
+        :param profilok: Profilonként a mentes paraméterei (gamertag, pályák, összpontszám, összidő, dicsőségpont).
+        :type profilok: Iterable[tuple]
+        :return: Az átvett profilok száma.
+        :rtype: int
+        """
+        with self._zar:
+            self._kapcsolat.execute("BEGIN IMMEDIATE")  # Az üresség ellenőrzése és az írás egy tranzakció
+            try:
+                if self._kapcsolat.execute("SELECT 1 FROM profilok LIMIT 1").fetchone() is not None:
+                    self._kapcsolat.rollback()
+                    return 0
+                atvett = 0
+                for profil in profilok:
+                    self._profil_iras(*profil)
+                    atvett += 1
+                self._kapcsolat.commit()
+            except BaseException:
+                self._kapcsolat.rollback()
+                raise
+
+        return atvett
+
+
+    def _profil_iras(self, gamertag: str, palyak: list, osszpontszam: int, osszido: int, dicsosegpont: int) -> None:
+        """
+        A mentes és az atvetel közös része; a tranzakciót a hívó kezeli.
+        """
+        self._kapcsolat.execute(
+            "INSERT INTO profilok (gamertag, osszpontszam, teljesitett, osszido, dicsosegpont) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT (gamertag) DO UPDATE SET osszpontszam = excluded.osszpontszam, "
+            "teljesitett = excluded.teljesitett, osszido = excluded.osszido, dicsosegpont = excluded.dicsosegpont",
+            (gamertag, osszpontszam, len(palyak), osszido, dicsosegpont))
+        self._kapcsolat.executemany(
+            "INSERT INTO eredmenyek (gamertag, palya_id, nehezseg, ido) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT (gamertag, palya_id) DO UPDATE SET nehezseg = excluded.nehezseg, ido = excluded.ido",
+            ((gamertag, palya_id, nehezseg, ido) for palya_id, nehezseg, ido in palyak))
+
+
+    def betoltes(self, gamertag: str) -> tuple or None:
+        """
+        :param gamertag: A játékos felhasználóneve.
+        :type gamertag: str
+        :return: A gamertag, a teljesített pályák (pálya azonosító, nehézségi sorszám, idő) hármasai,
+                 az összpontszám és az összidő, vagy None, ha nincs ilyen profil.
+        :rtype: tuple or None
+        """
+        with self._zar:
+            sor = self._kapcsolat.execute("SELECT osszpontszam, osszido FROM profilok WHERE gamertag = ?", (gamertag,)).fetchone()
+            if sor is None:
+                return None
+            palyak = self._kapcsolat.execute(
+                "SELECT palya_id, nehezseg, ido FROM eredmenyek WHERE gamertag = ? ORDER BY palya_id", (gamertag,)).fetchall()
+
+        return gamertag, palyak, sor[0], sor[1]
+
+
+    def rangsor(self, darab: int = -1, eltolas: int = 0) -> list:
+        """
+        A profilok dicsőségpontok szerint csökkenő, egyenlőség esetén gamertag szerinti sorrendben.
+
+        :param darab: Legfeljebb ennyi profilt ad vissza (-1: mindet).
+        :param eltolas: Ennyi profilt átugrik a rangsor elejéről.
+        :type darab: int
+        :type eltolas: int
+        :return: Profilonként a gamertag, az összpontszám, a teljesített pályák száma és az összidő.
+        :rtype: list[tuple[str, int, int, int]]
+        """
+        with self._zar:
+            return self._kapcsolat.execute(
+                "SELECT gamertag, osszpontszam, teljesitett, osszido FROM profilok "
+                "ORDER BY dicsosegpont DESC, gamertag LIMIT ? OFFSET ?", (darab, eltolas)).fetchall()
+
+
+    def bezaras(self) -> None:
+        """
+        Lezárja az adatbázis kapcsolatot.
+        """
+        with self._zar:
+            self._kapcsolat.close()
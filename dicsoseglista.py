@@ -0,0 +1,831 @@
+import mmap
+import os
+import random
+import struct
+import uuid
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:   # Windows
+    fcntl = None
+    import msvcrt
+
+import logika
+
+# Naplófájl: fejléc (azonosító, verzió, nemzedék), majd bejegyzésenként (gamertag hossza, összpontszám,
+# teljesített pályák száma, összidő) és a gamertag UTF-8 bájtjai. Egy gamertag utolsó bejegyzése az érvényes.
+# A nemzedék minden új (tömörített) naplónál új véletlen szám: ez azonosítja a fájlt a követők számára,
+# mert a lecserélt napló inode-ját a fájlrendszer újra kiadhatja.
+NAPLO_AZONOSITO = b"LMDN"
+NAPLO_VERZIO = 2
+_FEJLEC = struct.Struct("<4sHQ")
+_BEJEGYZES = struct.Struct("<HIIQ")
+
+DICSOSEGLISTA_NAPLO = "dicsoseglista.naplo"
+MAX_SZINT = 32
+
+# Rangsorfájl: fejléc (azonosító, verzió, játékosok száma, a napló nemzedéke és hossza, amelyből készült), majd
+# helyezés szerint rendezve játékosonként egy rögzített hosszú (dicsőségpont, összpontszám, teljesített pályák
+# száma, összidő, gamertag) bejegyzés. A gamertag UTF-8 bájtjai nullákkal kiegészítve, legfeljebb
+# GAMERTAG_HOSSZ bájton (a hosszabb csonkolva).
+RANGSOR_AZONOSITO = b"LMRS"
+RANGSOR_VERZIO = 2
+GAMERTAG_HOSSZ = 48
+_RANGSOR_FEJLEC = struct.Struct("<4sHIQQ")
+_RANGSOR_BEJEGYZES = struct.Struct(f"<qIIQ{GAMERTAG_HOSSZ}s")
+
+RANGSOR_FAJL = "dicsoseglista.bin"
+
+# Fájlnév -> ((inode, módosítási idő), megnyitott rangsor)
+_megnyitott_rangsorok = {}
+
+
+class _Csucs:
+    """
+    A skip lista egy csúcsa; a kulcs (-dicsőségpont, gamertag), így a növekvő sorrend a rangsor.
+    A szélességek szintenként megadják, hány helyezést ugrik át a következő csúcsra mutató hivatkozás
+    (a lista végére mutatóé: a csúcs utáni elemek száma + 1); ebből számolható a helyezés.
+    """
+
+    __slots__ = ("kulcs", "kovetkezok", "szelessegek")
+
+    def __init__(self, kulcs: tuple, szint: int) -> None:
+
+        self.kulcs = kulcs
+        self.kovetkezok = [None] * szint
+        self.szelessegek = [1] * szint
+
+
+class Dicsoseglista:
+    """
+    A játékosok dicsőségpont szerinti rangsora indexelhető skip listában: egy játékos eredményének
+    változása O(log n) idő alatt kerül a helyére, a teljes lista újrarendezése nélkül, és egy játékos
+    helyezése, illetve egy adott helyezéstől kezdődő részlet is O(log n) idő alatt kérdezhető le.
+    Egyenlő pontszám esetén a gamertag (ábécésorrend) dönt. A változásokat egy hozzáfűzéssel bővülő
+    naplófájlba írja, amelyből a lista (akár egy másik folyamatban is) visszaállítható.
+
+    :ivar bejegyzesek: Gamertag -> (összpontszám, teljesített pályák száma, összidő).
+    :ivar naplo_fajl: A naplófájl neve, vagy None, ha a lista csak a memóriában él.
+    """
+
+    def __init__(self, naplo_fajl: str = None) -> None:
+
+        self.bejegyzesek = {}
+        self.naplo_fajl = naplo_fajl
+        self._fej = _Csucs(None, MAX_SZINT)
+        self._szint = 1
+        self._veletlen = random.Random()
+        self._naplo_allapot = None   # (nemzedék, beolvasott hossz) a naplófájlról
+        self._naplo_bejegyzesek = 0
+
+
+    def __len__(self) -> int:
+        return len(self.bejegyzesek)
+
+
+    def __contains__(self, gamertag: str) -> bool:
+        return gamertag in self.bejegyzesek
+
+
+    def __iter__(self):
+        """
+        :return: A játékosok rangsor szerint: gamertag, összpontszám, teljesített pályák száma és összidő.
+        :rtype: Iterator[tuple[str, int, int, int]]
+        """
+        csucs = self._fej.kovetkezok[0]
+        while csucs is not None:
+            gamertag = csucs.kulcs[1]
+            yield (gamertag, *self.bejegyzesek[gamertag])
+            csucs = csucs.kovetkezok[0]
+
+
+    @staticmethod
+    def _kulcs(gamertag: str, osszpontszam: int, teljesitett: int, osszido: int) -> tuple:
+        return -logika.dicsosegpontok(osszpontszam, teljesitett, osszido), gamertag
+
+
+    def _elodok(self, kulcs: tuple) -> tuple:
+        """
+        :param kulcs: A keresett kulcs.
+        :type kulcs: tuple
+        :return: Szintenként a kulcs előtti utolsó csúcs és annak helyezése (a lista fejéé 0).
+        :rtype: tuple[list[_Csucs], list[int]]
+        """
+        elodok = [self._fej] * MAX_SZINT
+        helyezesek = [0] * MAX_SZINT
+        csucs = self._fej
+        helyezes = 0
+        for szint in range(self._szint - 1, -1, -1):
+            kovetkezo = csucs.kovetkezok[szint]
+            while kovetkezo is not None and kovetkezo.kulcs < kulcs:
+                helyezes += csucs.szelessegek[szint]
+                csucs = kovetkezo
+                kovetkezo = csucs.kovetkezok[szint]
+            elodok[szint] = csucs
+            helyezesek[szint] = helyezes
+
+        return elodok, helyezesek
+
+
+    def _beszuras(self, kulcs: tuple) -> None:
+        elodok, helyezesek = self._elodok(kulcs)
+        szint = 1
+        while szint < MAX_SZINT and self._veletlen.random() < 0.25:
+            szint += 1
+        self._szint = max(self._szint, szint)
+
+        csucs = _Csucs(kulcs, szint)
+        for i in range(szint):
+            tavolsag = helyezesek[0] - helyezesek[i]
+            csucs.kovetkezok[i] = elodok[i].kovetkezok[i]
+            csucs.szelessegek[i] = elodok[i].szelessegek[i] - tavolsag
+            elodok[i].kovetkezok[i] = csucs
+            elodok[i].szelessegek[i] = tavolsag + 1
+        for i in range(szint, MAX_SZINT):
+            elodok[i].szelessegek[i] += 1
+
+
+    def _kivetel(self, kulcs: tuple) -> None:
+        elodok, _ = self._elodok(kulcs)
+        csucs = elodok[0].kovetkezok[0]
+        for i in range(len(csucs.kovetkezok)):
+            elodok[i].kovetkezok[i] = csucs.kovetkezok[i]
+            elodok[i].szelessegek[i] += csucs.szelessegek[i] - 1
+        for i in range(len(csucs.kovetkezok), MAX_SZINT):
+            elodok[i].szelessegek[i] -= 1
+        while self._szint > 1 and self._fej.kovetkezok[self._szint - 1] is None:
+            self._szint -= 1
+
+
+    def _helyezesen(self, helyezes: int) -> _Csucs or None:
+        """
+        :param helyezes: A keresett helyezés (1-től).
+        :type helyezes: int
+        :return: Az adott helyezésű csúcs, vagy None, ha nincs ilyen helyezés.
+        :rtype: _Csucs or None
+        """
+        if not 1 <= helyezes <= len(self.bejegyzesek):
+            return None
+
+        csucs = self._fej
+        pozicio = 0
+        for szint in range(self._szint - 1, -1, -1):
+            while csucs.kovetkezok[szint] is not None and pozicio + csucs.szelessegek[szint] <= helyezes:
+                pozicio += csucs.szelessegek[szint]
+                csucs = csucs.kovetkezok[szint]
+
+        return csucs
+
+
+    def helyezes(self, gamertag: str) -> int or None:
+        """
+        :param gamertag: A játékos felhasználóneve.
+        :type gamertag: str
+        :return: A játékos helyezése (1-től), vagy None, ha nincs a listán.
+        :rtype: int or None
+        """
+        adatok = self.bejegyzesek.get(gamertag)
+        if adatok is None:
+            return None
+
+        _, helyezesek = self._elodok(self._kulcs(gamertag, *adatok))
+
+        return helyezesek[0] + 1
+
+
+    def reszlet(self, kezdet: int, darab: int) -> list:
+        """
+        A rangsor egy részlete, a kezdő helyezés megkeresése után a szomszédos csúcsokon végighaladva.
+
+        :param kezdet: Az első visszaadott helyezés (1-től).
+        :param darab: Legfeljebb ennyi játékost ad vissza.
+        :type kezdet: int
+        :type darab: int
+        :return: Játékosonként a helyezés, a gamertag, az összpontszám, a teljesített pályák száma és az összidő.
+        :rtype: list[tuple[int, str, int, int, int]]
+        """
+        eredmeny = []
+        kezdet = max(kezdet, 1)
+        csucs = self._helyezesen(kezdet)
+        while csucs is not None and len(eredmeny) < darab:
+            gamertag = csucs.kulcs[1]
+            eredmeny.append((kezdet + len(eredmeny), gamertag, *self.bejegyzesek[gamertag]))
+            csucs = csucs.kovetkezok[0]
+
+        return eredmeny
+
+
+    def elso(self, darab: int) -> list:
+        """
+        :param darab: A visszaadott játékosok száma.
+        :type darab: int
+        :return: A rangsor első játékosai (lásd reszlet).
+        :rtype: list[tuple[int, str, int, int, int]]
+        """
+        return self.reszlet(1, darab)
+
+
+    def oldal(self, sorszam: int, meret: int) -> list:
+        """
+        :param sorszam: Az oldal sorszáma (1-től).
+        :param meret: Az oldalankénti játékosok száma.
+        :type sorszam: int
+        :type meret: int
+        :return: A rangsor adott oldala (lásd reszlet).
+        :rtype: list[tuple[int, str, int, int, int]]
+        """
+        return self.reszlet((sorszam - 1) * meret + 1, meret)
+
+
+    def kornyezet(self, gamertag: str, sugar: int = 2) -> list:
+        """
+        :param gamertag: A játékos felhasználóneve.
+        :param sugar: Ennyi játékost ad vissza a játékos előtt és után.
+        :type gamertag: str
+        :type sugar: int
+        :return: A rangsor játékos körüli részlete (lásd reszlet), vagy üres lista, ha a játékos nincs a listán.
+        :rtype: list[tuple[int, str, int, int, int]]
+        """
+        helyezes = self.helyezes(gamertag)
+        if helyezes is None:
+            return []
+
+        kezdet = max(helyezes - sugar, 1)
+
+        return self.reszlet(kezdet, helyezes + sugar - kezdet + 1)
+
+
+    def _alkalmazas(self, gamertag: str, osszpontszam: int, teljesitett: int, osszido: int) -> bool:
+        """
+        :return: Igaz, ha a játékos adatai megváltoztak.
+        :rtype: bool
+        """
+        regi = self.bejegyzesek.get(gamertag)
+        uj = (osszpontszam, teljesitett, osszido)
+        if regi == uj:
+            return False
+        if regi is not None:
+            self._kivetel(self._kulcs(gamertag, *regi))
+        self.bejegyzesek[gamertag] = uj
+        self._beszuras(self._kulcs(gamertag, *uj))
+
+        return True
+
+
+    def frissites(self, gamertag: str, osszpontszam: int, teljesitett: int, osszido: int) -> bool:
+        """
+        Beírja (vagy frissíti) egy játékos eredményét a rangsorba és a naplóba.
+
+        :param gamertag: A játékos felhasználóneve.
+        :param osszpontszam: A játékos összpontszáma.
+        :param teljesitett: A teljesített pályák száma.
+        :param osszido: A játékban eltöltött összes idő másodpercben.
+        :type gamertag: str
+        :type osszpontszam: int
+        :type teljesitett: int
+        :type osszido: int
+        :return: Igaz, ha a rangsor megváltozott.
+        :rtype: bool
+        """
+        if self.naplo_fajl is None:
+            return self._alkalmazas(gamertag, osszpontszam, teljesitett, osszido)
+
+        # A zár alatt más folyamat nem írhat a naplóba: amit a követés beolvasott, az a napló vége,
+        # így a hozzáfűzés utáni hossz nem ugorhat át más folyamat bejegyzését.
+        with _naplo_zar(self.naplo_fajl):
+            self.naplo_kovetes()
+            if not self._alkalmazas(gamertag, osszpontszam, teljesitett, osszido):
+                return False
+
+            if self._naplo_allapot is None or not os.path.exists(self.naplo_fajl):
+                self._tomorites()   # Még nincs (ép fejlécű) napló: a teljes listával hozzuk létre
+                return True
+
+            with open(self.naplo_fajl, 'ab') as f:
+                f.write(_naplo_bejegyzes(gamertag, osszpontszam, teljesitett, osszido))
+                hossz = f.tell()
+            self._naplo_allapot = (self._naplo_allapot[0], hossz)
+            self._naplo_bejegyzesek += 1
+            if self._naplo_bejegyzesek > 2 * len(self.bejegyzesek) + 64:
+                self._tomorites()
+
+        return True
+
+
+    def naplo_kovetes(self) -> None:
+        """
+        Beolvassa a naplófájl azon részét, amelyet más folyamatok írtak a legutóbbi olvasás óta; ha a naplót
+        közben tömörítették (lecserélték), a listát újraépíti belőle.
+        """
+        if self.naplo_fajl is None:
+            return
+        try:
+            f = open(self.naplo_fajl, 'rb')
+        except FileNotFoundError:
+            return
+
+        # A fejléc, a hossz és a bejegyzések ugyanabból a megnyitott fájlból származnak, így egy közben
+        # lecserélt napló sem keveredhet a régivel.
+        with f:
+            nemzedek = _naplo_nemzedek(f, self.naplo_fajl)
+            if nemzedek is None:
+                return   # Az éppen létrejövő napló fejléce még nem íródott ki
+            hossz = os.fstat(f.fileno()).st_size
+
+            if self._naplo_allapot is None or self._naplo_allapot[0] != nemzedek or hossz < self._naplo_allapot[1]:
+                self.bejegyzesek.clear()
+                self._fej = _Csucs(None, MAX_SZINT)
+                self._szint = 1
+                self._naplo_bejegyzesek = 0
+                eltolas = _FEJLEC.size
+            elif hossz > self._naplo_allapot[1]:
+                eltolas = self._naplo_allapot[1]
+            else:
+                return
+
+            f.seek(eltolas)
+            adat = f.read(hossz - eltolas)
+        pozicio = 0
+
+        # Egy éppen íródó, csonka utolsó bejegyzést a következő olvasásra hagyunk.
+        while pozicio + _BEJEGYZES.size <= len(adat):
+            nev_hossz, osszpontszam, teljesitett, osszido = _BEJEGYZES.unpack_from(adat, pozicio)
+            veg = pozicio + _BEJEGYZES.size + nev_hossz
+            if veg > len(adat):
+                break
+            gamertag = adat[pozicio + _BEJEGYZES.size:veg].decode("Utf-8")
+            self._alkalmazas(gamertag, osszpontszam, teljesitett, osszido)
+            self._naplo_bejegyzesek += 1
+            pozicio = veg
+
+        self._naplo_allapot = (nemzedek, eltolas + pozicio)
+
+
+    def tomorites(self) -> None:
+        """
+        Újraírja a naplót úgy, hogy minden játékosnak csak az érvényes bejegyzése maradjon meg. Átmeneti
+        fájlba ír, és csak utána cseréli le a régit. A napló zárja alatt előbb beolvassa a más folyamatok
+        által hozzáfűzött bejegyzéseket, hogy a tömörítés ne veszítse el őket.
+        """
+        if self.naplo_fajl is None:
+            return
+
+        with _naplo_zar(self.naplo_fajl):
+            if os.path.exists(self.naplo_fajl):
+                self.naplo_kovetes()
+            self._tomorites()
+
+
+    def _tomorites(self) -> None:
+        """
+        A tomorites a napló zárjának megszerzése után.
+        """
+        atmeneti, f = _atmeneti_fajl(self.naplo_fajl)
+        nemzedek = int.from_bytes(os.urandom(8), "little")
+        try:
+            with f:
+                f.write(_FEJLEC.pack(NAPLO_AZONOSITO, NAPLO_VERZIO, nemzedek))
+                for bejegyzes in self:
+                    f.write(_naplo_bejegyzes(*bejegyzes))
+                hossz = f.tell()
+            os.replace(atmeneti, self.naplo_fajl)
+        except BaseException:
+            _torles(atmeneti)
+            raise
+        self._naplo_allapot = (nemzedek, hossz)
+        self._naplo_bejegyzesek = len(self.bejegyzesek)
+
+
+def _atmeneti_fajl(fajlnev: str):
+    """
+    Egyedi nevű átmeneti fájlt nyit a célfájl mellett, hogy az egyszerre író folyamatok ne írják felül
+    egymás félkész fájlját, és a végső átnevezés ugyanazon a köteten maradjon.
+
+    :param fajlnev: A célfájl neve.
+    :type fajlnev: str
+    :return: Az átmeneti fájl neve és írásra (binárisan) megnyitott fájlobjektuma.
+    :rtype: tuple[str, BinaryIO]
+    """
+    atmeneti = f"{fajlnev}.{uuid.uuid4().hex}.tmp"
+    return atmeneti, open(atmeneti, 'xb')
+
+
+def _torles(fajlnev: str) -> None:
+    """
+    Törli a fájlt, ha még létezik.
+
+    :param fajlnev: A törlendő fájl neve.
+    :type fajlnev: str
+    """
+    try:
+        os.remove(fajlnev)
+    except FileNotFoundError:
+        pass
+
+
+@contextmanager
+def _naplo_zar(naplo_fajl: str):
+    """
+    Kizárólagos, folyamatok közötti zár a naplóhoz. A zárat a napló melletti .zar fájl hordozza, mert a
+    naplót a tömörítés lecseréli, a zárfájlt viszont soha.
+
+    :param naplo_fajl: A naplófájl neve.
+    :type naplo_fajl: str
+    """
+    with open(naplo_fajl + ".zar", 'a+b') as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:   # Az LK_LOCK kb. 10 másodperc után feladja; addig próbálkozunk, amíg sikerül
+                    continue
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def _naplo_nemzedek(f, naplo_fajl: str) -> int or None:
+    """
+    :param f: Az elejéről olvasásra megnyitott naplófájl.
+    :param naplo_fajl: A naplófájl neve (a hibaüzenethez).
+    :type f: BinaryIO
+    :type naplo_fajl: str
+    :return: A napló nemzedéke, vagy None, ha a fejléc még nem íródott ki teljesen.
+    :rtype: int or None
+    :raises ValueError: Ha a fájl nem ismert verziójú napló.
+    """
+    fejlec = f.read(_FEJLEC.size)
+    if len(fejlec) < _FEJLEC.size:
+        return None
+    azonosito, verzio, nemzedek = _FEJLEC.unpack(fejlec)
+    if azonosito != NAPLO_AZONOSITO or verzio != NAPLO_VERZIO:
+        raise ValueError(f"Ismeretlen dicsőséglista napló formátum: {naplo_fajl}")
+
+    return nemzedek
+
+
+def _naplo_bejegyzes(gamertag: str, osszpontszam: int, teljesitett: int, osszido: int) -> bytes:
+    """
+    :return: Egy játékos eredménye a naplófájl formátumában.
+    :rtype: bytes
+    """
+    nev = gamertag.encode("Utf-8")
+
+    return _BEJEGYZES.pack(len(nev), osszpontszam, teljesitett, osszido) + nev
+
+
+def felepites(profilok, naplo_fajl: str = None) -> Dicsoseglista:
+    """
+    Új dicsőséglistát épít a profilok összesített adataiból, és (ha meg van adva) kiírja a naplóját.
+
+    :param profilok: Profilonként a gamertag, az összpontszám, a teljesített pályák száma és az összidő.
+    :param naplo_fajl: A naplófájl neve.
+    :type profilok: Iterable[tuple[str, int, int, int]]
+    :type naplo_fajl: str
+    :return: A dicsőséglista.
+    :rtype: Dicsoseglista
+    """
+    dicsoseglista = Dicsoseglista()
+    for profil in profilok:
+        dicsoseglista._alkalmazas(*profil)
+    dicsoseglista.naplo_fajl = naplo_fajl
+    if naplo_fajl is not None:
+        # A profilokból épített lista a teljes napló helyére kerül, ezért a régit nem olvassuk be.
+        with _naplo_zar(naplo_fajl):
+            dicsoseglista._tomorites()
+
+    return dicsoseglista
+
+
+def betoltes(naplo_fajl: str = DICSOSEGLISTA_NAPLO) -> Dicsoseglista or None:
+    """
+    :param naplo_fajl: A naplófájl neve.
+    :type naplo_fajl: str
+    :return: A naplóból visszaállított dicsőséglista, vagy None, ha a napló nem létezik.
+    :rtype: Dicsoseglista or None
+    """
+    if not os.path.exists(naplo_fajl):
+        return None
+
+    dicsoseglista = Dicsoseglista(naplo_fajl)
+    dicsoseglista.naplo_kovetes()
+
+    return dicsoseglista
+
+
+class Rangsor:
+    """
+    A kiírt rangsorfájl memórialeképezéssel megnyitva, csak olvasásra. A bejegyzések rögzített hosszúak,
+    így egy helyezés O(1), egy játékos helyezése (a pontszáma ismeretében) bináris kereséssel O(log n) idő
+    alatt olvasható ki, a fájl beolvasása nélkül. Az író a fájlt átnevezéssel cseréli, így a megnyitott
+    leképezés mindig egy teljes, változatlan változatot lát.
+
+    :ivar fajlnev: A rangsorfájl neve.
+    :ivar naplo_allapot: A napló (nemzedék, hossz) állapota, amelyből a rangsor készült.
+    """
+
+    def __init__(self, fajlnev: str = RANGSOR_FAJL) -> None:
+
+        self.fajlnev = fajlnev
+        with open(fajlnev, 'rb') as f:
+            self._adat = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if len(self._adat) < _RANGSOR_FEJLEC.size:
+            self._adat.close()
+            raise ValueError(f"Csonka rangsorfájl: {fajlnev}")
+        azonosito, verzio, self._darab, *naplo_allapot = _RANGSOR_FEJLEC.unpack_from(self._adat, 0)
+        if azonosito != RANGSOR_AZONOSITO or verzio != RANGSOR_VERZIO:
+            self._adat.close()
+            raise ValueError(f"Ismeretlen rangsorfájl formátum: {fajlnev}")
+        self.naplo_allapot = tuple(naplo_allapot)
+
+
+    def __len__(self) -> int:
+        return self._darab
+
+
+    def __enter__(self) -> "Rangsor":
+        return self
+
+
+    def __exit__(self, *kivetel) -> None:
+        self.bezaras()
+
+
+    def _bejegyzes(self, index: int) -> tuple:
+        """
+        :param index: A bejegyzés sorszáma (0-tól).
+        :type index: int
+        :return: A dicsőségpont, az összpontszám, a teljesített pályák száma, az összidő és a gamertag.
+        :rtype: tuple
+        """
+        dicsosegpont, osszpontszam, teljesitett, osszido, nev = _RANGSOR_BEJEGYZES.unpack_from(
+            self._adat, _RANGSOR_FEJLEC.size + index * _RANGSOR_BEJEGYZES.size)
+
+        return dicsosegpont, osszpontszam, teljesitett, osszido, nev.rstrip(b"\0").decode("Utf-8", "ignore")
+
+
+    def __getitem__(self, helyezes: int) -> tuple:
+        """
+        :param helyezes: A helyezés (1-től).
+        :type helyezes: int
+        :return: A helyezés, a gamertag, az összpontszám, a teljesített pályák száma és az összidő.
+        :rtype: tuple[int, str, int, int, int]
+        :raises IndexError: Ha nincs ilyen helyezés.
+        """
+        if not 1 <= helyezes <= self._darab:
+            raise IndexError(helyezes)
+        _, osszpontszam, teljesitett, osszido, gamertag = self._bejegyzes(helyezes - 1)
+
+        return helyezes, gamertag, osszpontszam, teljesitett, osszido
+
+
+    def reszlet(self, kezdet: int, darab: int) -> list:
+        """
+        :param kezdet: Az első visszaadott helyezés (1-től).
+        :param darab: Legfeljebb ennyi játékost ad vissza.
+        :type kezdet: int
+        :type darab: int
+        :return: A rangsor részlete (lásd __getitem__).
+        :rtype: list[tuple[int, str, int, int, int]]
+        """
+        kezdet = max(kezdet, 1)
+
+        return [self[helyezes] for helyezes in range(kezdet, min(kezdet + darab, self._darab + 1))]
+
+
+    def elso(self, darab: int) -> list:
+        """
+        :param darab: A visszaadott játékosok száma.
+        :type darab: int
+        :return: A rangsor első játékosai (lásd reszlet).
+        :rtype: list[tuple[int, str, int, int, int]]
+        """
+        return self.reszlet(1, darab)
+
+
+    def oldal(self, sorszam: int, meret: int) -> list:
+        """
+        :param sorszam: Az oldal sorszáma (1-től).
+        :param meret: Az oldalankénti játékosok száma.
+        :type sorszam: int
+        :type meret: int
+        :return: A rangsor adott oldala (lásd reszlet).
+        :rtype: list[tuple[int, str, int, int, int]]
+        """
+        return self.reszlet((sorszam - 1) * meret + 1, meret)
+
+
+    def helyezes(self, gamertag: str, dicsosegpont: int) -> int or None:
+        """
+        Bináris kereséssel megkeresi a játékost a (-dicsőségpont, gamertag) szerint rendezett bejegyzések között.
+
+        :param gamertag: A játékos felhasználóneve.
+        :param dicsosegpont: A játékos dicsőségpontjai.
+        :type gamertag: str
+        :type dicsosegpont: int
+        :return: A játékos helyezése (1-től), vagy None, ha nincs a rangsorban (ezekkel a pontokkal).
+        :rtype: int or None
+        """
+        gamertag = _gamertag_bajtok(gamertag).decode("Utf-8", "ignore")
+        kulcs = (-dicsosegpont, gamertag)
+        also, felso = 0, self._darab
+        while also < felso:
+            kozep = (also + felso) // 2
+            bejegyzes = self._bejegyzes(kozep)
+            if (-bejegyzes[0], bejegyzes[4]) < kulcs:
+                also = kozep + 1
+            else:
+                felso = kozep
+
+        if also < self._darab and self._bejegyzes(also)[4] == gamertag and self._bejegyzes(also)[0] == dicsosegpont:
+            return also + 1
+
+        return None
+
+
+    def kornyezet(self, gamertag: str, dicsosegpont: int, sugar: int = 2) -> list:
+        """
+        :param gamertag: A játékos felhasználóneve.
+        :param dicsosegpont: A játékos dicsőségpontjai.
+        :param sugar: Ennyi játékost ad vissza a játékos előtt és után.
+        :type gamertag: str
+        :type dicsosegpont: int
+        :type sugar: int
+        :return: A rangsor játékos körüli részlete (lásd reszlet), vagy üres lista, ha a játékos nincs a rangsorban.
+        :rtype: list[tuple[int, str, int, int, int]]
+        """
+        helyezes = self.helyezes(gamertag, dicsosegpont)
+        if helyezes is None:
+            return []
+
+        kezdet = max(helyezes - sugar, 1)
+
+        return self.reszlet(kezdet, helyezes + sugar - kezdet + 1)
+
+
+    def bezaras(self) -> None:
+        """
+        Megszünteti a memórialeképezést.
+        """
+        self._adat.close()
+
+
+def _gamertag_bajtok(gamertag: str) -> bytes:
+    """
+    :return: A gamertag UTF-8 bájtjai legfeljebb GAMERTAG_HOSSZ hosszan, karakterhatáron csonkolva.
+    :rtype: bytes
+    """
+    return gamertag.encode("Utf-8")[:GAMERTAG_HOSSZ].decode("Utf-8", "ignore").encode("Utf-8")
+
+
+def rangsor_iras(rangsorolt_profilok, fajlnev: str = RANGSOR_FAJL, naplo_allapot: tuple = (0, 0)) -> bool:
+    """
+    Kiírja a rangsorfájlt átmeneti fájlba, majd átnevezéssel lecseréli vele a régit, így az olvasók sosem
+    látnak félig írt fájlt. A csere előtt bezárja a folyamat saját leképezését a régi változatról (Windowson
+    a leképezett fájl nem cserélhető le). Ha a csere így sem sikerül (amíg egy másik folyamat leképezve
+    tartja a régit), a régi változat marad, és a következő közzététel próbálja újra.
+
+    :param rangsorolt_profilok: Profilonként a gamertag, az összpontszám, a teljesített pályák száma és az összidő, rangsor szerint.
+    :param fajlnev: A rangsorfájl neve.
+    :param naplo_allapot: A napló (nemzedék, hossz) állapota, amelyből a rangsor készül (lásd rangsor_frissites).
+    :type rangsorolt_profilok: Iterable[tuple[str, int, int, int]]
+    :type fajlnev: str
+    :type naplo_allapot: tuple[int, int]
+    :return: Igaz, ha az új változat a helyére került.
+    :rtype: bool
+    """
+    atmeneti, f = _atmeneti_fajl(fajlnev)
+    darab = 0
+    try:
+        with f:
+            f.write(_RANGSOR_FEJLEC.pack(RANGSOR_AZONOSITO, RANGSOR_VERZIO, 0, *naplo_allapot))
+            for gamertag, osszpontszam, teljesitett, osszido in rangsorolt_profilok:
+                f.write(_RANGSOR_BEJEGYZES.pack(logika.dicsosegpontok(osszpontszam, teljesitett, osszido),
+                                                osszpontszam, teljesitett, osszido, _gamertag_bajtok(gamertag)))
+                darab += 1
+            f.seek(0)
+            f.write(_RANGSOR_FEJLEC.pack(RANGSOR_AZONOSITO, RANGSOR_VERZIO, darab, *naplo_allapot))
+    except BaseException:
+        _torles(atmeneti)
+        raise
+
+    tarolt = _megnyitott_rangsorok.pop(fajlnev, None)
+    if tarolt is not None:
+        tarolt[1].bezaras()
+
+    try:
+        os.replace(atmeneti, fajlnev)
+    except OSError:
+        _torles(atmeneti)
+        return False
+
+    return True
+
+
+def _naplo_valtozat(naplo_fajl: str) -> tuple:
+    """
+    :param naplo_fajl: A naplófájl neve.
+    :type naplo_fajl: str
+    :return: A napló (nemzedék, hossz) állapota; (0, 0), ha a napló nem létezik vagy nem olvasható.
+    :rtype: tuple[int, int]
+    """
+    try:
+        with open(naplo_fajl, 'rb') as f:
+            nemzedek = _naplo_nemzedek(f, naplo_fajl)
+            hossz = os.fstat(f.fileno()).st_size
+    except (FileNotFoundError, ValueError):
+        return 0, 0
+
+    return (0, 0) if nemzedek is None else (nemzedek, hossz)
+
+
+def _friss_rangsor(fajlnev: str, naplo_fajl: str or None) -> Rangsor or None:
+    """
+    :return: A megnyitott rangsor, ha létezik, és a napló jelenlegi állapotából készült; különben None.
+    :rtype: Rangsor or None
+    """
+    try:
+        rangsor = rangsor_megnyitas(fajlnev)
+    except ValueError:   # Régebbi formátumú rangsorfájl: újra kell írni
+        return None
+    if rangsor is None or naplo_fajl is None or rangsor.naplo_allapot != _naplo_valtozat(naplo_fajl):
+        return None
+
+    return rangsor
+
+
+def rangsor_frissites(dicsoseglista: Dicsoseglista, fajlnev: str = RANGSOR_FAJL) -> Rangsor or None:
+    """
+    Lusta közzététel az olvasók számára: megnyitja a rangsorfájlt, és csak akkor írja újra a dicsőséglistából,
+    ha hiányzik, vagy azóta bármelyik folyamat új eredményt írt a naplóba (a fájl fejléce a napló állapotát
+    rögzíti, amelyből készült). Így az eredmények átvezetése O(log n) marad, az O(n) kiírás csak a lista
+    megtekintésekor, és akkor is csak egyszer történik meg. Ha a csere nem sikerül, a régi változatot adja
+    vissza (ha nincs ilyen, None-t), és a következő hívás próbálja újra.
+
+    :param dicsoseglista: A dicsőséglista (a naplójával).
+    :param fajlnev: A rangsorfájl neve.
+    :type dicsoseglista: Dicsoseglista
+    :type fajlnev: str
+    :return: A megnyitott rangsor, vagy None, ha nincs olvasható rangsorfájl.
+    :rtype: Rangsor or None
+    """
+    naplo_fajl = dicsoseglista.naplo_fajl
+    rangsor = _friss_rangsor(fajlnev, naplo_fajl)
+    if rangsor is not None:
+        return rangsor
+
+    try:
+        if naplo_fajl is None:
+            rangsor_iras(dicsoseglista, fajlnev)
+        else:
+            # A zár alatt a napló nem változhat, így a fejlécbe írt állapot pontosan a kiírt listáé.
+            with _naplo_zar(naplo_fajl):
+                dicsoseglista.naplo_kovetes()
+                if _friss_rangsor(fajlnev, naplo_fajl) is None:
+                    rangsor_iras(dicsoseglista, fajlnev, _naplo_valtozat(naplo_fajl))
+    except OSError:
+        pass   # Nem írható a mappa: a régi változat marad (ha van)
+
+    try:
+        return rangsor_megnyitas(fajlnev)
+    except ValueError:
+        return None
+
+
+def rangsor_megnyitas(fajlnev: str = RANGSOR_FAJL) -> Rangsor or None:
+    """
+    Megnyitja (vagy a korábban megnyitottat adja vissza) a rangsorfájlt; ha azóta új változat került a
+    helyére, azt nyitja meg.
+
+    :param fajlnev: A rangsorfájl neve.
+    :type fajlnev: str
+    :return: A megnyitott rangsor, vagy None, ha a fájl nem létezik.
+    :rtype: Rangsor or None
+    """
+    try:
+        allapot = os.stat(fajlnev)
+    except OSError:
+        return None
+    valtozat = (allapot.st_ino, allapot.st_mtime_ns)
+
+    tarolt = _megnyitott_rangsorok.get(fajlnev)
+    if tarolt is not None and tarolt[0] == valtozat:
+        return tarolt[1]
+
+    rangsor = Rangsor(fajlnev)
+    _megnyitott_rangsorok[fajlnev] = (valtozat, rangsor)
+    if tarolt is not None:
+        tarolt[1].bezaras()
+
+    return rangsor
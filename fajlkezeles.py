@@ -1,116 +1,872 @@
+import adatbazis
+import dicsoseglista
+import hatteriro
+import heapq
 import logika
+import marshal
 import os
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+
+import palyacsomag
+import profilfajl
 
 #Pálya beolvasás
-def beolvas_palyat(fajlnev):
+
+BABU_TIPUSOK = {
+    "Tükör": logika.Tukor,
+    "ÁteresztőTükör": logika.AteresztoTukor,
+    "SpaceRock": logika.SpaceRock,
+    "Rakéta": logika.Raketa,
+}
+PILLANATKEP_FAJL = os.path.join("palyak", "palyak.bin")
+PILLANATKEP_VERZIO = 2
+
+# Fájlnév -> (módosítási idő, pályasablon); a beolvas_palyat és a palyak_betoltese tölti fel.
+_palya_sablonok = {}
+
+DICSOSEGLISTA_FAJL = "dicsoseglista.txt"
+# A betöltött dicsőséglista, és hogy a szöveges fájl a legutóbbi kiírás óta elavult-e.
+_dicsoseglista = None
+_dicsoseglista_valtozott = False
+_dicsoseglista_zar = threading.RLock()   # A háttérben író szál is módosítja
+_hatter_iro = None
+
+
+class PalyaFeldolgozo:
     """
-    Beolvassa és feldolgozza a megadott fájlban található pálya adatait. Létrehozza a pálya tábláját,
-    és betölti a rajta található bábukat a fájlban megadott konfiguráció alapján.
+    Egy pálya sorait soronként dolgozza fel pályasablonná. A hibás sorokat kihagyja, és a hibákat
+    sorszámmal együtt gyűjti, így a feldolgozás egy hibás bejegyzés miatt sem szakad meg. A pályát
+    használhatatlanná teszi (a sablon None) a hiányzó azonosító, a hiányzó vagy ismeretlen nehézség, az
+    ismeretlen bábutípus és a táblán kívüli pozíció.
 
-    :param fajlnev: A beolvasandó pálya fájljának neve.
-    :type fajlnev: str
-    :return: Egy tuple, amely tartalmazza a létrehozott táblát, a felhasználható bábuk listáját,
-             valamint a pálya azonosítóját és nehézségi szintjét.
-    :rtype: tuple
+    :ivar kezdo_sor: A pálya első sorának sorszáma.
+    :ivar hibak: A hibás sorok (sorszám, hibaüzenet) párjai.
+    :ivar sorok: A feldolgozott, nem üres sorok száma.
     """
-    tabla = logika.Tabla()
-    felhasznalhato_babuk = []
-    palya_id = None
-    palya_nehezseg = None
 
-    with open(fajlnev, 'r', encoding="Utf-8") as f:
-        sorok = f.readlines()
+    def __init__(self, kezdo_sor: int = 1) -> None:
+
+        self.kezdo_sor = kezdo_sor
+        self.hibak = []
+        self.sorok = 0
+        self._meret = logika.TABLA_MERET
+        self._lezerek = []
+        self._fix_babuk = []
+        self._felhasznalhato_babuk = []
+        self._palya_id = None
+        self._palya_nehezseg = None
+        self._fix_szakasz = False
+        self._poziciok = []          # (sorszám, pozíció, sor) a méret ismeretében ellenőrzendő pozíciók
+        self._hasznalhatatlan = False
+        self._ellenorizve = False
+        self._sorszam = kezdo_sor
 
-    fix_babuk = False
-    for sor in sorok:
+
+    def sor_feldolgozas(self, sor: str, sorszam: int) -> None:
+        """
+        Feldolgozza a pálya egy sorát.
+
+        :param sor: A sor szövege.
+        :param sorszam: A sor sorszáma (a hibaüzenetekhez).
+        :type sor: str
+        :type sorszam: int
+        """
         sor = sor.strip()
+        if not sor:
+            return
+        self.sorok += 1
+        self._sorszam = sorszam
+
+        try:
+            self._sor_ertelmezes(sor)
+        except (ValueError, IndexError) as hiba:
+            self.hibak.append((sorszam, f"Hibás sor ({hiba}): {sor}"))
+
+
+    def _sor_ertelmezes(self, sor: str) -> None:
+        """
+        :param sor: A nem üres, levágott sor.
+        :type sor: str
+        :raises ValueError: Ha a sor nem értelmezhető.
+        """
         if sor.startswith("Pálya:"):
-            palya_id = sor.split(":")[1].strip()  
+            self._palya_id = int(sor.split(":")[1].strip())
         elif sor.startswith("Nehézség:"):
-            palya_nehezseg = sor.split(":")[1].strip()  
-        if sor.startswith("Fix Bábuk:"):
-            fix_babuk = True
-            continue
+            self._palya_nehezseg = sor.split(":")[1].strip()
+            if self._palya_nehezseg not in logika.NEHEZSEGEK:
+                self._hasznalhatatlan = True
+                raise ValueError(f"Ismeretlen nehézség: {self._palya_nehezseg}")
+        elif sor.startswith("Méret:"):
+            self._meret = int(sor.split(":")[1].strip())
+        elif sor.startswith("Lézer:"):
+            adatok = sor.split(":")[1].split(",")
+            if len(adatok) < 2:
+                raise ValueError("Hiányzó adatok a lézerforráshoz")
+            pozicio = tuple(map(int, adatok[0].strip().split(";")))
+            self._lezerek.append((pozicio, logika.IRANYOK.index(adatok[1].strip())))
+            self._poziciok.append((self._sorszam, pozicio, sor))
+        elif sor.startswith("Fix Bábuk:"):
+            self._fix_szakasz = True
         elif sor.startswith("Felhasználható Bábuk:"):
-            fix_babuk = False
-            continue
-
-        if sor and not sor.startswith("Pálya:") and not sor.startswith("Nehézség:"):
+            self._fix_szakasz = False
+        else:
             adatok = sor.split(",")
             tipus = adatok[0].strip()
+            if tipus not in BABU_TIPUSOK:
+                self._hasznalhatatlan = True
+                raise ValueError(f"Ismeretlen bábutípus: {tipus}")
 
             # Fix bábuk esetén
-            if fix_babuk:
+            if self._fix_szakasz:
                 if len(adatok) < 3:
-                    print(f"Hiányzó adatok a sorban: {sor}")
-                    continue
+                    raise ValueError("Hiányzó adatok a sorban")
                 tajolas = logika.IRANYOK.index(adatok[1].strip())
                 pozicio = tuple(map(int, adatok[2].strip().split(";")))
-                # Példányosítás a típus alapján
-                babu = None
-                if tipus == "Tükör":
-                    babu = logika.Tukor(tipus, pozicio, tajolas)
-                elif tipus == "ÁteresztőTükör":
-                    babu = logika.AteresztoTukor(tipus, pozicio, tajolas)
-                elif tipus == "SpaceRock":
-                    babu = logika.SpaceRock(tipus, pozicio, tajolas)
-                elif tipus == "Rakéta":
-                    babu = logika.Raketa(tipus, pozicio, tajolas)
-
-                if babu:
-                    tabla.babu_elhelyez(babu, pozicio)
+                self._fix_babuk.append((tipus, tajolas, pozicio))
+                self._poziciok.append((self._sorszam, pozicio, sor))
 
             # Mozgatható bábuk esetén
             else:
                 if len(adatok) < 2:
-                    print(f"Hiányzó adatok a mozgatható bábukhoz: {sor}")
+                    raise ValueError("Hiányzó adatok a mozgatható bábukhoz")
+                darabszam = int(adatok[1].strip())
+                self._felhasznalhato_babuk.extend([tipus] * darabszam)
+
+
+    def _ellenorzes(self) -> None:
+        """
+        A pálya egészére vonatkozó ellenőrzések (a sorok után megadott méret miatt a pozíciók is csak
+        ekkor ellenőrizhetők); a hibákat a hibak listába veszi fel.
+        """
+        if self._palya_id is None:
+            self.hibak.append((self.kezdo_sor, "Hiányzó \"Pálya:\" sor."))
+            self._hasznalhatatlan = True
+        if self._palya_nehezseg is None:
+            self.hibak.append((self.kezdo_sor, "Hiányzó \"Nehézség:\" sor."))
+            self._hasznalhatatlan = True
+        for sorszam, pozicio, sor in self._poziciok:
+            if len(pozicio) != 2 or not all(0 <= koordinata < self._meret for koordinata in pozicio):
+                self.hibak.append((sorszam, f"A pozíció kívül esik a táblán ({self._meret}x{self._meret}): {sor}"))
+                self._hasznalhatatlan = True
+
+
+    def sablon(self) -> dict or None:
+        """
+        :return: A pálya mérete, lézerforrásai, a fix bábuk (típus, tájolás, pozíció) hármasai, a
+                 felhasználható bábuk típusai és a pálya azonosítója, nehézsége; None, ha a pálya nem
+                 használható (az okai a hibak listában).
+        :rtype: dict or None
+        """
+        if not self._ellenorizve:
+            self._ellenorizve = True
+            self._ellenorzes()
+        if self._hasznalhatatlan:
+            return None
+
+        return {
+            "meret": self._meret,
+            "lezerek": self._lezerek,
+            "fix_babuk": self._fix_babuk,
+            "felhasznalhato_babuk": self._felhasznalhato_babuk,
+            "palya_info": (self._palya_id, self._palya_nehezseg),
+        }
+
+
+def palya_sablon_feldolgozas(sorok) -> dict:
+    """
+    Feldolgozza egy pályafájl sorait egy pályasablonná: csak adatokat tartalmaz (bábuobjektumokat nem),
+    így gyorsítótárazható és lemezre menthető, és tetszőleges számú friss tábla készíthető belőle.
+    A hibás sorokat kiírja és kihagyja.
+
+    :param sorok: A pályafájl sorai.
+    :type sorok: list[str]
+    :return: A pálya sablonja (lásd PalyaFeldolgozo.sablon).
+    :rtype: dict
+    :raises ValueError: Ha a pálya nem használható (lásd PalyaFeldolgozo).
+    """
+    feldolgozo = PalyaFeldolgozo()
+    for sorszam, sor in enumerate(sorok, start=1):
+        feldolgozo.sor_feldolgozas(sor, sorszam)
+
+    sablon = feldolgozo.sablon()
+    for sorszam, uzenet in feldolgozo.hibak:
+        print(f"{sorszam}. sor: {uzenet}")
+
+    if sablon is None:
+        raise ValueError("A pálya nem használható.")
+
+    return sablon
+
+
+def palyak_folyam(sorok):
+    """
+    Egy tetszőlegesen hosszú, több pályát tartalmazó szövegfolyamból (például megnyitott fájlból)
+    egyesével adja vissza a pályákat; minden pálya a "Pálya:" sorával kezdődik. Egyszerre csak az
+    aktuális pálya van a memóriában. A hibás sorok nem szakítják meg a folyamot: a pálya a hibák
+    listájával együtt kerül visszaadásra.
+
+    :param sorok: A szövegfolyam sorai.
+    :type sorok: Iterable[str]
+    :return: Pályánként egy szótár: a pálya első sorának sorszáma (sor), a sablonja (sablon, None, ha
+             a pálya nem használható), a hibás sorok (sorszám, hibaüzenet) párjai (hibak) és a pálya
+             szövege (szoveg).
+    :rtype: Iterator[dict]
+    """
+    def eredmeny(feldolgozo, palya_sorok):
+        sablon = feldolgozo.sablon()
+        return {"sor": feldolgozo.kezdo_sor, "sablon": sablon, "hibak": feldolgozo.hibak,
+                "szoveg": "".join(palya_sorok)}
+
+    feldolgozo = None
+    palya_sorok = []
+    for sorszam, sor in enumerate(sorok, start=1):
+        if sor.lstrip().startswith("Pálya:") or feldolgozo is None:
+            if feldolgozo is not None and feldolgozo.sorok:
+                yield eredmeny(feldolgozo, palya_sorok)
+            if feldolgozo is None or feldolgozo.sorok:
+                feldolgozo = PalyaFeldolgozo(sorszam)
+                palya_sorok = []
+        if not feldolgozo.sorok and sor.strip():
+            feldolgozo.kezdo_sor = sorszam  # A pálya előtti üres sorok nem számítanak bele
+        palya_sorok.append(sor if sor.endswith("\n") else sor + "\n")
+        feldolgozo.sor_feldolgozas(sor, sorszam)
+
+    if feldolgozo is not None and feldolgozo.sorok:
+        yield eredmeny(feldolgozo, palya_sorok)
+
+
+def folyam_csomagolasa(forras_fajl: str, cel_fajl: str = palyacsomag.PALYACSOMAG_FAJL) -> tuple:
+    """
+    Egy több pályát tartalmazó szövegfájlt ellenőriz és pályacsomagba importál, állandó memóriával.
+    A hibás pályákat a sorszámokkal együtt kiírja és kihagyja.
+
+    :param forras_fajl: A pályákat tartalmazó szövegfájl.
+    :param cel_fajl: A csomagfájl neve.
+    :type forras_fajl: str
+    :type cel_fajl: str
+    :return: Az importált és a kihagyott pályák száma.
+    :rtype: tuple[int, int]
+    """
+    kihagyott = 0
+
+    def ervenyes_palyak():
+        nonlocal kihagyott
+        with open(forras_fajl, 'r', encoding="Utf-8") as f:
+            for palya in palyak_folyam(f):
+                if palya["hibak"]:
+                    kihagyott += 1
+                    for sorszam, uzenet in palya["hibak"]:
+                        print(f"{sorszam}. sor: {uzenet}")
                     continue
+                yield (palya["sablon"]["palya_info"][0], palya["szoveg"]) + _katalogus_adatok(palya["sablon"])
+
+    importalt = palyacsomag.csomag_keszites(ervenyes_palyak(), cel_fajl)
+
+    return importalt, kihagyott
+
+
+def mappa_csomagolasa(mappa: str = "palyak", cel_fajl: str = palyacsomag.PALYACSOMAG_FAJL) -> int:
+    """
+    A mappa összes .txt pályafájlját egy pályacsomagba írja.
+
+    :param mappa: A pályafájlok mappája.
+    :param cel_fajl: A csomagfájl neve.
+    :type mappa: str
+    :type cel_fajl: str
+    :return: A csomagba írt pályák száma.
+    :rtype: int
+    :raises ValueError: Ha egy pályafájl nem használható (lásd PalyaFeldolgozo).
+    """
+    def palyak():
+        for fajlnev in sorted(os.listdir(mappa)):
+            if fajlnev.endswith('.txt'):
+                with open(os.path.join(mappa, fajlnev), 'r', encoding="Utf-8") as f:
+                    szoveg = f.read()
+                sablon = palya_sablon_feldolgozas(szoveg.splitlines())
+                yield (sablon["palya_info"][0], szoveg) + _katalogus_adatok(sablon)
+
+    return palyacsomag.csomag_keszites(palyak(), cel_fajl)
 
-                darabszam = int(adatok[1].strip())
-                # Példányosítás a típus alapján és hozzáadás a listához
-                for _ in range(darabszam):
-                    if tipus == "Tükör":
-                        babu = logika.Tukor(tipus, (None, None))
-                    elif tipus == "ÁteresztőTükör":
-                        babu = logika.AteresztoTukor(tipus, (None, None))
-                    elif tipus == "SpaceRock":
-                        babu = logika.SpaceRock(tipus, (None, None))
-                    elif tipus == "Rakéta":
-                        babu = logika.Raketa(tipus, (None, None))
-                    else:
-                        continue  # Ismeretlen típus esetén továbblépünk
 
-                    felhasznalhato_babuk.append(babu)
-    palya_info = int(palya_id), palya_nehezseg
+def _katalogus_adatok(sablon: dict) -> tuple:
+    """
+    :param sablon: A pálya sablonja.
+    :type sablon: dict
+    :return: A pálya nehézsége, a fix és a felhasználható bábuk száma (a pályacsomag indexének katalógusadatai).
+    :rtype: tuple[str, int, int]
+    """
+    return sablon["palya_info"][1], len(sablon["fix_babuk"]), len(sablon["felhasznalhato_babuk"])
+
+
+def palya_sablonbol(sablon: dict) -> tuple:
+    """
+    Friss táblát és felhasználható bábukat készít egy pályasablonból.
+
+    :param sablon: A palya_sablon_feldolgozas eredménye.
+    :type sablon: dict
+    :return: A beolvas_palyat eredményével azonos tuple.
+    :rtype: tuple
+    """
+    tabla = logika.Tabla(sablon["meret"])
+    if sablon["lezerek"]:
+        tabla.lezerek = list(sablon["lezerek"])
+
+    for tipus, tajolas, pozicio in sablon["fix_babuk"]:
+        tabla.babu_elhelyez(BABU_TIPUSOK[tipus](tipus, pozicio, tajolas), pozicio)
+
+    felhasznalhato_babuk = [BABU_TIPUSOK[tipus](tipus, (None, None)) for tipus in sablon["felhasznalhato_babuk"]]
+
+    return tabla, felhasznalhato_babuk, sablon["palya_info"]
+
+
+def palya_sablon(fajlnev) -> dict:
+    """
+    Visszaadja a pályafájl sablonját a folyamaton belüli gyorsítótárból; a fájlt csak akkor olvassa
+    be újra, ha a módosítási ideje megváltozott. Csomaghivatkozás (``csomag#id``, lásd palyacsomag)
+    esetén csak a kért pályát olvassa ki a csomagból.
+
+    :param fajlnev: A pálya fájljának neve vagy csomaghivatkozás.
+    :type fajlnev: str
+    :return: A pálya sablonja (lásd palya_sablon_feldolgozas).
+    :rtype: dict
+    """
+    csomag_hivatkozas = palyacsomag.hivatkozas_bontas(fajlnev)
+    if csomag_hivatkozas is not None:
+        csomag_fajl, palya_id = csomag_hivatkozas
+        kulcs = palyacsomag.hivatkozas(palya_id, os.path.normpath(csomag_fajl))
+        modositva = os.stat(csomag_fajl).st_mtime_ns
+    else:
+        kulcs = os.path.normpath(fajlnev)
+        modositva = os.stat(kulcs).st_mtime_ns
+
+    tarolt = _palya_sablonok.get(kulcs)
+    if tarolt is not None and tarolt[0] == modositva:
+        return tarolt[1]
+
+    if csomag_hivatkozas is not None:
+        sorok = palyacsomag.megnyitas(csomag_fajl).szoveg(palya_id).splitlines()
+    else:
+        with open(kulcs, 'r', encoding="Utf-8") as f:
+            sorok = f.readlines()
+    sablon = palya_sablon_feldolgozas(sorok)
+    _palya_sablonok[kulcs] = (modositva, sablon)
+
+    return sablon
+
+
+def beolvas_palyat(fajlnev):
+    """
+    Beolvassa és feldolgozza a megadott fájlban található pálya adatait. Létrehozza a pálya tábláját
+    (a "Méret:" sorban megadott oldalhosszal, ennek hiányában 5x5-ös méretben), és betölti a rajta
+    található bábukat a fájlban megadott konfiguráció alapján. A "Lézer: sor;oszlop, Irány" sorok
+    a pálya lézerforrásait adják meg (több is lehet); ha nincs ilyen sor, az alapértelmezett forrás marad.
+    A feldolgozott pályák gyorsítótárba kerülnek, így ismételt játéknál csak a tábla készül el újra.
+
+    :param fajlnev: A beolvasandó pálya fájljának neve, vagy egy pályacsomagbeli pályára mutató hivatkozás.
+    :type fajlnev: str
+    :return: Egy tuple, amely tartalmazza a létrehozott táblát, a felhasználható bábuk listáját,
+             valamint a pálya azonosítóját és nehézségi szintjét.
+    :rtype: tuple
+    """
+    return palya_sablonbol(palya_sablon(fajlnev))
+
+
+def _pillanatkep_olvasas(pillanatkep_fajl: str) -> dict:
+    """
+    Beolvassa a pályák pillanatképét. A pillanatkép marshal formátumú, így csak adatokat (szótárakat,
+    listákat, számokat, szövegeket) tartalmazhat, a betöltése nem futtat kódot. Hiányzó, sérült vagy
+    más verziójú fájl esetén üres gyorsítótárat ad vissza, hogy a pályák újra feldolgozásra kerüljenek.
+
+    :param pillanatkep_fajl: A pillanatkép fájl neve.
+    :type pillanatkep_fajl: str
+    :return: Fájlnév -> (módosítási idő, pályasablon).
+    :rtype: dict
+    """
+    try:
+        with open(pillanatkep_fajl, 'rb') as f:
+            pillanatkep = marshal.load(f)
+        if not isinstance(pillanatkep, dict) or pillanatkep.get("verzio") != PILLANATKEP_VERZIO:
+            return {}
+        tarolt = pillanatkep["palyak"]
+        if not all(isinstance(kulcs, str) and isinstance(ertek, tuple) and len(ertek) == 2
+                   and isinstance(ertek[0], int) and isinstance(ertek[1], dict)
+                   for kulcs, ertek in tarolt.items()):
+            return {}
+    except (OSError, EOFError, ValueError, TypeError, KeyError, AttributeError):
+        return {}
+
+    return tarolt
+
+
+def palyak_betoltese(mappa: str = "palyak", pillanatkep_fajl: str = PILLANATKEP_FAJL) -> int:
+    """
+    Betölti a mappa összes pályáját a gyorsítótárba egyetlen bináris pillanatképfájlból. A pillanatkép
+    minden pályához a fájl módosítási idejét is tárolja: a megváltozott vagy új pályafájlokat újra
+    feldolgozza, a törölteket elhagyja, és ha bármi változott, a pillanatképet újraírja.
+
+    :param mappa: A pályafájlok mappája.
+    :param pillanatkep_fajl: A pillanatkép fájl neve.
+    :type mappa: str
+    :type pillanatkep_fajl: str
+    :return: A betöltött pályák száma.
+    :rtype: int
+    """
+    tarolt = _pillanatkep_olvasas(pillanatkep_fajl)
+
+    palyak = {}
+    valtozott = False
+    with os.scandir(mappa) as bejegyzesek:
+        for bejegyzes in bejegyzesek:
+            if not bejegyzes.name.endswith('.txt'):
+                continue
+            kulcs = os.path.normpath(bejegyzes.path)
+            modositva = bejegyzes.stat().st_mtime_ns
+            if kulcs in tarolt and tarolt[kulcs][0] == modositva:
+                palyak[kulcs] = tarolt[kulcs]
+            else:
+                with open(kulcs, 'r', encoding="Utf-8") as f:
+                    palyak[kulcs] = (modositva, palya_sablon_feldolgozas(f.readlines()))
+                valtozott = True
+    valtozott = valtozott or len(palyak) != len(tarolt)
+
+    if valtozott:
+        # Egyedi nevű átmeneti fájlba írás és csere, hogy egy megszakadt vagy egyidejű mentés ne hagyjon
+        # sérült pillanatképet. A pillanatkép csak gyorsítás: ha nem írható (például írásvédett telepítésen),
+        # a pályák ettől még betöltődnek, és a következő indítás újra megpróbálja.
+        atmeneti = f"{pillanatkep_fajl}.{uuid.uuid4().hex}.tmp"
+        try:
+            with open(atmeneti, 'xb') as f:
+                marshal.dump({"verzio": PILLANATKEP_VERZIO, "palyak": palyak}, f)
+            os.replace(atmeneti, pillanatkep_fajl)
+        except OSError:
+            try:
+                os.remove(atmeneti)
+            except OSError:
+                pass
+
+    _palya_sablonok.update(palyak)
+
+    return len(palyak)
+
+
+def _katalogus_bejegyzes(sablon: dict, hely: str) -> logika.KatalogusBejegyzes:
+    """
+    :param sablon: A pálya sablonja.
+    :param hely: A pálya elérési útvonala vagy csomaghivatkozása.
+    :type sablon: dict
+    :type hely: str
+    :return: A pálya katalógusadatai.
+    :rtype: logika.KatalogusBejegyzes
+    """
+    return logika.KatalogusBejegyzes(sablon["palya_info"][0], *_katalogus_adatok(sablon), hely)
+
+
+def katalogus_betoltese(katalogus: logika.PalyaKatalogus = logika.PALYA_KATALOGUS,
+                        csomag_fajl: str = palyacsomag.PALYACSOMAG_FAJL) -> int:
+    """
+    Feltölti a pályakatalógust a gyorsítótárban lévő (a palyak_betoltese által betöltött) pályafájlokkal
+    és a pályacsomag pályáival. Ha egy azonosító mindkét helyen szerepel, a pályafájl az érvényes.
+    A csomag pályáinak adatai a csomag indexéből származnak, a pályákat csak az 1. verziójú
+    (katalógusadatok nélküli) csomagokból kell beolvasni.
+
+    :param katalogus: A feltöltendő katalógus.
+    :param csomag_fajl: A pályacsomag fájlneve.
+    :type katalogus: logika.PalyaKatalogus
+    :type csomag_fajl: str
+    :return: A katalógusban lévő pályák száma.
+    :rtype: int
+    """
+    csomag = palyacsomag.megnyitas(csomag_fajl)
+    if csomag is not None:
+        for palya_id, nehezseg, fix_babuk, felhasznalhato_babuk in csomag.katalogus_adatok():
+            if palya_id in katalogus:
+                continue
+            hely = palyacsomag.hivatkozas(palya_id, csomag_fajl)
+            if fix_babuk is None:
+                katalogus.hozzaadas(_katalogus_bejegyzes(palya_sablon(hely), hely))
+            else:
+                katalogus.hozzaadas(logika.KatalogusBejegyzes(palya_id, nehezseg, fix_babuk,
+                                                              felhasznalhato_babuk, hely))
 
-    return tabla, felhasznalhato_babuk, palya_info
+    for fajlnev, (_, sablon) in _palya_sablonok.items():
+        if palyacsomag.hivatkozas_bontas(fajlnev) is None:
+            katalogus.hozzaadas(_katalogus_bejegyzes(sablon, fajlnev.replace(os.sep, "/")))
+
+    return len(katalogus)
+
+
+#Profil fajlkezelés
+def profilok_migralasa(mappa: str = logika.PROFIL_MAPPA) -> int:
+    """
+    A régi szöveges profilokat (gamertag.txt) bináris profilfájllá (gamertag.prf) alakítja. Csak azokat
+    alakítja át, amelyeknek még nincs bináris párja; a szöveges fájlt meghagyja.
+
+    :param mappa: A profilok mappája.
+    :type mappa: str
+    :return: Az átalakított profilok száma.
+    :rtype: int
+    """
+    fajlnevek = set(os.listdir(mappa))
+    atalakitott = 0
+    for fajlnev in sorted(fajlnevek):
+        nev, kiterjesztes = os.path.splitext(fajlnev)
+        if kiterjesztes != ".txt" or nev + profilfajl.PROFIL_KITERJESZTES in fajlnevek:
+            continue
+        profil = logika.Profil.betoltes_fajlnev_alapjan(fajlnev, mappa)
+        if profil:
+            profilfajl.iras(os.path.join(mappa, nev + profilfajl.PROFIL_KITERJESZTES), profil.binaris_kodolas())
+            atalakitott += 1
+
+    return atalakitott
+
+
+def profil_osszesitesek(mappa: str = logika.PROFIL_MAPPA):
+    """
+    Visszaadja minden profil összesített adatait. A bináris profiloknak csak a fejlécét olvassa be; a még
+    át nem alakított szöveges profilokat teljesen beolvassa.
+
+    :param mappa: A profilok mappája.
+    :type mappa: str
+    :return: Profilonként a gamertag, az összpontszám, a teljesített pályák száma és az összidő.
+    :rtype: Iterator[tuple[str, int, int, int]]
+    """
+    for fajlnev in _profil_fajlok(mappa):
+        osszesites = _profil_osszesites(mappa, fajlnev)
+        if osszesites is not None:
+            yield osszesites
+
+
+def _profil_fajlok(mappa: str) -> list:
+    """
+    :param mappa: A profilok mappája.
+    :type mappa: str
+    :return: A profilfájlok nevei; a szöveges profil csak akkor, ha nincs bináris párja.
+    :rtype: list[str]
+    """
+    fajlnevek = os.listdir(mappa)
+    binaris = {nev for nev, kiterjesztes in map(os.path.splitext, fajlnevek) if kiterjesztes == profilfajl.PROFIL_KITERJESZTES}
+
+    return [fajlnev for fajlnev in fajlnevek
+            if fajlnev.endswith(profilfajl.PROFIL_KITERJESZTES)
+            or (fajlnev.endswith(".txt") and os.path.splitext(fajlnev)[0] not in binaris)]
+
+
+def _profil_osszesites(mappa: str, fajlnev: str) -> tuple or None:
+    """
+    :param mappa: A profilok mappája.
+    :param fajlnev: A profilfájl neve.
+    :type mappa: str
+    :type fajlnev: str
+    :return: A gamertag, az összpontszám, a teljesített pályák száma és az összidő, vagy None, ha a profil nem olvasható.
+    :rtype: tuple or None
+    """
+    try:
+        if fajlnev.endswith(profilfajl.PROFIL_KITERJESZTES):
+            return profilfajl.osszesites(os.path.join(mappa, fajlnev))
+        profil = logika.Profil.betoltes_fajlnev_alapjan(fajlnev, mappa)
+    except (OSError, ValueError, IndexError, KeyError):
+        return None   # A sérült vagy közben törölt profil kimarad, a többi rangsorolható
+    if not profil:
+        return None
+
+    return profil.gamertag, profil.osszpontszam, len(profil.teljesitett_palyak), profil.osszido
+
+
+def _rangsor_kulcs(osszesites: tuple) -> tuple:
+    """
+    :param osszesites: A gamertag, az összpontszám, a teljesített pályák száma és az összidő.
+    :type osszesites: tuple
+    :return: A rangsor rendezési kulcsa: csökkenő dicsőségpont, egyenlőség esetén gamertag.
+    :rtype: tuple
+    """
+    return -logika.dicsosegpontok(*osszesites[1:]), osszesites[0]
+
+
+def _rendezett_futam(mappa: str, fajlnevek: list) -> list:
+    """
+    Egy munkafolyamat feladata: beolvassa a profilok egy részletének összesítését, és rangsor szerint rendezi.
+
+    :param mappa: A profilok mappája.
+    :param fajlnevek: A részlet profilfájljai.
+    :type mappa: str
+    :type fajlnevek: list[str]
+    :return: A részlet rangsorolt összesítései.
+    :rtype: list[tuple[str, int, int, int]]
+    """
+    futam = [osszesites for osszesites in (_profil_osszesites(mappa, fajlnev) for fajlnev in fajlnevek) if osszesites is not None]
+    futam.sort(key=_rangsor_kulcs)
+
+    return futam
+
+
+def parhuzamos_rangsor(mappa: str = logika.PROFIL_MAPPA, folyamatok: int = None, reszlet_meret: int = 2000,
+                       meres: bool = False) -> list:
+    """
+    Teljes újraépítéshez: a profilfájlokat részletekben, folyamatkészlettel dolgozza fel. Minden munkafolyamat
+    rendezett futamot ad vissza a saját részletéből, ezeket végül összefésüli.
+
+    :param mappa: A profilok mappája.
+    :param folyamatok: A munkafolyamatok száma (alapértelmezés szerint a processzormagok száma).
+    :param reszlet_meret: Ennyi profilfájl kerül egy munkafolyamathoz egyszerre.
+    :param meres: Ha igaz, kiírja a feldolgozás sebességét.
+    :type mappa: str
+    :type folyamatok: int
+    :type reszlet_meret: int
+    :type meres: bool
+    :return: Az összes profil összesítése rangsor szerint (lásd profil_osszesitesek).
+    :rtype: list[tuple[str, int, int, int]]
+    """
+    kezdes = time.perf_counter()
+    fajlnevek = _profil_fajlok(mappa)
+    reszletek = [fajlnevek[i:i + reszlet_meret] for i in range(0, len(fajlnevek), reszlet_meret)]
+
+    with ProcessPoolExecutor(max_workers=folyamatok) as vegrehajto:
+        futamok = list(vegrehajto.map(_rendezett_futam, [mappa] * len(reszletek), reszletek))
+    rangsor = list(heapq.merge(*futamok, key=_rangsor_kulcs))
+
+    if meres:
+        eltelt = time.perf_counter() - kezdes
+        print(f"{len(rangsor)} profil feldolgozva {eltelt:.2f} mp alatt ({len(rangsor) / max(eltelt, 1e-9):.0f} profil/mp).")
+
+    return rangsor
+
+
+def _mappa_profiljai(mappa: str):
+    """
+    A mappa profiljai: a bináris profilfájlok, illetve a bináris pár nélküli szöveges profilok. A sérült
+    profilokat kiírja és kihagyja.
+
+    :param mappa: A profilok mappája.
+    :type mappa: str
+    :return: A betöltött profilok.
+    :rtype: Iterator[logika.Profil]
+    """
+    for fajlnev in sorted(_profil_fajlok(mappa)):
+        try:
+            if fajlnev.endswith(profilfajl.PROFIL_KITERJESZTES):
+                with open(os.path.join(mappa, fajlnev), 'rb') as f:
+                    profil = logika.Profil.binaris_dekodolas(f.read(), f.name)
+            else:
+                profil = logika.Profil.betoltes_fajlnev_alapjan(fajlnev, mappa)
+        except (OSError, ValueError, IndexError, KeyError) as hiba:
+            print(f"A(z) {fajlnev} profil nem olvasható, kimarad: {hiba}")
+            continue
+        if profil:
+            yield profil
+
+
+def adatbazis_beallitasa(fajlnev: str = None, mappa: str = logika.PROFIL_MAPPA) -> adatbazis.ProfilAdatbazis or None:
+    """
+    Megnyitja a profil adatbázist (alapértelmezés szerint a LASER_MAZE_ADATBAZIS környezeti változóban
+    megadott fájlt), és ettől kezdve a profilok ebben tárolódnak. Egy új, üres adatbázisba egyetlen
+    tranzakcióban átveszi a profilok mappájának összes profilját (lásd ProfilAdatbazis.atvetel), így egy
+    megszakadt átvétel a következő indításkor elölről kezdődik.
+
+    :param fajlnev: Az adatbázis fájl neve.
+    :param mappa: A profilok mappája (az átvételhez).
+    :type fajlnev: str
+    :type mappa: str
+    :return: A megnyitott adatbázis, vagy None, ha nincs megadva adatbázis (ekkor a profilok mappája marad).
+    :rtype: adatbazis.ProfilAdatbazis or None
+    """
+    if fajlnev is None:
+        fajlnev = os.environ.get(adatbazis.ADATBAZIS_KORNYEZETI_VALTOZO)
+        if not fajlnev:
+            return None
+
+    profil_adatbazis = adatbazis.ProfilAdatbazis(fajlnev)
+    if not len(profil_adatbazis) and os.path.isdir(mappa):
+        profil_adatbazis.atvetel((profil.gamertag, profil.palya_harmasok(), profil.osszpontszam,
+                                  profil.osszido, profil.dicsosegpontok()) for profil in _mappa_profiljai(mappa))
+    logika.PROFIL_ADATBAZIS = profil_adatbazis
+
+    return profil_adatbazis
 
 
 #Dicsőséglista fajlkezelés
-def dicsoseglista_keszitese_frissites():
+def _rangsorolt_profilok(parhuzamos: bool = False) -> list:
     """
-    Frissíti a dicsőséglistát a 'profilok' mappában található összes profil adatai alapján. A profilokat
-    dicsőségpontok alapján rangsorolja, amelyek a teljesített pályák száma, az összpontszám és az összesen
-    eltöltött idő alapján számítódnak ki.
+    :param parhuzamos: Ha igaz, a profilfájlokat folyamatkészlettel dolgozza fel (lásd parhuzamos_rangsor).
+    :type parhuzamos: bool
+    :return: Az összes profil összesített adatai dicsőségpontok szerint csökkenő, egyenlőség esetén gamertag szerinti sorrendben.
+    :rtype: list[tuple[str, int, int, int]]
+    """
+    if logika.PROFIL_ADATBAZIS is not None:
+        return logika.PROFIL_ADATBAZIS.rangsor()
 
-    :return: None. A függvény csak mellékhatással rendelkezik, a dicsőséglista fájl frissítése a célja.
+    if parhuzamos:
+        return parhuzamos_rangsor()
+
+    # Dicsőségpontok kiszámítása és rangsorolás
+    return sorted(profil_osszesitesek(), key=_rangsor_kulcs)
+
+
+def betoltott_dicsoseglista() -> dicsoseglista.Dicsoseglista:
+    """
+    Visszaadja a dicsőséglistát: először a naplójából tölti be (ennek hiányában a profilokból építi fel),
+    utána csak a más folyamatok által azóta naplózott változásokat olvassa be.
+
+    :return: A dicsőséglista.
+    :rtype: dicsoseglista.Dicsoseglista
+    """
+    global _dicsoseglista
+    with _dicsoseglista_zar:
+        if _dicsoseglista is None:
+            try:
+                _dicsoseglista = dicsoseglista.betoltes(dicsoseglista.DICSOSEGLISTA_NAPLO)
+            except ValueError:   # Régebbi formátumú vagy sérült napló: a profilokból újraépítjük
+                _dicsoseglista = None
+            if _dicsoseglista is None:
+                _dicsoseglista = dicsoseglista.felepites(_rangsorolt_profilok(), dicsoseglista.DICSOSEGLISTA_NAPLO)
+        else:
+            _dicsoseglista.naplo_kovetes()
+
+        return _dicsoseglista
+
+
+def dicsoseglista_eredmeny(profil: logika.Profil) -> None:
+    """
+    Egy játékos új eredményét vezeti át a dicsőséglistán: csak az ő helyét módosítja, O(log n) idő alatt.
+    Sem a rangsorfájlt, sem a szöveges dicsőséglistát nem írja újra: a rangsorfájlt a következő olvasó teszi
+    közzé (lásd rangsor_megnyitasa), a szöveges listát pedig csak elavultnak jelöli (lásd dicsoseglista_szoveg_iras).
+
+    :param profil: A játékos frissített profilja.
+    :type profil: logika.Profil
+    :return: Nincs visszatérési érték.
     :rtype: None
     """
-    profilok = []
-    for fajlnev in os.listdir('profilok'):
-        if fajlnev.endswith('.txt'):
-            profil = logika.Profil.betoltes_fajlnev_alapjan(fajlnev)
-            if profil:
-                profilok.append(profil)
+    global _dicsoseglista_valtozott
+    with _dicsoseglista_zar:
+        rangsor = betoltott_dicsoseglista()
+        if rangsor.frissites(profil.gamertag, profil.osszpontszam, len(profil.teljesitett_palyak), profil.osszido):
+            _dicsoseglista_valtozott = True
 
-    # Dicsőségpontok kiszámítása és rangsorolás
-    rangsorolt_profilok = sorted(profilok, key=lambda p: (p.osszpontszam + len(p.teljesitett_palyak) * 100 - p.osszido), reverse=True)
 
+def rangsor_megnyitasa() -> dicsoseglista.Rangsor:
+    """
+    Megnyitja a közzétett rangsorfájlt olvasásra; ha még nincs ilyen, vagy a dicsőséglista naplója azóta
+    változott, előbb újra közzéteszi (lásd dicsoseglista.rangsor_frissites).
+
+    :return: A rangsor, vagy None, ha nem sikerült közzétenni.
+    :rtype: dicsoseglista.Rangsor or None
+    """
+    with _dicsoseglista_zar:
+        return dicsoseglista.rangsor_frissites(betoltott_dicsoseglista())
+
+
+def dicsoseglista_szoveg_iras(csak_ha_valtozott: bool = False) -> None:
+    """
+    Kiírja a szöveges dicsőséglistát a betöltött dicsőséglistából.
+
+    :param csak_ha_valtozott: Ha igaz, csak akkor ír, ha e folyamat eredményei óta a fájl elavult.
+    :type csak_ha_valtozott: bool
+    :return: Nincs visszatérési érték.
+    :rtype: None
+    """
+    global _dicsoseglista_valtozott
+    with _dicsoseglista_zar:
+        if csak_ha_valtozott and not _dicsoseglista_valtozott:
+            return
+
+        _dicsoseglista_fajl_iras(betoltott_dicsoseglista())
+        _dicsoseglista_valtozott = False
+
+
+def dicsoseglista_sor(gamertag: str, osszpontszam: int, teljesitett: int, osszido: int) -> str:
+    """
+    :param gamertag: A játékos felhasználóneve.
+    :param osszpontszam: A játékos összpontszáma.
+    :param teljesitett: A teljesített pályák száma.
+    :param osszido: A játékban eltöltött összes idő másodpercben.
+    :type gamertag: str
+    :type osszpontszam: int
+    :type teljesitett: int
+    :type osszido: int
+    :return: A játékos sora a dicsőséglistán.
+    :rtype: str
+    """
+    return f"{gamertag}: Dicsőségpontok: {logika.dicsosegpontok(osszpontszam, teljesitett, osszido)}, Teljesített kihívások: {teljesitett}, Összes elhasznált idő: {osszido}mp"
+
+
+def _dicsoseglista_fajl_iras(rangsorolt_profilok) -> None:
+    """
+    :param rangsorolt_profilok: Profilonként a gamertag, az összpontszám, a teljesített pályák száma és az összidő, rangsor szerint.
+    :type rangsorolt_profilok: Iterable[tuple[str, int, int, int]]
+    """
     # Dicsőséglista mentése
-    with open('dicsoseglista.txt', 'w') as f:
+    with open(DICSOSEGLISTA_FAJL, 'w') as f:
         for profil in rangsorolt_profilok:
-            f.write(f"{profil.gamertag}: Dicsőségpontok: {profil.osszpontszam + len(profil.teljesitett_palyak) * 100- profil.osszido}, Teljesített kihívások: {len(profil.teljesitett_palyak)}, Összes elhasznált idő: {profil.osszido}mp\n")
+            f.write(dicsoseglista_sor(*profil) + "\n")
+
+
+def dicsoseglista_keszitese_frissites(parhuzamos: bool = False):
+    """
+    Újraépíti a dicsőséglistát a 'profilok' mappában (vagy a profil adatbázisban) található összes profil
+    adatai alapján, és kiírja a naplóját és a szöveges dicsőséglistát (a rangsorfájlt a következő olvasó
+    teszi közzé). A profilokat dicsőségpontok alapján
+    rangsorolja, amelyek a teljesített pályák száma, az összpontszám és az összesen eltöltött idő alapján
+    számítódnak ki. Egy-egy új eredményhez elég a dicsoseglista_eredmeny; erre például a profilok
+    átalakítása után van szükség.
+
+    :param parhuzamos: Ha igaz, a profilokat több folyamatban dolgozza fel (sok profil esetén).
+    :type parhuzamos: bool
+    :return: None. A függvény csak mellékhatással rendelkezik, a dicsőséglista fájl frissítése a célja.
+    :rtype: None
+    """
+    global _dicsoseglista, _dicsoseglista_valtozott
+    with _dicsoseglista_zar:
+        _dicsoseglista = dicsoseglista.felepites(_rangsorolt_profilok(parhuzamos), dicsoseglista.DICSOSEGLISTA_NAPLO)
+        _dicsoseglista_fajl_iras(_dicsoseglista)
+        _dicsoseglista_valtozott = False
 
 
+#Háttérbeli mentés
+def hatter_iro_inditasa(idokoz: float = hatteriro.MENTESI_IDOKOZ) -> hatteriro.HatterIro:
+    """
+    Elindítja a háttérben író szálat; ettől kezdve az eredmeny_mentese nem vár a lemezre.
+
+    :param idokoz: A kiírások közötti idő másodpercben.
+    :type idokoz: float
+    :return: A háttérben író szál.
+    :rtype: hatteriro.HatterIro
+    """
+    global _hatter_iro
+    if _hatter_iro is None:
+        _hatter_iro = hatteriro.HatterIro(idokoz)
+
+    return _hatter_iro
+
+
+def eredmeny_mentese(profil: logika.Profil) -> None:
+    """
+    Elmenti a profilt és átvezeti az eredményét a dicsőséglistán. Ha fut a háttérben író szál, csak a profil
+    pillanatképét adja át neki (egy profil várakozó mentéseiből csak a legutolsó íródik ki), és azonnal visszatér.
 
+    :param profil: A játékos frissített profilja.
+    :type profil: logika.Profil
+    :return: Nincs visszatérési érték.
+    :rtype: None
+    """
+    pillanatkep = logika.Profil.harmasokbol(profil.gamertag, profil.palya_harmasok(), profil.osszpontszam, profil.osszido)
+
+    def mentes():
+        pillanatkep.mentes_frissites()
+        dicsoseglista_eredmeny(pillanatkep)
+
+    if _hatter_iro is None:
+        mentes()
+    else:
+        _hatter_iro.bekuldes(("profil", profil.gamertag), mentes)
 
+
+def mentesek_uritese() -> None:
+    """
+    Megvárja, amíg a háttérben író szál minden várakozó mentést kiír (például egy profil betöltése előtt).
+    A sikertelen mentéseket kiírja; ezeket a háttérszál később újra megpróbálja.
+    """
+    if _hatter_iro is not None:
+        for (_, gamertag), hiba in _hatter_iro.uritas():
+            print(f"A(z) {gamertag} profil mentése nem sikerült ({hiba}), később újrapróbáljuk.")
@@ -0,0 +1,138 @@
+import atexit
+import sys
+import threading
+import traceback
+from collections import OrderedDict
+
+MENTESI_IDOKOZ = 2.0   # Másodperc; ennyi időnként írja ki a háttérszál a várakozó mentéseket
+MAX_VARAKOZO = 64
+
+
+class HatterIro:
+    """
+    Háttérszál, amely a lemezre írást (profilmentés, dicsőséglista frissítés) a hívótól átvéve végzi el.
+    A feladatok kulcs szerint összevonódnak: ha egy kulcshoz még kiíratlan feladat vár, az újabb lecseréli,
+    így egy profil sok gyors egymás utáni mentéséből csak az utolsó íródik ki. A várakozó feladatokat
+    idokoz másodpercenként (és a program kilépésekor) írja ki. A sor korlátos: ha megtelt, a beküldés
+    megvárja, amíg a háttérszál helyet csinál. A sikertelen feladat visszakerül a sorba (hacsak közben
+    újabb nem érkezett ugyanarra a kulcsra), és a következő kiíráskor újra lefut; a hibát az uritas adja
+    vissza, a kilépéskor is sikertelen feladatokat pedig a leallitas kiírja.
+
+    :ivar idokoz: A kiírások közötti idő másodpercben (0: azonnal).
+    :ivar max_varakozo: Legfeljebb ennyi különböző kulcs várhat kiírásra.
+    """
+
+    def __init__(self, idokoz: float = MENTESI_IDOKOZ, max_varakozo: int = MAX_VARAKOZO) -> None:
+
+        self.idokoz = idokoz
+        self.max_varakozo = max_varakozo
+        self._varakozo = OrderedDict()   # Kulcs -> feladat
+        self._feltetel = threading.Condition()
+        self._folyamatban = 0   # A háttérszál által éppen végrehajtott feladatok száma
+        self._korok = 0         # A háttérszál befejezett kiírási köreinek száma
+        self._hibak = {}        # Kulcs -> a legutóbbi sikertelen végrehajtás kivétele
+        self._surgos = False
+        self._leallitva = False
+        self._szal = threading.Thread(target=self._futtatas, name="HatterIro", daemon=True)
+        self._szal.start()
+        atexit.register(self.leallitas)
+
+
+    def bekuldes(self, kulcs, feladat) -> None:
+        """
+        Kiírásra ütemez egy feladatot; ugyanazon kulcs még várakozó feladatát lecseréli.
+
+        :param kulcs: Az összevonás kulcsa (például a profil gamertagje).
+        :param feladat: Argumentum nélkül hívható függvény, amely az írást végzi.
+        :type kulcs: Hashable
+        :type feladat: Callable[[], None]
+        """
+        with self._feltetel:
+            if self._leallitva:
+                feladat()
+                return
+            while kulcs not in self._varakozo and len(self._varakozo) >= self.max_varakozo:
+                self._surgos = True
+                self._feltetel.notify_all()
+                self._feltetel.wait()
+            self._varakozo[kulcs] = feladat
+            if self.idokoz <= 0 or len(self._varakozo) >= self.max_varakozo:
+                self._surgos = True
+            self._feltetel.notify_all()
+
+
+    def uritas(self) -> list:
+        """
+        Megvárja, amíg az összes eddig beküldött feladat lefut (a korábban sikertelenek is még egyszer).
+
+        :return: A sikertelen, újrapróbálásra váró feladatok (kulcs, kivétel) párjai.
+        :rtype: list[tuple]
+        """
+        with self._feltetel:
+            if self._varakozo or self._folyamatban:
+                # A folyamatban lévő kör az azóta beküldött feladatokat nem tartalmazza: utána még egy kell.
+                cel = self._korok + (2 if self._folyamatban and self._varakozo else 1)
+                while self._korok < cel:
+                    if self._leallitva and not self._szal.is_alive():
+                        break
+                    self._surgos = True
+                    self._feltetel.notify_all()
+                    self._feltetel.wait()
+
+            return list(self._hibak.items())
+
+
+    def leallitas(self) -> None:
+        """
+        Kiírja a várakozó feladatokat, és leállítja a háttérszálat. Utána a beküldött feladatok azonnal,
+        a hívó szálán futnak.
+        """
+        with self._feltetel:
+            if self._leallitva:
+                return
+            self._leallitva = True
+            self._feltetel.notify_all()
+        self._szal.join()
+
+        for kulcs, hiba in self._hibak.items():
+            print(f"A(z) {kulcs} háttérbeli kiírása nem sikerült:", file=sys.stderr)
+            traceback.print_exception(type(hiba), hiba, hiba.__traceback__)
+
+
+    def _futtatas(self) -> None:
+        while True:
+            with self._feltetel:
+                if not self._leallitva and not self._surgos:
+                    self._feltetel.wait_for(lambda: self._leallitva or self._surgos,
+                                            timeout=self.idokoz if self.idokoz > 0 else None)
+                feladatok = list(self._varakozo.items())
+                self._varakozo.clear()
+                self._folyamatban = len(feladatok)
+                self._surgos = False
+                leallitva = self._leallitva
+                self._feltetel.notify_all()
+
+            eredmenyek = []
+            for kulcs, feladat in feladatok:
+                try:
+                    feladat()
+                except Exception as hiba:
+                    eredmenyek.append((kulcs, feladat, hiba))
+                else:
+                    eredmenyek.append((kulcs, None, None))
+
+            with self._feltetel:
+                for kulcs, feladat, hiba in eredmenyek:
+                    if feladat is None:
+                        self._hibak.pop(kulcs, None)
+                        continue
+                    self._hibak[kulcs] = hiba
+                    if kulcs not in self._varakozo:   # Az újabb feladat lecseréli a sikertelent
+                        self._varakozo[kulcs] = feladat
+                self._folyamatban = 0
+                self._korok += 1
+                self._feltetel.notify_all()
+                # Leállításkor ez volt az utolsó kör: a sorban csak a sikertelen feladatok maradhattak,
+                # ezeket a leallitas kiírja.
+                if leallitva:
+                    return
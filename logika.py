@@ -1,4 +1,11 @@
+import math
 import os
+import random
+from bisect import bisect_left, bisect_right, insort
+from collections import OrderedDict, deque
+
+import palyacsomag
+import profilfajl
 
 IRANYOK = ["Észak", "Kelet", "Dél", "Nyugat"]
 NEHEZSEGEK = {
@@ -7,6 +14,10 @@ NEHEZSEGEK = {
     "Nehéz": 360,
     "Géniusz": 600
 }
+TABLA_MERET = 5
+PROFIL_MAPPA = "profilok"
+PROFIL_ADATBAZIS = None   # Ha a fajlkezeles.adatbazis_beallitasa megnyitott egyet, a profilok ebben vannak (adatbazis.ProfilAdatbazis)
+ALAP_LEZEREK = (((1, 0), 1),)  # A lézerforrások (kezdő pozíció, kezdő irány) párjai, ha a pálya nem ad meg mást
 #ezek nem random globális listák 	(◔_◔)
 
 
@@ -17,14 +28,14 @@ class Profil:
     az összpontszámot és az összesen eltöltött időt. Ez az osztály kezeli a profil adatainak mentését és betöltését.
 
     :ivar gamertag: A játékos egyedi felhasználóneve.
-    :ivar teljesitett_palyak: A teljesített pályák listája.
+    :ivar teljesitett_palyak: A teljesített pályák legjobb eredményei, pálya azonosító (int) szerint.
     :ivar osszpontszam: A játékos összpontszáma.
     :ivar osszido: A játékban eltöltött összes idő másodpercben.
     """
     
     def __init__(self, gamertag: str) -> None:
         self.gamertag = gamertag
-        self.teljesitett_palyak = []
+        self.teljesitett_palyak = {}
         self.osszpontszam = 0
         self.osszido = 0
 
@@ -34,7 +45,7 @@ class Profil:
         profil_info += f"Összpontszám: {self.osszpontszam}\n"
         profil_info += f"Összesen eltöltött idő: {self.osszido} másodperc\n\n"
         profil_info += "Teljesített pályák:\n"
-        for palya in self.teljesitett_palyak:
+        for palya in self.teljesitett_palyak.values():
             profil_info += f"  - Pálya ID: {palya.id}, Nehézség: {palya.nehezseg}, Idő: {palya.ido} másodperc, Pontok: {NEHEZSEGEK[palya.nehezseg]}\n"
         
         return profil_info
@@ -43,7 +54,8 @@ class Profil:
     def frissit_palya_eredmenyt(self, palya_id: int, palya_nehezseg: str, uj_ido: int) -> bool:
         """
         Frissíti a megadott pálya eredményét a profilban. Hozzáadja a pályát, ha még nem szerepel,
-        vagy frissíti az időt, ha javulás történt.
+        vagy frissíti az időt, ha javulás történt. Az összpontszámot és az összidőt a változással
+        együtt frissíti, így nem kell a teljes listát újraösszegezni.
 
         :param palya_id: A pálya azonosítója.
         :param palya_nehezseg: A pálya nehézségi szintje.
@@ -51,15 +63,19 @@ class Profil:
         :return: Igaz, ha frissítés történt, hamis, ha nem.
         :rtype: bool
         """
-        meglevo_palya = next((palya for palya in self.teljesitett_palyak if palya.id == palya_id), None)
+        palya_id = int(palya_id)
+        meglevo_palya = self.teljesitett_palyak.get(palya_id)
         if meglevo_palya:
             if uj_ido < meglevo_palya.ido:
+                self.osszido += uj_ido - meglevo_palya.ido
                 meglevo_palya.ido = uj_ido
 
                 return True  # Jelzi, hogy már volt ilyen pálya és frissítettük az időt
         else:
             uj_palya = TeljesitettPalya(palya_id, palya_nehezseg, uj_ido)
-            self.teljesitett_palyak.append(uj_palya)
+            self.teljesitett_palyak[palya_id] = uj_palya
+            self.osszido += uj_ido
+            self.osszpontszam += NEHEZSEGEK[palya_nehezseg]
 
             return False  # Jelzi, hogy új pálya került hozzáadásra
         
@@ -70,69 +86,220 @@ class Profil:
         """
         Frissíti a profil összértékeit, beleértve az összpontszámot és az összesen eltöltött időt. 
         Összegzi a teljesített pályákhoz tartozó időket és pontszámokat, majd frissíti a profil összidejét és összpontszámát.
+        A frissit_palya_eredmenyt ezeket menet közben karbantartja; erre csak betöltéskor van szükség.
 
         :return: Nincs visszatérési érték.
         :rtype: None
         """
-        self.osszido = sum(palya.ido for palya in self.teljesitett_palyak)
-        self.osszpontszam = sum(NEHEZSEGEK[palya.nehezseg] for palya in self.teljesitett_palyak)
+        self.osszido = sum(palya.ido for palya in self.teljesitett_palyak.values())
+        self.osszpontszam = sum(NEHEZSEGEK[palya.nehezseg] for palya in self.teljesitett_palyak.values())
+
+
+    def palya_harmasok(self) -> list:
+        """
+        :return: A teljesített pályák (pálya azonosító, nehézségi sorszám, idő) hármasai, ahogy a
+                 profilfajl és az adatbazis modul tárolja őket.
+        :rtype: list[tuple[int, int, int]]
+        """
+        nehezsegek = list(NEHEZSEGEK)
+
+        return [(palya.id, nehezsegek.index(palya.nehezseg), palya.ido) for palya in self.teljesitett_palyak.values()]
+
+
+    @classmethod
+    def harmasokbol(cls, gamertag: str, palyak: list, osszpontszam: int, osszido: int) -> "Profil":
+        """
+        :param gamertag: A játékos felhasználóneve.
+        :param palyak: A teljesített pályák (pálya azonosító, nehézségi sorszám, idő) hármasai.
+        :param osszpontszam: A játékos összpontszáma.
+        :param osszido: A játékban eltöltött összes idő másodpercben.
+        :type gamertag: str
+        :type palyak: list[tuple[int, int, int]]
+        :type osszpontszam: int
+        :type osszido: int
+        :return: A profil.
+        :rtype: Profil
+        """
+        nehezsegek = list(NEHEZSEGEK)
+        profil = cls(gamertag)
+        profil.teljesitett_palyak = {palya_id: TeljesitettPalya(palya_id, nehezsegek[nehezseg], ido)
+                                     for palya_id, nehezseg, ido in palyak}
+        profil.osszpontszam = osszpontszam
+        profil.osszido = osszido
+
+        return profil
+
+
+    def dicsosegpontok(self) -> int:
+        """
+        :return: A játékos dicsőségpontjai (lásd dicsosegpontok).
+        :rtype: int
+        """
+        return dicsosegpontok(self.osszpontszam, len(self.teljesitett_palyak), self.osszido)
+
+
+    def binaris_kodolas(self) -> bytes:
+        """
+        :return: A profil bináris alakja (lásd profilfajl).
+        :rtype: bytes
+        """
+        return profilfajl.kodolas(self.gamertag, self.palya_harmasok(), self.osszpontszam, self.osszido)
+
+
+    @classmethod
+    def binaris_dekodolas(cls, adat: bytes, fajlnev: str = "") -> "Profil":
+        """
+        :param adat: A profil bináris alakja.
+        :param fajlnev: A hibaüzenethez használt fájlnév.
+        :type adat: bytes
+        :type fajlnev: str
+        :return: A profil.
+        :rtype: Profil
+        """
+        return cls.harmasokbol(*profilfajl.dekodolas(adat, fajlnev))
 
 
     def mentes_frissites(self) -> None:
         """
-        Mentésre frissíti a profil adatait egy fájlba. A profil információit tartalmazó fájlt
-        a profil gamertagje alapján hozza létre vagy frissíti a 'profilok' könyvtárban.
+        Mentésre frissíti a profil adatait. Ha profil adatbázis van beállítva, abba ment; különben a profil
+        bináris fájlját (gamertag.prf) a profil gamertagje alapján hozza létre vagy frissíti a 'profilok'
+        könyvtárban.
+
+        :return: Nincs visszatérési érték.
+        :rtype: None
+        """
+        if PROFIL_ADATBAZIS is not None:
+            PROFIL_ADATBAZIS.mentes(self.gamertag, self.palya_harmasok(), self.osszpontszam, self.osszido, self.dicsosegpontok())
+            return
+
+        profilfajl.iras(os.path.join(PROFIL_MAPPA, self.gamertag + profilfajl.PROFIL_KITERJESZTES), self.binaris_kodolas())
+
+
+    def szoveges_export(self, fajlnev: str = None) -> None:
+        """
+        Kiírja a profil olvasható, szöveges alakját (a __str__ kimenetét).
 
+        :param fajlnev: A célfájl neve; alapértelmezés szerint a 'profilok' könyvtárbeli gamertag.txt.
+        :type fajlnev: str
         :return: Nincs visszatérési érték.
         :rtype: None
         """
-        with open(f'profilok/{self.gamertag}.txt', 'w') as f:
+        if fajlnev is None:
+            fajlnev = os.path.join(PROFIL_MAPPA, self.gamertag + ".txt")
+        with open(fajlnev, 'w', encoding="Utf-8") as f:
             f.write(str(self))
 
 
     @classmethod
     def profilok_listazasa(cls) -> list:
         """
-        Listázza az összes elérhető profilnevet a 'profilok' mappából. Keresi az összes .txt fájlt a könyvtárban,
-        és visszaadja a fájlok neveit profilnevekként (kiterjesztés nélkül).
+        Listázza az összes elérhető profilnevet a 'profilok' mappából (vagy a profil adatbázisból). Keresi az összes
+        .prf és .txt fájlt a könyvtárban, és visszaadja a fájlok neveit profilnevekként (kiterjesztés nélkül, ismétlés nélkül).
 
         :return: A meglévő profilnevek listája.
         :rtype: list
         """
-        profil_fajlok = [f for f in os.listdir('profilok') if f.endswith('.txt')]
-        return [f.replace('.txt', '') for f in profil_fajlok]
+        if PROFIL_ADATBAZIS is not None:
+            return PROFIL_ADATBAZIS.gamertagek()
+
+        profilok = {}
+        for fajlnev in os.listdir(PROFIL_MAPPA):
+            nev, kiterjesztes = os.path.splitext(fajlnev)
+            if kiterjesztes in (profilfajl.PROFIL_KITERJESZTES, ".txt"):
+                profilok[nev] = None
+
+        return list(profilok)
+
+
+    @classmethod
+    def letezik(cls, gamertag: str) -> bool:
+        """
+        Megnézi, hogy van-e már ilyen gamertagű profil, a profilok listázása nélkül.
+
+        :param gamertag: A játékos felhasználóneve.
+        :type gamertag: str
+        :return: Igaz, ha a gamertag foglalt.
+        :rtype: bool
+        """
+        if PROFIL_ADATBAZIS is not None:
+            return PROFIL_ADATBAZIS.letezik(gamertag)
+
+        return any(os.path.exists(os.path.join(PROFIL_MAPPA, gamertag + kiterjesztes))
+                   for kiterjesztes in (profilfajl.PROFIL_KITERJESZTES, ".txt"))
+
+
+    @classmethod
+    def betoltes(cls, gamertag: str) -> "Profil":
+        """
+        Betölti a játékos profilját: a profil adatbázisból, ha van beállítva, különben a bináris profilfájlt,
+        ennek hiányában a régi szöveges profilt. A sérült (például csonka) profilfájl nevét kiírja.
+
+        :param gamertag: A játékos felhasználóneve.
+        :type gamertag: str
+        :return: A betöltött profil példánya, vagy None, ha a profil nem található vagy sérült.
+        :rtype: Profil or None
+        """
+        if PROFIL_ADATBAZIS is not None:
+            adatok = PROFIL_ADATBAZIS.betoltes(gamertag)
+            if adatok is None:
+                print(f"A(z) {gamertag} profil nem található.")
+                return None
+            return cls.harmasokbol(*adatok)
+
+        fajlnev = os.path.join(PROFIL_MAPPA, gamertag + profilfajl.PROFIL_KITERJESZTES)
+        try:
+            with open(fajlnev, 'rb') as f:
+                adat = f.read()
+        except FileNotFoundError:
+            fajlnev, adat = os.path.join(PROFIL_MAPPA, gamertag + ".txt"), None
+
+        try:
+            if adat is None:
+                return cls.betoltes_fajlnev_alapjan(gamertag + ".txt")
+            return cls.binaris_dekodolas(adat, fajlnev)
+        except (ValueError, IndexError, KeyError) as hiba:
+            print(f"A(z) {fajlnev} profilfájl sérült, nem tölthető be ({hiba}).")
+            return None
 
     @classmethod
-    def betoltes_fajlnev_alapjan(cls, fajlnev: str) -> "Profil":
+    def betoltes_fajlnev_alapjan(cls, fajlnev: str, mappa: str = None) -> "Profil":
         """
-        Betölti a megadott fájlnév alapján a profil adatait. Olvassa a fájlt és létrehoz egy Profil példányt
-        a fájlban található adatok alapján.
+        Betölti a megadott fájlnév alapján a szöveges profil adatait. Olvassa a fájlt és létrehoz egy Profil
+        példányt a fájlban található adatok alapján. Ha egy pálya többször szerepel, a legjobb ideje marad meg,
+        és az összértékeket a megmaradt pályákból számolja újra. A régi, kódolás megadása nélkül (Windows-1250
+        kódolással) mentett fájlokat is beolvassa.
 
         :param fajlnev: A betöltendő profil fájlneve.
+        :param mappa: A profilok mappája (alapértelmezés szerint a PROFIL_MAPPA).
+        :type fajlnev: str
+        :type mappa: str
         :return: A betöltött profil példánya, vagy None, ha a fájl nem található.
         :rtype: Profil or None
         """
         try:
-            with open(f'profilok/{fajlnev}', 'r') as file:
-                profil_adatok = file.read().splitlines()
-                gamertag = profil_adatok[0].split(": ")[1]
-                osszpontszam = int(profil_adatok[1].split(": ")[1])
-                osszido = int(profil_adatok[2].split(": ")[1].split()[0])
-                teljesitett_palyak_adatok = profil_adatok[4:]
-                teljesitett_palyak = []
-                for sor in teljesitett_palyak_adatok:
-                    if sor.startswith("  - Pálya ID:"):
-                        palya_adatok = sor.split(", ")
-                        palya_id = palya_adatok[0].split(": ")[1]
-                        palya_nehezseg = palya_adatok[1].split(": ")[1]
-                        palya_ido = int(palya_adatok[2].split(": ")[1].split()[0])
-                        teljesitett_palyak.append(TeljesitettPalya(palya_id, palya_nehezseg, palya_ido))
-                profil = cls(gamertag)
-                profil.osszpontszam = osszpontszam
-                profil.osszido = osszido
-                profil.teljesitett_palyak = teljesitett_palyak
-
-                return profil
+            with open(os.path.join(PROFIL_MAPPA if mappa is None else mappa, fajlnev), 'rb') as file:
+                nyers = file.read()
+            try:
+                profil_adatok = nyers.decode("Utf-8").splitlines()
+            except UnicodeDecodeError:
+                profil_adatok = nyers.decode("cp1250").splitlines()
+            gamertag = profil_adatok[0].split(": ")[1]
+            teljesitett_palyak_adatok = profil_adatok[4:]
+            teljesitett_palyak = {}
+            for sor in teljesitett_palyak_adatok:
+                if sor.startswith("  - Pálya ID:"):
+                    palya_adatok = sor.split(", ")
+                    palya_id = int(palya_adatok[0].split(": ")[1])
+                    palya_nehezseg = palya_adatok[1].split(": ")[1]
+                    palya_ido = int(palya_adatok[2].split(": ")[1].split()[0])
+                    meglevo_palya = teljesitett_palyak.get(palya_id)
+                    if meglevo_palya is None or palya_ido < meglevo_palya.ido:
+                        teljesitett_palyak[palya_id] = TeljesitettPalya(palya_id, palya_nehezseg, palya_ido)
+            profil = cls(gamertag)
+            profil.teljesitett_palyak = teljesitett_palyak
+            profil.frissit_osszertekeket()
+
+            return profil
         except FileNotFoundError:
             print(f"A(z) {fajlnev} profil nem található.")
 
@@ -162,15 +329,13 @@ class Profil:
 
             try:
                 valasztas = int(input("\nVálassz egy profilt a számával (pl. 1, 2, ...): ")) - 1
-                if 0 <= valasztas < len(profilok):
-                    kivalasztott_fajlnev = profilok[valasztas] + ".txt"
-
-                    return cls.betoltes_fajlnev_alapjan(kivalasztott_fajlnev)
-                
-                else:
-                    print("Érvénytelen választás. Kérlek, adj meg egy létező profil sorszámát.")
             except ValueError:
                 print("Kérlek, adj meg egy érvényes számot.")
+                continue
+
+            if 0 <= valasztas < len(profilok):
+                return cls.betoltes(profilok[valasztas])
+            print("Érvénytelen választás. Kérlek, adj meg egy létező profil sorszámát.")
 
 
 
@@ -184,12 +349,15 @@ class Babu:
     :ivar pozicio: A bábu pozíciója a táblán (x, y koordináták).
     :ivar tajolas: A bábu tájolása (0: Észak, 1: Kelet, 2: Dél, 3: Nyugat).
     """
+
+    __slots__ = ("tipus", "pozicio", "tajolas", "_sajat_tabla")
     
     def __init__(self, tipus, pozicio = None, tajolas = 0):
 
         self.tipus = tipus
         self.pozicio = pozicio #ez egy tuple(x, y)!!!!!!!!!!!
         self.tajolas = tajolas 
+        self._sajat_tabla = None  # A tábla, amelyre utoljára elhelyezték (a Zobrist-hash frissítéséhez)
 
 
     def __str__(self) -> str:
@@ -212,11 +380,16 @@ class Babu:
         :param merre: A forgatás iránya ('j' a jobbra, 'b' a balra forgatáshoz).
         :type merre: str
         """
+        regi_tajolas = self.tajolas
         if merre == "j":
             self.tajolas = (self.tajolas + 1) % 4
         if merre == "b":
             self.tajolas = (self.tajolas - 1) % 4
 
+        tabla = getattr(self, "_sajat_tabla", None)
+        if tabla is not None:
+            tabla.forgatas_frissites(self, regi_tajolas)
+
 
     def mozgatas(self, uj_pozicio: tuple):
         """
@@ -235,6 +408,8 @@ class Ures(Babu):
 
     :ivar pozicio: A bábu pozíciója a táblán (x, y koordináták).
     """
+
+    __slots__ = ()
     
     def __init__(self, pozicio):
 
@@ -251,6 +426,8 @@ class SpaceRock(Babu):
     :ivar tajolas: A bábu tájolása, ami ebben az esetben nem releváns, mivel a SpaceRock nem forgatható.
     """
 
+    __slots__ = ()
+
     def __init__(self, tipus, pozicio=None, tajolas=0):
         super().__init__("SpaceRock", pozicio, tajolas)
 
@@ -266,6 +443,8 @@ class Tukor(Babu):
     :ivar tajolas: A tükör tájolása.
     """
 
+    __slots__ = ()
+
     def __init__(self, tipus, pozicio, tajolas=0):
 
         super().__init__("Tükör", pozicio, tajolas)
@@ -309,6 +488,8 @@ class AteresztoTukor(Babu):
     :ivar tajolas: Az ÁteresztőTükör tájolása.
     """
 
+    __slots__ = ()
+
     def __init__(self, tipus, pozicio=None, tajolas=0):
         super().__init__("ÁteresztőTükör", pozicio, tajolas)
 
@@ -352,6 +533,8 @@ class Raketa(Babu):
     :ivar aktivalva: Jelzi, hogy a rakéta aktiválva van-e.
     """
 
+    __slots__ = ("aktivalva",)
+
     def __init__(self, tipus, pozicio=None, tajolas=0):
         super().__init__("Rakéta", pozicio, tajolas)
         self.aktivalva = False
@@ -359,16 +542,29 @@ class Raketa(Babu):
 
 class Tabla:
     """
-    A Tabla osztály a játéktáblát reprezentálja, amely egy 5x5-ös mátrixot tartalmaz. Kezeli a bábuk elhelyezését,
-    mozgatását és eltávolítását a tábláról, valamint a bábuk lekérdezését a tábláról.
+    A Tabla osztály a játéktáblát reprezentálja, amely egy meret x meret méretű (alapértelmezetten 5x5-ös)
+    mátrixot tartalmaz. Kezeli a bábuk elhelyezését, mozgatását és eltávolítását a tábláról, valamint
+    a bábuk lekérdezését a tábláról.
 
+    :ivar meret: A tábla oldalhossza.
     :ivar matrix: A tábla mátrixa, amely a bábukat tartalmazza.
+    :ivar zobrist: A tábla Zobrist-hashe, amelyet minden módosítás növekményesen frissít.
+    :ivar lezerek: A pálya lézerforrásai (kezdő pozíció, kezdő irány) párokként.
+    :ivar valtozott_poziciok: A legutóbbi valtozasok_atvetele óta módosított mezők (lásd LezerKovetes.utvonal).
+    :type meret: int
     :type matrix: list[list[Babu]]
+    :type zobrist: int
+    :type lezerek: list[tuple]
+    :type valtozott_poziciok: set[tuple]
     """
 
-    def __init__(self) -> None:
+    def __init__(self, meret: int = TABLA_MERET) -> None:
 
-        self.matrix = [[Ures((x, y)) for y in range(5)] for x in range(5)]
+        self.meret = meret
+        self.matrix = [[Ures((x, y)) for y in range(meret)] for x in range(meret)]
+        self.zobrist = 0
+        self.lezerek = list(ALAP_LEZEREK)
+        self.valtozott_poziciok = set()
 
 
     def babu_elhelyez(self, babu: "Babu", pozicio: tuple) -> None:
@@ -381,7 +577,12 @@ class Tabla:
         :type pozicio: tuple
         """
         x, y = pozicio
+        regi = self.matrix[x][y]
+        mezo = x * self.meret + y
+        self.zobrist ^= zobrist_kulcs(mezo, babu_kodolas(regi)) ^ zobrist_kulcs(mezo, babu_kodolas(babu))
         self.matrix[x][y] = babu
+        self.valtozott_poziciok.add(pozicio)
+        babu._sajat_tabla = self
 
 
     def babu_mozgatas(self, honnan: tuple, hova: tuple) -> None:
@@ -409,7 +610,10 @@ class Tabla:
         :type pozicio: tuple
         """
         x, y = pozicio
+        regi = self.matrix[x][y]
+        self.zobrist ^= zobrist_kulcs(x * self.meret + y, babu_kodolas(regi))
         self.matrix[x][y] = Ures((x, y))
+        self.valtozott_poziciok.add(pozicio)
 
 
     def melyik_babu(self, pozicio: tuple) -> "Babu":
@@ -426,263 +630,1917 @@ class Tabla:
         return self.matrix[x][y]
 
 
-class TeljesitettPalya:
-    """
-    A TeljesitettPalya osztály egy teljesített pálya adatait tárolja, beleértve a pálya azonosítóját, nehézségi szintjét,
-    és az eltelt időt. Ez az osztály a játékos profiljában kerül felhasználásra a teljesített pályák nyilvántartásához.
+    def forgatas_frissites(self, babu: "Babu", regi_tajolas: int) -> None:
+        """
+        Frissíti a Zobrist-hasht egy táblán álló bábu forgatása után (a Babu.forgatas hívja).
 
-    :ivar id: A pálya azonosítója.
-    :ivar nehezseg: A pálya nehézségi szintje.
-    :ivar ido: A pálya teljesítéséhez szükséges idő másodpercben.
-    :type id: int
-    :type nehezseg: str
-    :type ido: int
-    """
+        :param babu: Az elforgatott bábu.
+        :param regi_tajolas: A bábu forgatás előtti tájolása.
+        :type babu: Babu
+        :type regi_tajolas: int
+        """
+        if babu.pozicio is None or None in babu.pozicio:
+            return
+        x, y = babu.pozicio
+        if not (0 <= x < self.meret and 0 <= y < self.meret) or self.matrix[x][y] is not babu:
+            return
 
-    def __init__(self, id, nehezseg, eltelt_ido) -> None:
+        uj_kod = babu_kodolas(babu)
+        alapkod = ALAPKODOK[uj_kod]
+        regi_kod = alapkod + regi_tajolas % TAJOLASOK_SZAMA[alapkod]
+        mezo = x * self.meret + y
+        self.zobrist ^= zobrist_kulcs(mezo, regi_kod) ^ zobrist_kulcs(mezo, uj_kod)
+        self.valtozott_poziciok.add((x, y))
 
-        self.id = id
-        self.nehezseg = nehezseg
-        self.ido = eltelt_ido
 
+    def valtozasok_atvetele(self) -> list:
+        """
+        Visszaadja és törli a legutóbbi hívás óta módosított mezők pozícióit, például a
+        LezerKovetes.utvonal számára, hogy a lézerkövető ne vesse össze az egész táblát.
+
+        :return: A módosított mezők pozíciói.
+        :rtype: list[tuple]
+        """
+        valtozott = list(self.valtozott_poziciok)
+        self.valtozott_poziciok.clear()
 
+        return valtozott
 
-#innen jönnek a függvények
 
-def irany_inverter(lezer_irany: int) -> int:
+# A TomorTabla bájtjai: (aktiválva << 5) | (típus << 2) | tájolás
+TOMOR_TIPUSOK = (Ures, SpaceRock, Tukor, AteresztoTukor, Raketa)
+
+
+def babu_pakolas(babu: Babu) -> int:
     """
-    Megfordítja a megadott lézer irányát.
+    Egy bábut a TomorTabla egy bájtjába pakol (típus, tájolás és a rakéták aktiválási állapota).
 
-    :param lezer_irany: A lézer iránya (0, 1, 2 vagy 3).
-    :type lezer_irany: int
-    :return: Az irány megfordítva (0, 1, 2 vagy 3).
+    :param babu: A pakolandó bábu.
+    :type babu: Babu
+    :return: A bábu pakolt kódja (0-63).
     :rtype: int
     """
-    return (lezer_irany + 2) % 4
+    if isinstance(babu, Raketa):
+        return (babu.aktivalva << 5) | (4 << 2) | babu.tajolas
+    elif isinstance(babu, AteresztoTukor):
+        return (3 << 2) | babu.tajolas
+    elif isinstance(babu, Tukor):
+        return (2 << 2) | babu.tajolas
+    elif isinstance(babu, SpaceRock):
+        return (1 << 2) | babu.tajolas
 
+    return 0
 
-def lezer_kovetkezo_szamitas(pozicio: tuple, irany: int) -> tuple:
-    """
-    Kiszámítja a következő pozíciót a táblán a megadott lézer irány alapján.
 
-    :param pozicio: A kiinduló pozíció (x, y koordináták).
-    :param irany: A lézer iránya (0, 1, 2 vagy 3).
-    :type pozicio: tuple
-    :type irany: int
-    :return: Az új pozíció (x, y koordináták).
-    :rtype: tuple
+class _TomorNezet:
+    """
+    Egy TomorTabla mezőjére mutató bábunézet. A tájolás és az aktiválási állapot a tábla bájtjából
+    olvasódik és oda íródik vissza, a pozíció a mezőből adódik. A nézet csak addig érvényes,
+    amíg a mezőn ugyanaz a bábu áll.
     """
-    x, y = pozicio
 
-    if irany == 0:
+    __slots__ = ()
 
-        return (x - 1, y)
-    
-    elif irany == 1:
+    @property
+    def tipus(self) -> str:
+        return self._tipus_nev
 
-        return (x, y + 1)
-    
-    elif irany == 2:
+    @property
+    def pozicio(self) -> tuple:
+        return divmod(self._mezo, self._tabla.meret)
 
-        return (x + 1, y)
-    
-    elif irany == 3:
+    @property
+    def tajolas(self) -> int:
+        return self._tabla.kodok[self._mezo] & 3
 
-        return (x, y - 1)
+    @tajolas.setter
+    def tajolas(self, tajolas: int) -> None:
+        kodok = self._tabla.kodok
+        kodok[self._mezo] = (kodok[self._mezo] & ~3) | tajolas
 
 
-def lezer_irany_kiszamitas(jelenlegi_pozicio: tuple, elozo_pozicio: tuple) -> int or None:
-    """
-    Kiszámítja a lézer irányát két adott pozíció alapján a táblán.
+class UresNezet(_TomorNezet, Ures):
+    __slots__ = ("_tabla", "_mezo")
+    _tipus_nev = "Üres"
 
-    :param jelenlegi_pozicio: A jelenlegi pozíció (x, y koordináták).
-    :param elozo_pozicio: Az előző pozíció (x, y koordináták).
-    :type jelenlegi_pozicio: tuple
-    :type elozo_pozicio: tuple
-    :return: A lézer iránya (0, 1, 2 vagy 3) vagy None, ha az irány nem határozható meg.
-    :rtype: int or None
-    """
-    jelenlegi_x, jelenlegi_y = jelenlegi_pozicio
-    elozo_x, elozo_y = elozo_pozicio
+    def __init__(self, tabla: "TomorTabla", mezo: int) -> None:
+        self._tabla = tabla
+        self._mezo = mezo
 
-    if jelenlegi_x > elozo_x:
-        return 2  # Dél
-    
-    elif jelenlegi_x < elozo_x:
-        return 0  # Észak
-    
-    elif jelenlegi_y > elozo_y:
-        return 1  # Kelet
-    
-    elif jelenlegi_y < elozo_y:
-        return 3  # Nyugat
-    
-    return None
+    @property
+    def tajolas(self) -> None:
+        return None
 
 
+class SpaceRockNezet(_TomorNezet, SpaceRock):
+    __slots__ = ("_tabla", "_mezo")
+    _tipus_nev = "SpaceRock"
+    __init__ = UresNezet.__init__
 
-def lezer_utvonal(tabla: "Tabla", kezdo_pozicio = (1, 0), kezdo_irany = 1) -> dict:
-    """
-    Kiszámítja a lézer útvonalát a táblán a kezdő pozíció és irány alapján.
 
-    :param tabla: A tábla objektum.
-    :param kezdo_pozicio: A kezdő pozíció (x, y koordináták) (alapértelmezett: (1, 0)).
-    :param kezdo_irany: A kezdő lézer iránya (0, 1, 2 vagy 3) (alapértelmezett: 1).
-    :type tabla: Tabla
-    :type kezdo_pozicio: tuple
-    :type kezdo_irany: int
-    :return: Az útvonalak (fo_utvonal és ateresztett_utvonal) a pozíciók listájaként.
-    :rtype: dict
-    """
-    x, y = kezdo_pozicio
-    lezer_irany = kezdo_irany
-    utvonalak = {"fo_utvonal": [], "ateresztett_utvonal": []}
+class TukorNezet(_TomorNezet, Tukor):
+    __slots__ = ("_tabla", "_mezo")
+    _tipus_nev = "Tükör"
+    __init__ = UresNezet.__init__
 
-    while 0 <= x < 5 and 0 <= y < 5:
-        utvonalak["fo_utvonal"].append((x, y))
-        jatekbabu = tabla.melyik_babu((x, y))
 
-        if isinstance(jatekbabu, SpaceRock):
-            utvonalak["fo_utvonal"].append((x, y))
-            break
+class AteresztoTukorNezet(_TomorNezet, AteresztoTukor):
+    __slots__ = ("_tabla", "_mezo")
+    _tipus_nev = "ÁteresztőTükör"
+    __init__ = UresNezet.__init__
 
-        if isinstance(jatekbabu, Raketa):
-            utvonalak["fo_utvonal"].append((x, y))
-            if irany_inverter(lezer_irany) == jatekbabu.tajolas:
-                jatekbabu.aktivalva = True
-            break
 
-        if isinstance(jatekbabu, Tukor):
-            lezer_irany = jatekbabu.tukrozes(irany_inverter(lezer_irany))
+class RaketaNezet(_TomorNezet, Raketa):
+    __slots__ = ("_tabla", "_mezo")
+    _tipus_nev = "Rakéta"
+    __init__ = UresNezet.__init__
 
-        elif isinstance(jatekbabu, AteresztoTukor):
-            tukrozott_irany, ateresztett_irany = jatekbabu.tukrozes_ateresztes(irany_inverter(lezer_irany))
+    @property
+    def aktivalva(self) -> bool:
+        return bool(self._tabla.kodok[self._mezo] & 32)
 
-            # Az áteresztett lézer útvonalának kiszámítása
-            ateresztett_x, ateresztett_y = x, y
-            while 0 <= ateresztett_x < 5 and 0 <= ateresztett_y < 5:
-                ateresztett_jatekbabu = tabla.melyik_babu((ateresztett_x, ateresztett_y))
+    @aktivalva.setter
+    def aktivalva(self, aktivalva: bool) -> None:
+        kodok = self._tabla.kodok
+        kodok[self._mezo] = (kodok[self._mezo] & ~32) | (32 if aktivalva else 0)
 
-                if isinstance(ateresztett_jatekbabu, SpaceRock):
-                    utvonalak["ateresztett_utvonal"].append((ateresztett_x, ateresztett_y))
-                    break
 
-                if isinstance(ateresztett_jatekbabu, Raketa):
-                    utvonalak["ateresztett_utvonal"].append((ateresztett_x, ateresztett_y))
-                    if ateresztett_irany == ateresztett_jatekbabu.tajolas:
-                        ateresztett_jatekbabu.aktivalva = True
-                    break
+_NEZETEK = (UresNezet, SpaceRockNezet, TukorNezet, AteresztoTukorNezet, RaketaNezet)
 
-                if isinstance(ateresztett_jatekbabu, Tukor):
-                    ateresztett_irany = ateresztett_jatekbabu.tukrozes(irany_inverter(ateresztett_irany))
 
-                utvonalak["ateresztett_utvonal"].append((ateresztett_x, ateresztett_y))
-                ateresztett_x, ateresztett_y = lezer_kovetkezo_szamitas((ateresztett_x, ateresztett_y), irany_inverter(ateresztett_irany))
+class TomorTabla:
+    """
+    A Tabla tömör, bájttömbön alapuló változata: mezőnként egyetlen bájtban tárolja a bábu típusát,
+    tájolását és (rakétánál) az aktiválási állapotát, így egy tábla néhány tucat bájtot foglal.
+    A melyik_babu bábunézetet ad vissza, amely a megfelelő bábuosztály példánya, így a
+    lezer_utvonal, a get_raketak és a raketa_aktivalas_deaktivallas is használható vele.
+
+    :ivar kodok: A mezők pakolt kódjai sorfolytonosan (``x * meret + y`` indexeléssel).
+    :ivar meret: A tábla oldalhossza.
+    :type kodok: bytearray
+    :type meret: int
+    """
 
-            lezer_irany = tukrozott_irany
+    __slots__ = ("kodok", "meret")
 
-        x, y = lezer_kovetkezo_szamitas((x, y), lezer_irany)
+    def __init__(self, kodok: bytes = None, meret: int = None) -> None:
 
-    return utvonalak
+        if kodok is not None:
+            self.kodok = bytearray(kodok)
+            self.meret = math.isqrt(len(self.kodok)) if meret is None else meret
+        else:
+            self.meret = TABLA_MERET if meret is None else meret
+            self.kodok = bytearray(self.meret * self.meret)
 
 
-#Rakéta függvény kiegészítés
+    @classmethod
+    def tablabol(cls, tabla: Tabla) -> "TomorTabla":
+        """
+        Létrehozza egy objektumalapú tábla tömör másolatát.
 
-def get_raketak(tabla: Tabla) -> Raketa:
-    """
-    Visszaadja az összes rakétát a tábláról egy listában.
+        :param tabla: Az átalakítandó tábla.
+        :type tabla: Tabla
+        :return: A tömör tábla.
+        :rtype: TomorTabla
+        """
+        return cls(bytes(babu_pakolas(babu) for sor in tabla.matrix for babu in sor))
 
-    :param tabla: A tábla objektum.
-    :type tabla: Tabla
-    :return: A rakéták listája.
-    :rtype: list[Raketa]
-    """
-    raketak = []
-    for x in range(5):
-        for y in range(5):
-            piece = tabla.melyik_babu((x, y))
-            if isinstance(piece, Raketa):
-                raketak.append(piece)
-    return raketak
 
+    def tablava(self) -> Tabla:
+        """
+        Objektumalapú táblát készít a tömör táblából, önálló bábupéldányokkal.
 
-def raketa_aktivalas_deaktivallas(tabla, lezer_utvonalak) -> Tabla:
-    """
-    Frissíti az összes rakéta aktiválási állapotát a táblán a lézer útvonalak alapján.
+        :return: Az objektumalapú tábla.
+        :rtype: Tabla
+        """
+        tabla = Tabla(self.meret)
+        for mezo, kod in enumerate(self.kodok):
+            if kod:
+                pozicio = divmod(mezo, self.meret)
+                tipus = TOMOR_TIPUSOK[(kod >> 2) & 7]
+                babu = tipus(None, pozicio, kod & 3)
+                if tipus is Raketa:
+                    babu.aktivalva = bool(kod & 32)
+                tabla.babu_elhelyez(babu, pozicio)
 
-    :param tabla: A tábla objektum.
-    :param lezer_utvonalak: A lézer útvonalak eredménye.
-    :type tabla: Tabla
-    :type lezer_utvonalak: dict
-    :return: A frissített tábla objektum.
-    :rtype: Tabla
-    """
-    # Minden rakéta aktiválási állapotának frissítése.
-    for raketa in get_raketak(tabla):
-        raketa_aktivalva = False  # Alapértelmezetten feltételezzük, hogy a rakéta nem aktiválódik.
-
-        # Ellenőrizzük, hogy a rakéta benne van-e a fő útvonalban.
-        if raketa.pozicio in lezer_utvonalak['fo_utvonal']:
-            index = lezer_utvonalak['fo_utvonal'].index(raketa.pozicio)
-            if index > 0:
-                elozo_pozicio = lezer_utvonalak['fo_utvonal'][index - 1]
-                lezer_irany = lezer_irany_kiszamitas(raketa.pozicio, elozo_pozicio)
-                if irany_inverter(lezer_irany) == raketa.tajolas:
-                    raketa_aktivalva = True
-
-        # Hasonló logika az áteresztett útvonal esetén, ha van ilyen.
-        if 'ateresztett_utvonal' in lezer_utvonalak:
-            if raketa.pozicio in lezer_utvonalak['ateresztett_utvonal']:
-                index = lezer_utvonalak['ateresztett_utvonal'].index(raketa.pozicio)
-                if index > 0:
-                    elozo_pozicio = lezer_utvonalak['ateresztett_utvonal'][index - 1]
-                    lezer_irany = lezer_irany_kiszamitas(raketa.pozicio, elozo_pozicio)
-                    if irany_inverter(lezer_irany) == raketa.tajolas:
-                        raketa_aktivalva = True
-
-        # Frissítjük a rakéta aktiválási állapotát.
-        raketa.aktivalva = raketa_aktivalva
+        return tabla
 
-    return tabla
 
+    def masolat(self) -> "TomorTabla":
+        """
+        :return: A tábla független másolata.
+        :rtype: TomorTabla
+        """
+        return TomorTabla(self.kodok, self.meret)
 
-#Babus függvények
 
-def minden_babu_felhasznalva(tabla: Tabla, felhasznalhato_babuk: list) -> bool:
-    """
-    Ellenőrzi, hogy minden felhasználható bábu el lett-e helyezve a táblán.
+    @property
+    def matrix(self) -> list:
+        """
+        A Tabla.matrix megfelelője bábunézetekből (minden hozzáféréskor újonnan felépítve).
 
-    :param tabla: A tábla objektum.
-    :param felhasznalhato_babuk: A felhasználható bábuk listája.
-    :type tabla: Tabla
-    :type felhasznalhato_babuk: list
-    :return: True, ha minden bábu el van helyezve, különben False.
-    :rtype: bool
-    """
-    for babu in felhasznalhato_babuk:
-        if babu.pozicio == (None, None):
-            return False
-    return True
+        :rtype: list[list[Babu]]
+        """
+        return [[self.melyik_babu((x, y)) for y in range(self.meret)] for x in range(self.meret)]
 
 
-def interakcio_a_babukkal(tabla: Tabla, felhasznalhato_babuk: list) -> Tabla:
-    """
-    Kezeli a játékos interakcióját a felhasználható bábukkal a táblán.
+    def babu_elhelyez(self, babu: "Babu", pozicio: tuple) -> None:
+        """
+        Elhelyez egy bábut a megadott pozícióban a táblán. A bábu adatai bekerülnek a táblába,
+        a bábuobjektum nem kötődik hozzá.
 
-    :param tabla: A tábla objektum.
-    :param felhasznalhato_babuk: A felhasználható bábuk listája.
-    :type tabla: Tabla
-    :type felhasznalhato_babuk: list
-    :return: A frissített tábla objektum.
-    :rtype: Tabla
-    """
-    # Bábu kiválasztása
-    while True:
-        try:
-            valasztas = int(input("Add meg a bábu sorszámát: ")) - 1
-            if valasztas < 0 or valasztas >= len(felhasznalhato_babuk):
-                raise ValueError("Érvénytelen bábu sorszám.")
-            break
+        :param babu: Az elhelyezendő bábu.
+        :param pozicio: A bábu pozíciója a táblán (x, y koordináták).
+        :type babu: Babu
+        :type pozicio: tuple
+        """
+        x, y = pozicio
+        self.kodok[x * self.meret + y] = babu_pakolas(babu)
+
+
+    def babu_mozgatas(self, honnan: tuple, hova: tuple) -> None:
+        """
+        Mozgat egy bábut egyik pozícióból a másikba a táblán.
+
+        :param honnan: A bábu jelenlegi pozíciója.
+        :param hova: A cél pozíció, ahová a bábut mozgatni kell.
+        :type honnan: tuple
+        :type hova: tuple
+        """
+        honnan_x, honnan_y = honnan
+        hova_x, hova_y = hova
+        kodok = self.kodok
+        meret = self.meret
+        kodok[hova_x * meret + hova_y] = kodok[honnan_x * meret + honnan_y]
+        kodok[honnan_x * meret + honnan_y] = 0
+
+
+    def babu_torol(self, pozicio: tuple) -> None:
+        """
+        Eltávolít egy bábut a megadott pozícióból a táblán.
+
+        :param pozicio: A bábu pozíciója, amit eltávolítani kell.
+        :type pozicio: tuple
+        """
+        x, y = pozicio
+        self.kodok[x * self.meret + y] = 0
+
+
+    def melyik_babu(self, pozicio: tuple) -> "Babu":
+        """
+        Lekérdezi, hogy milyen bábu található a megadott pozícióban a táblán.
+
+        :param pozicio: A lekérdezni kívánt pozíció a táblán.
+        :type pozicio: tuple
+        :return: A mezőre mutató bábunézet.
+        :rtype: Babu
+        """
+        x, y = pozicio
+        mezo = x * self.meret + y
+
+        return _NEZETEK[(self.kodok[mezo] >> 2) & 7](self, mezo)
+
+
+class RitkaTabla:
+    """
+    A Tabla ritka változata nagy, többnyire üres táblákhoz: csak a foglalt mezőket tárolja, és soronként,
+    illetve oszloponként rendezetten nyilvántartja a bábuk koordinátáit, így a memóriaigény a bábuk
+    számával arányos. A ritka_lezer_szakaszok ezek alapján bináris kereséssel ugrik bábutól bábuig.
+
+    :ivar meret: A tábla oldalhossza.
+    :ivar babuk: A foglalt mezők pozíciójához rendelt bábuk.
+    :ivar sorok: Soronként a foglalt oszlopok rendezett listája.
+    :ivar oszlopok: Oszloponként a foglalt sorok rendezett listája.
+    :ivar lezerek: A pálya lézerforrásai (kezdő pozíció, kezdő irány) párokként.
+    :type meret: int
+    :type babuk: dict[tuple, Babu]
+    :type sorok: dict[int, list[int]]
+    :type oszlopok: dict[int, list[int]]
+    :type lezerek: list[tuple]
+    """
+
+    def __init__(self, meret: int = TABLA_MERET) -> None:
+
+        self.meret = meret
+        self.babuk = {}
+        self.sorok = {}
+        self.oszlopok = {}
+        self.lezerek = list(ALAP_LEZEREK)
+
+
+    @classmethod
+    def tablabol(cls, tabla: Tabla) -> "RitkaTabla":
+        """
+        Létrehozza egy objektumalapú tábla ritka megfelelőjét (a bábuobjektumok közösek).
+
+        :param tabla: Az átalakítandó tábla.
+        :type tabla: Tabla
+        :return: A ritka tábla.
+        :rtype: RitkaTabla
+        """
+        ritka = cls(tabla.meret)
+        ritka.lezerek = list(getattr(tabla, "lezerek", ALAP_LEZEREK))
+        for x, sor in enumerate(tabla.matrix):
+            for y, babu in enumerate(sor):
+                if not isinstance(babu, Ures):
+                    ritka.babu_elhelyez(babu, (x, y))
+
+        return ritka
+
+
+    @property
+    def matrix(self) -> list:
+        """
+        A Tabla.matrix megfelelője (minden hozzáféréskor újonnan felépítve, a mérettel négyzetesen nő).
+
+        :rtype: list[list[Babu]]
+        """
+        return [[self.melyik_babu((x, y)) for y in range(self.meret)] for x in range(self.meret)]
+
+
+    def babu_elhelyez(self, babu: "Babu", pozicio: tuple) -> None:
+        """
+        Elhelyez egy bábut a megadott pozícióban a táblán. Üres bábu elhelyezése a mező törlésével egyenértékű.
+
+        :param babu: Az elhelyezendő bábu.
+        :param pozicio: A bábu pozíciója a táblán (x, y koordináták).
+        :type babu: Babu
+        :type pozicio: tuple
+        """
+        if isinstance(babu, Ures):
+            self.babu_torol(pozicio)
+            return
+
+        x, y = pozicio
+        if pozicio not in self.babuk:
+            insort(self.sorok.setdefault(x, []), y)
+            insort(self.oszlopok.setdefault(y, []), x)
+        self.babuk[pozicio] = babu
+
+
+    def babu_mozgatas(self, honnan: tuple, hova: tuple) -> None:
+        """
+        Mozgat egy bábut egyik pozícióból a másikba a táblán.
+
+        :param honnan: A bábu jelenlegi pozíciója.
+        :param hova: A cél pozíció, ahová a bábut mozgatni kell.
+        :type honnan: tuple
+        :type hova: tuple
+        """
+        jatekbabu = self.babuk.get(honnan)
+
+        if jatekbabu is not None:
+            self.babu_torol(honnan)
+            self.babu_elhelyez(jatekbabu, hova)
+            jatekbabu.mozgatas(hova)
+
+
+    def babu_torol(self, pozicio: tuple) -> None:
+        """
+        Eltávolít egy bábut a megadott pozícióból a táblán.
+
+        :param pozicio: A bábu pozíciója, amit eltávolítani kell.
+        :type pozicio: tuple
+        """
+        if self.babuk.pop(pozicio, None) is None:
+            return
+
+        x, y = pozicio
+        sor, oszlop = self.sorok[x], self.oszlopok[y]
+        del sor[bisect_left(sor, y)]
+        del oszlop[bisect_left(oszlop, x)]
+
+
+    def melyik_babu(self, pozicio: tuple) -> "Babu":
+        """
+        Lekérdezi, hogy milyen bábu található a megadott pozícióban a táblán.
+
+        :param pozicio: A lekérdezni kívánt pozíció a táblán.
+        :type pozicio: tuple
+        :return: A pozícióban található bábu (üres mezőn egy új Ures bábu).
+        :rtype: Babu
+        """
+        babu = self.babuk.get(pozicio)
+
+        return babu if babu is not None else Ures(pozicio)
+
+
+    def kovetkezo_babu(self, pozicio: tuple, irany: int) -> tuple or None:
+        """
+        Bináris kereséssel megkeresi a pozíciótól az adott irányban legközelebbi foglalt mezőt.
+
+        :param pozicio: A kiinduló pozíció (x, y koordináták), ezt magát nem vizsgálja.
+        :param irany: A keresés iránya (0, 1, 2 vagy 3).
+        :type pozicio: tuple
+        :type irany: int
+        :return: A legközelebbi foglalt mező pozíciója, vagy None, ha arra nincs több bábu.
+        :rtype: tuple or None
+        """
+        x, y = pozicio
+        if irany % 2:
+            sor = self.sorok.get(x, ())
+            index = bisect_right(sor, y) if irany == 1 else bisect_left(sor, y) - 1
+            return (x, sor[index]) if 0 <= index < len(sor) else None
+
+        oszlop = self.oszlopok.get(y, ())
+        index = bisect_right(oszlop, x) if irany == 2 else bisect_left(oszlop, x) - 1
+        return (oszlop[index], y) if 0 <= index < len(oszlop) else None
+
+
+class TeljesitettPalya:
+    """
+    A TeljesitettPalya osztály egy teljesített pálya adatait tárolja, beleértve a pálya azonosítóját, nehézségi szintjét,
+    és az eltelt időt. Ez az osztály a játékos profiljában kerül felhasználásra a teljesített pályák nyilvántartásához.
+
+    :ivar id: A pálya azonosítója.
+    :ivar nehezseg: A pálya nehézségi szintje.
+    :ivar ido: A pálya teljesítéséhez szükséges idő másodpercben.
+    :type id: int
+    :type nehezseg: str
+    :type ido: int
+    """
+
+    def __init__(self, id, nehezseg, eltelt_ido) -> None:
+
+        self.id = id
+        self.nehezseg = nehezseg
+        self.ido = eltelt_ido
+
+
+class KatalogusBejegyzes:
+    """
+    Egy pálya katalógusadatai, amelyekhez a pálya beolvasása nem szükséges.
+
+    :ivar id: A pálya azonosítója.
+    :ivar nehezseg: A pálya nehézségi szintje.
+    :ivar fix_babuk: A fix bábuk száma.
+    :ivar felhasznalhato_babuk: A felhasználható bábuk száma.
+    :ivar hely: A pálya elérési útvonala vagy csomaghivatkozása.
+    """
+
+    __slots__ = ("id", "nehezseg", "fix_babuk", "felhasznalhato_babuk", "hely")
+
+    def __init__(self, id: int, nehezseg: str, fix_babuk: int, felhasznalhato_babuk: int, hely: str) -> None:
+
+        self.id = id
+        self.nehezseg = nehezseg
+        self.fix_babuk = fix_babuk
+        self.felhasznalhato_babuk = felhasznalhato_babuk
+        self.hely = hely
+
+
+class PalyaKatalogus:
+    """
+    Az összes elérhető pálya indexe azonosító szerint. A pályákat azonosító szerint és nehézség
+    szerint rendezve is tárolja, és játékosonként megjegyzi, meddig jutott az azonosító szerinti
+    sorrendben, így a következő még nem teljesített pálya keresése amortizáltan állandó idejű.
+
+    :ivar bejegyzesek: Pálya azonosító -> KatalogusBejegyzes.
+    """
+
+    def __init__(self) -> None:
+
+        self.bejegyzesek = {}
+        self._azonositok = []   # Azonosító szerint rendezve
+        self._nehezseg_szerint = []   # (nehézségi sorszám, azonosító) párok rendezve
+        self._mutatok = {}   # Gamertag -> index az _azonositok listában
+
+
+    def __len__(self) -> int:
+        return len(self.bejegyzesek)
+
+
+    def __contains__(self, palya_id: int) -> bool:
+        return palya_id in self.bejegyzesek
+
+
+    def __getitem__(self, palya_id: int) -> KatalogusBejegyzes:
+        return self.bejegyzesek[palya_id]
+
+
+    def hozzaadas(self, bejegyzes: KatalogusBejegyzes) -> None:
+        """
+        Felveszi (vagy lecseréli) a pályát a katalógusban.
+
+        :param bejegyzes: A pálya katalógusadatai.
+        :type bejegyzes: KatalogusBejegyzes
+        """
+        regi = self.bejegyzesek.get(bejegyzes.id)
+        if regi is not None:
+            self._nehezseg_szerint.remove((self._nehezsegi_sorszam(regi.nehezseg), regi.id))
+        else:
+            insort(self._azonositok, bejegyzes.id)
+            self._mutatok.clear()   # Egy korábbi azonosítójú új pálya előrébb kerülhet
+
+        self.bejegyzesek[bejegyzes.id] = bejegyzes
+        insort(self._nehezseg_szerint, (self._nehezsegi_sorszam(bejegyzes.nehezseg), bejegyzes.id))
+
+
+    @staticmethod
+    def _nehezsegi_sorszam(nehezseg: str) -> int:
+        """
+        :param nehezseg: A nehézségi szint neve.
+        :type nehezseg: str
+        :return: A nehézségi szint helye a NEHEZSEGEK sorrendjében; az ismeretlen szintek a végére kerülnek.
+        :rtype: int
+        """
+        try:
+            return list(NEHEZSEGEK).index(nehezseg)
+        except ValueError:
+            return len(NEHEZSEGEK)
+
+
+    def azonositok(self) -> list:
+        """
+        :return: A pályák azonosítói növekvő sorrendben.
+        :rtype: list[int]
+        """
+        return list(self._azonositok)
+
+
+    def nehezseg_szerint(self, nehezseg: str = None):
+        """
+        Bejárja a pályákat nehézség, azon belül azonosító szerint.
+
+        :param nehezseg: Ha meg van adva, csak az ilyen nehézségű pályákat adja vissza.
+        :type nehezseg: str
+        :return: A pályák katalógusadatai.
+        :rtype: Iterator[KatalogusBejegyzes]
+        """
+        if nehezseg is None:
+            kezdet, veg = 0, len(self._nehezseg_szerint)
+        else:
+            sorszam = self._nehezsegi_sorszam(nehezseg)
+            kezdet = bisect_left(self._nehezseg_szerint, (sorszam,))
+            veg = bisect_left(self._nehezseg_szerint, (sorszam + 1,))
+
+        for index in range(kezdet, veg):
+            yield self.bejegyzesek[self._nehezseg_szerint[index][1]]
+
+
+    def kovetkezo_nyitott(self, gamertag: str, teljesitett) -> KatalogusBejegyzes or None:
+        """
+        Megkeresi az azonosító szerinti első olyan pályát, amelyet a játékos még nem teljesített.
+        Mivel a teljesített pályák köre csak bővül, a keresés a játékos előző találatától folytatódik.
+
+        :param gamertag: A játékos felhasználóneve.
+        :param teljesitett: A játékos által teljesített pályák azonosítói (tartalmazásvizsgálattal).
+        :type gamertag: str
+        :type teljesitett: set or dict
+        :return: A következő pálya katalógusadatai, vagy None, ha minden pálya teljesítve van.
+        :rtype: KatalogusBejegyzes or None
+        """
+        index = self._mutatok.get(gamertag, 0)
+        while index < len(self._azonositok) and self._azonositok[index] in teljesitett:
+            index += 1
+        self._mutatok[gamertag] = index
+
+        if index == len(self._azonositok):
+            return None
+
+        return self.bejegyzesek[self._azonositok[index]]
+
+
+PALYA_KATALOGUS = PalyaKatalogus()   # A fajlkezeles.katalogus_betoltese tölti fel
+
+
+
+#innen jönnek a függvények
+
+def irany_inverter(lezer_irany: int) -> int:
+    """
+    Megfordítja a megadott lézer irányát.
+
+    :param lezer_irany: A lézer iránya (0, 1, 2 vagy 3).
+    :type lezer_irany: int
+    :return: Az irány megfordítva (0, 1, 2 vagy 3).
+    :rtype: int
+    """
+    return (lezer_irany + 2) % 4
+
+
+def lezer_kovetkezo_szamitas(pozicio: tuple, irany: int) -> tuple:
+    """
+    Kiszámítja a következő pozíciót a táblán a megadott lézer irány alapján.
+
+    :param pozicio: A kiinduló pozíció (x, y koordináták).
+    :param irany: A lézer iránya (0, 1, 2 vagy 3).
+    :type pozicio: tuple
+    :type irany: int
+    :return: Az új pozíció (x, y koordináták).
+    :rtype: tuple
+    """
+    x, y = pozicio
+
+    if irany == 0:
+
+        return (x - 1, y)
+    
+    elif irany == 1:
+
+        return (x, y + 1)
+    
+    elif irany == 2:
+
+        return (x + 1, y)
+    
+    elif irany == 3:
+
+        return (x, y - 1)
+
+
+def lezer_irany_kiszamitas(jelenlegi_pozicio: tuple, elozo_pozicio: tuple) -> int or None:
+    """
+    Kiszámítja a lézer irányát két adott pozíció alapján a táblán.
+
+    :param jelenlegi_pozicio: A jelenlegi pozíció (x, y koordináták).
+    :param elozo_pozicio: Az előző pozíció (x, y koordináták).
+    :type jelenlegi_pozicio: tuple
+    :type elozo_pozicio: tuple
+    :return: A lézer iránya (0, 1, 2 vagy 3) vagy None, ha az irány nem határozható meg.
+    :rtype: int or None
+    """
+    jelenlegi_x, jelenlegi_y = jelenlegi_pozicio
+    elozo_x, elozo_y = elozo_pozicio
+
+    if jelenlegi_x > elozo_x:
+        return 2  # Dél
+    
+    elif jelenlegi_x < elozo_x:
+        return 0  # Észak
+    
+    elif jelenlegi_y > elozo_y:
+        return 1  # Kelet
+    
+    elif jelenlegi_y < elozo_y:
+        return 3  # Nyugat
+    
+    return None
+
+
+
+def lezer_utvonal(tabla: "Tabla", kezdo_pozicio = (1, 0), kezdo_irany = 1) -> dict:
+    """
+    Kiszámítja a lézer útvonalát a táblán a kezdő pozíció és irány alapján. A táblát nem módosítja,
+    így több szálból is hívható ugyanarra a táblára; a rakéták aktiválását a
+    raketa_aktivalas_deaktivallas végzi a raketa_talalatok alapján.
+
+    :param tabla: A tábla objektum.
+    :param kezdo_pozicio: A kezdő pozíció (x, y koordináták) (alapértelmezett: (1, 0)).
+    :param kezdo_irany: A kezdő lézer iránya (0, 1, 2 vagy 3) (alapértelmezett: 1).
+    :type tabla: Tabla
+    :type kezdo_pozicio: tuple
+    :type kezdo_irany: int
+    :return: Az útvonalak (fo_utvonal és ateresztett_utvonal) a pozíciók listájaként, valamint a
+             raketa_talalatok szótár, amely minden eltalált rakéta pozíciójához a becsapódó lézerek
+             haladási irányait rendeli.
+    :rtype: dict
+    """
+    meret = tabla.meret
+    x, y = kezdo_pozicio
+    lezer_irany = kezdo_irany
+    utvonalak = {"fo_utvonal": [], "ateresztett_utvonal": [], "raketa_talalatok": {}}
+
+    while 0 <= x < meret and 0 <= y < meret:
+        utvonalak["fo_utvonal"].append((x, y))
+        jatekbabu = tabla.melyik_babu((x, y))
+
+        if isinstance(jatekbabu, SpaceRock):
+            utvonalak["fo_utvonal"].append((x, y))
+            break
+
+        if isinstance(jatekbabu, Raketa):
+            if len(utvonalak["fo_utvonal"]) > 1:  # A kezdőmezőn álló rakétába nem csapódik be a lézer
+                utvonalak["raketa_talalatok"].setdefault((x, y), []).append(lezer_irany)
+            utvonalak["fo_utvonal"].append((x, y))
+            break
+
+        if isinstance(jatekbabu, Tukor):
+            lezer_irany = jatekbabu.tukrozes(irany_inverter(lezer_irany))
+
+        elif isinstance(jatekbabu, AteresztoTukor):
+            tukrozott_irany, ateresztett_irany = jatekbabu.tukrozes_ateresztes(irany_inverter(lezer_irany))
+
+            # Az áteresztett lézer útvonalának kiszámítása
+            ateresztett_x, ateresztett_y = x, y
+            while 0 <= ateresztett_x < meret and 0 <= ateresztett_y < meret:
+                ateresztett_jatekbabu = tabla.melyik_babu((ateresztett_x, ateresztett_y))
+
+                if isinstance(ateresztett_jatekbabu, SpaceRock):
+                    utvonalak["ateresztett_utvonal"].append((ateresztett_x, ateresztett_y))
+                    break
+
+                if isinstance(ateresztett_jatekbabu, Raketa):
+                    utvonalak["ateresztett_utvonal"].append((ateresztett_x, ateresztett_y))
+                    utvonalak["raketa_talalatok"].setdefault((ateresztett_x, ateresztett_y), []).append(irany_inverter(ateresztett_irany))
+                    break
+
+                if isinstance(ateresztett_jatekbabu, Tukor):
+                    ateresztett_irany = ateresztett_jatekbabu.tukrozes(irany_inverter(ateresztett_irany))
+
+                utvonalak["ateresztett_utvonal"].append((ateresztett_x, ateresztett_y))
+                ateresztett_x, ateresztett_y = lezer_kovetkezo_szamitas((ateresztett_x, ateresztett_y), irany_inverter(ateresztett_irany))
+
+            lezer_irany = tukrozott_irany
+
+        x, y = lezer_kovetkezo_szamitas((x, y), lezer_irany)
+
+    return utvonalak
+
+
+#Táblázatos lézerkövetés
+
+# Mezőkódok: a tükröknél csak a tájolás paritása számít, a rakétáknál a teljes tájolás.
+URES_KOD = 0
+SPACEROCK_KOD = 1
+TUKOR_KOD = 2         # 2, 3
+ATERESZTO_KOD = 4     # 4, 5
+RAKETA_KOD = 6        # 6, 7, 8, 9
+KODOK_SZAMA = 10
+
+# A mezőkódhoz tartozó típus alapkódja, illetve az egymástól megkülönböztethető tájolások száma típusonként.
+ALAPKODOK = (URES_KOD, SPACEROCK_KOD, TUKOR_KOD, TUKOR_KOD, ATERESZTO_KOD, ATERESZTO_KOD,
+             RAKETA_KOD, RAKETA_KOD, RAKETA_KOD, RAKETA_KOD)
+TAJOLASOK_SZAMA = {URES_KOD: 1, SPACEROCK_KOD: 1, TUKOR_KOD: 2, ATERESZTO_KOD: 2, RAKETA_KOD: 4}
+
+
+def _atmenet_tablak() -> tuple:
+    """
+    Előre kiszámítja a (mezőkód, haladási irány) -> kimenő irány átmeneteket a fő és az áteresztett lézerhez.
+    A táblák indexe ``kod * 4 + irany``, a -1 érték a lézer megállását jelenti.
+
+    :return: A fő útvonal és az áteresztett útvonal átmenettáblája.
+    :rtype: tuple
+    """
+    tukor_paros, tukor_paratlan = Tukor("Tükör", None, 0), Tukor("Tükör", None, 1)
+    fo_atmenetek = []
+    ateresztett_atmenetek = []
+
+    for kod in range(KODOK_SZAMA):
+        for irany in range(4):
+            if kod == URES_KOD:
+                fo, ateresztett = irany, irany
+            elif kod == SPACEROCK_KOD or kod >= RAKETA_KOD:
+                fo, ateresztett = -1, -1
+            elif kod < ATERESZTO_KOD:
+                tukor = tukor_paratlan if kod - TUKOR_KOD else tukor_paros
+                fo = ateresztett = tukor.tukrozes(irany_inverter(irany))
+            else:
+                # Az ÁteresztőTükör a fő lézert tükrözi, az áteresztett lézer számára átlátszó.
+                tukor = tukor_paratlan if kod - ATERESZTO_KOD else tukor_paros
+                fo, ateresztett = tukor.tukrozes(irany_inverter(irany)), irany
+
+            fo_atmenetek.append(fo)
+            ateresztett_atmenetek.append(ateresztett)
+
+    return tuple(fo_atmenetek), tuple(ateresztett_atmenetek)
+
+
+def _szomszed_tabla(meret: int) -> tuple:
+    """
+    Előre kiszámítja minden mező szomszédját mind a négy irányban egy ``meret x meret`` méretű táblán.
+    A tábla indexe ``mezo * 4 + irany``, a -1 érték a táblán kívüli szomszédot jelenti.
+
+    :param meret: A tábla oldalhossza.
+    :type meret: int
+    :return: A szomszédok indexeinek táblája.
+    :rtype: tuple
+    """
+    szomszedok = []
+    for x in range(meret):
+        for y in range(meret):
+            for irany in range(4):
+                kov_x, kov_y = lezer_kovetkezo_szamitas((x, y), irany)
+                if 0 <= kov_x < meret and 0 <= kov_y < meret:
+                    szomszedok.append(kov_x * meret + kov_y)
+                else:
+                    szomszedok.append(-1)
+
+    return tuple(szomszedok)
+
+
+FO_ATMENETEK, ATERESZTETT_ATMENETEK = _atmenet_tablak()
+# A TomorTabla pakolt kódjaiból a mezőkódokra fordító tábla (bytes.translate-hez).
+TOMOR_KOVETO_KODOK = bytes(
+    (URES_KOD, SPACEROCK_KOD, TUKOR_KOD + kod % 2, ATERESZTO_KOD + kod % 2, RAKETA_KOD + kod % 4)[(kod >> 2) & 7]
+    if (kod >> 2) & 7 < 5 else URES_KOD
+    for kod in range(256)
+)
+SZOMSZEDOK = _szomszed_tabla(TABLA_MERET)
+MEZO_POZICIOK = tuple((x, y) for x in range(TABLA_MERET) for y in range(TABLA_MERET))
+_MERET_TABLAK = {TABLA_MERET: (SZOMSZEDOK, MEZO_POZICIOK)}
+
+
+def meret_tablak(meret: int) -> tuple:
+    """
+    Visszaadja egy ``meret x meret`` méretű tábla szomszédtábláját és mezőpozícióit (az alapméretnél
+    a SZOMSZEDOK és a MEZO_POZICIOK). A táblák méretenként egyszer számolódnak ki.
+
+    :param meret: A tábla oldalhossza.
+    :type meret: int
+    :return: A szomszédtábla és a mezőindexekhez tartozó pozíciók.
+    :rtype: tuple[tuple, tuple]
+    """
+    tablak = _MERET_TABLAK.get(meret)
+    if tablak is None:
+        tablak = (_szomszed_tabla(meret), tuple((x, y) for x in range(meret) for y in range(meret)))
+        _MERET_TABLAK[meret] = tablak
+
+    return tablak
+
+
+def kodok_merete(kodok: list) -> int:
+    """
+    :param kodok: Egy négyzetes tábla mezőkódjai.
+    :type kodok: list[int]
+    :return: A tábla oldalhossza.
+    :rtype: int
+    """
+    return math.isqrt(len(kodok))
+
+
+def babu_kodolas(babu: Babu) -> int:
+    """
+    Visszaadja a bábu mezőkódját a táblázatos lézerkövetéshez.
+
+    :param babu: A kódolandó bábu.
+    :type babu: Babu
+    :return: A bábu mezőkódja.
+    :rtype: int
+    """
+    if isinstance(babu, Tukor):
+        return TUKOR_KOD + babu.tajolas % 2
+    elif isinstance(babu, AteresztoTukor):
+        return ATERESZTO_KOD + babu.tajolas % 2
+    elif isinstance(babu, Raketa):
+        return RAKETA_KOD + babu.tajolas
+    elif isinstance(babu, SpaceRock):
+        return SPACEROCK_KOD
+
+    return URES_KOD
+
+
+def tabla_kodolas(tabla: Tabla) -> list:
+    """
+    A táblát mezőkódok sorfolytonos listájává alakítja. A lista egyszer elkészíthető,
+    és utána tetszőleges számú lézerkövetéshez felhasználható.
+
+    :param tabla: A tábla objektum.
+    :type tabla: Tabla
+    :return: A mezőkódok listája (``x * meret + y`` indexeléssel).
+    :rtype: list[int]
+    """
+    if isinstance(tabla, TomorTabla):
+        return list(tabla.kodok.translate(TOMOR_KOVETO_KODOK))
+    if isinstance(tabla, RitkaTabla):
+        kodok = [URES_KOD] * (tabla.meret * tabla.meret)
+        for (x, y), babu in tabla.babuk.items():
+            kodok[x * tabla.meret + y] = babu_kodolas(babu)
+        return kodok
+
+    return [babu_kodolas(babu) for sor in tabla.matrix for babu in sor]
+
+
+def kodolt_lezer_utvonal(kodok: list, kezdo_pozicio = (1, 0), kezdo_irany = 1) -> dict:
+    """
+    Kiszámítja a lézer útvonalát egy kódolt táblán az előre kiszámított átmenettáblák segítségével.
+    Az eredmény megegyezik a lezer_utvonal eredményével.
+    Egy lézer legfeljebb ``4 * mezőszám`` lépést tesz meg, így a körbeérő lézer sem okoz végtelen ciklust.
+
+    :param kodok: A tábla mezőkódjai (lásd tabla_kodolas).
+    :param kezdo_pozicio: A kezdő pozíció (x, y koordináták) (alapértelmezett: (1, 0)).
+    :param kezdo_irany: A kezdő lézer iránya (0, 1, 2 vagy 3) (alapértelmezett: 1).
+    :type kodok: list[int]
+    :type kezdo_pozicio: tuple
+    :type kezdo_irany: int
+    :return: Az útvonalak (fo_utvonal és ateresztett_utvonal) és a raketa_talalatok (lásd lezer_utvonal).
+    :rtype: dict
+    """
+    fo_atmenetek, ateresztett_atmenetek = FO_ATMENETEK, ATERESZTETT_ATMENETEK
+    meret = kodok_merete(kodok)
+    szomszedok, poziciok = meret_tablak(meret)
+    fo_utvonal = []
+    ateresztett_utvonal = []
+    raketa_talalatok = {}
+
+    x, y = kezdo_pozicio
+    mezo = x * meret + y if 0 <= x < meret and 0 <= y < meret else -1
+    irany = kezdo_irany
+    lepes_korlat = len(kodok) * 4
+    lepesek = 0
+
+    while mezo >= 0 and lepesek < lepes_korlat:
+        lepesek += 1
+        kod = kodok[mezo]
+        fo_utvonal.append(poziciok[mezo])
+        uj_irany = fo_atmenetek[kod * 4 + irany]
+
+        if uj_irany < 0:
+            if kod >= RAKETA_KOD and lepesek > 1:
+                raketa_talalatok.setdefault(poziciok[mezo], []).append(irany)
+            fo_utvonal.append(poziciok[mezo])
+            break
+
+        if kod >= ATERESZTO_KOD:
+            # Az áteresztett lézer az ÁteresztőTükör mezőjéből indul az eredeti irányban.
+            ateresztett_mezo, ateresztett_irany = mezo, irany
+            ateresztett_lepesek = 0
+            while ateresztett_mezo >= 0 and ateresztett_lepesek < lepes_korlat:
+                ateresztett_lepesek += 1
+                ateresztett_utvonal.append(poziciok[ateresztett_mezo])
+                ateresztett_kod = kodok[ateresztett_mezo]
+                if ateresztett_kod >= RAKETA_KOD:
+                    raketa_talalatok.setdefault(poziciok[ateresztett_mezo], []).append(ateresztett_irany)
+                ateresztett_irany = ateresztett_atmenetek[ateresztett_kod * 4 + ateresztett_irany]
+                if ateresztett_irany < 0:
+                    break
+                ateresztett_mezo = szomszedok[ateresztett_mezo * 4 + ateresztett_irany]
+
+        irany = uj_irany
+        mezo = szomszedok[mezo * 4 + irany]
+
+    return {"fo_utvonal": fo_utvonal, "ateresztett_utvonal": ateresztett_utvonal, "raketa_talalatok": raketa_talalatok}
+
+
+def lezer_utvonal_tablazatos(tabla: Tabla, kezdo_pozicio = (1, 0), kezdo_irany = 1) -> dict:
+    """
+    A lezer_utvonal táblázatos változata: a táblát mezőkódokká alakítja, majd kodolt_lezer_utvonal
+    segítségével követi a lézert. A rakéták aktiválását a raketa_aktivalas_deaktivallas végzi.
+
+    :param tabla: A tábla objektum.
+    :param kezdo_pozicio: A kezdő pozíció (x, y koordináták) (alapértelmezett: (1, 0)).
+    :param kezdo_irany: A kezdő lézer iránya (0, 1, 2 vagy 3) (alapértelmezett: 1).
+    :type tabla: Tabla
+    :type kezdo_pozicio: tuple
+    :type kezdo_irany: int
+    :return: Az útvonalak (fo_utvonal és ateresztett_utvonal) és a raketa_talalatok (lásd lezer_utvonal).
+    :rtype: dict
+    """
+    return kodolt_lezer_utvonal(tabla_kodolas(tabla), kezdo_pozicio, kezdo_irany)
+
+
+def kodolt_lezerek_utvonala(kodok: list, lezerek = ALAP_LEZEREK) -> dict:
+    """
+    Egyetlen menetben követi a pálya összes lézerforrásának lézerét a kodolt_lezer_utvonal szabályai szerint.
+    A lézerek közösen tartják nyilván a bejárt (mező, irány) állapotokat (a fő és az áteresztett
+    lézerekét külön), így ahol egy lézer egy korábban bejárt állapotba ér, ott megáll, mert a folytatása
+    már szerepel az eredményben. A követés így a források számától függetlenül legfeljebb ``8 * mezőszám``
+    lépés, plusz lézerenként a megállító mező.
+
+    :param kodok: A tábla mezőkódjai (lásd tabla_kodolas).
+    :param lezerek: A lézerforrások (kezdő pozíció, kezdő irány) párjai.
+    :type kodok: list[int]
+    :type lezerek: list[tuple]
+    :return: Az összes forrás fő útvonala egymás után (fo_utvonal), az áteresztett útvonalak egymás után
+             (ateresztett_utvonal) és az összesített raketa_talalatok (lásd lezer_utvonal).
+    :rtype: dict
+    """
+    fo_atmenetek, ateresztett_atmenetek = FO_ATMENETEK, ATERESZTETT_ATMENETEK
+    meret = kodok_merete(kodok)
+    szomszedok, poziciok = meret_tablak(meret)
+    fo_utvonal = []
+    ateresztett_utvonal = []
+    raketa_talalatok = {}
+    # A fő lézer állapotai a [0, 4 * mezőszám), az áteresztetteké a [4 * mezőszám, 8 * mezőszám) tartományban.
+    ateresztett_eltolas = len(kodok) * 4
+    bejart = bytearray(ateresztett_eltolas * 2)
+
+    for (x, y), irany in lezerek:
+        if not (0 <= x < meret and 0 <= y < meret):
+            continue
+        mezo = x * meret + y
+        kezdo_mezo = mezo
+
+        while mezo >= 0:
+            kod = kodok[mezo]
+            uj_irany = fo_atmenetek[kod * 4 + irany]
+            if uj_irany < 0:
+                # A megállító mezőknek nincs folytatása, ezeket nem jelöljük bejártnak: egy másik
+                # forrás lézere is becsapódhat ugyanígy (például egy kezdőmezőn álló rakétába).
+                if kod >= RAKETA_KOD and mezo != kezdo_mezo:
+                    raketa_talalatok.setdefault(poziciok[mezo], []).append(irany)
+                fo_utvonal.append(poziciok[mezo])
+                fo_utvonal.append(poziciok[mezo])
+                break
+
+            allapot = mezo * 4 + irany
+            if bejart[allapot]:
+                break
+            bejart[allapot] = 1
+            fo_utvonal.append(poziciok[mezo])
+
+            if kod >= ATERESZTO_KOD:
+                ateresztett_mezo, ateresztett_irany = mezo, irany
+                while ateresztett_mezo >= 0:
+                    allapot = ateresztett_eltolas + ateresztett_mezo * 4 + ateresztett_irany
+                    if bejart[allapot]:
+                        break
+                    bejart[allapot] = 1
+
+                    ateresztett_utvonal.append(poziciok[ateresztett_mezo])
+                    ateresztett_kod = kodok[ateresztett_mezo]
+                    if ateresztett_kod >= RAKETA_KOD:
+                        raketa_talalatok.setdefault(poziciok[ateresztett_mezo], []).append(ateresztett_irany)
+                    ateresztett_irany = ateresztett_atmenetek[ateresztett_kod * 4 + ateresztett_irany]
+                    if ateresztett_irany < 0:
+                        break
+                    ateresztett_mezo = szomszedok[ateresztett_mezo * 4 + ateresztett_irany]
+
+            irany = uj_irany
+            mezo = szomszedok[mezo * 4 + irany]
+
+    return {"fo_utvonal": fo_utvonal, "ateresztett_utvonal": ateresztett_utvonal, "raketa_talalatok": raketa_talalatok}
+
+
+def lezerek_utvonala(tabla: Tabla) -> dict:
+    """
+    A tábla összes lézerforrásának együttes útvonala (lásd kodolt_lezerek_utvonala).
+
+    :param tabla: A tábla objektum.
+    :type tabla: Tabla
+    :return: Az útvonalak (fo_utvonal és ateresztett_utvonal) és a raketa_talalatok.
+    :rtype: dict
+    """
+    return kodolt_lezerek_utvonala(tabla_kodolas(tabla), getattr(tabla, "lezerek", ALAP_LEZEREK))
+
+
+class LezerKovetes:
+    """
+    Egy táblához tartozó, növekményesen frissülő lézerkövető. Megőrzi az utolsó követés lépéseit és azt,
+    hogy melyik mezőt hányadik lépésben érintette először a lézer. Változás után csak az első olyan
+    lépéstől követi újra a lézert, amely megváltozott mezőt érint; ha a lézer egyik megváltozott mezőt
+    sem érinti, az előző eredményt adja vissza. Az eredmény mindig megegyezik a kodolt_lezer_utvonal eredményével.
+
+    :ivar tabla: A követett tábla.
+    :ivar kezdo_pozicio: A lézer kezdő pozíciója.
+    :ivar kezdo_irany: A lézer kezdő iránya.
+    """
+
+    def __init__(self, tabla: Tabla, kezdo_pozicio = (1, 0), kezdo_irany = 1) -> None:
+        self.tabla = tabla
+        self.kezdo_pozicio = kezdo_pozicio
+        self.kezdo_irany = kezdo_irany
+        self._kodok = tabla_kodolas(tabla)
+        self._fo_utvonal = []
+        self._ateresztett_utvonal = []
+        self._lepesek = []       # A lépések előtti követési állapotok
+        self._elso_lepes = {}    # mező -> az első őt érintő lépés indexe
+        self._talalatok = []     # (lépés indexe, rakéta pozíciója, becsapódó lézer iránya)
+        self._szomszedok, self._poziciok = meret_tablak(tabla.meret)
+
+        meret = tabla.meret
+        x, y = kezdo_pozicio
+        mezo = x * meret + y if 0 <= x < meret and 0 <= y < meret else -1
+        self._kovetes((mezo, kezdo_irany, False, -1, 0, 0, 0))
+
+
+    def _kovetes(self, allapot: tuple) -> None:
+        """
+        Folytatja a lézer követését a megadott állapotból, és minden lépés előtt elmenti az állapotot.
+
+        :param allapot: (mező, irány, áteresztett-e, a fő lézer folytatásának mezője és iránya,
+                        a fő és az áteresztett lézer lépésszáma).
+        :type allapot: tuple
+        """
+        mezo, irany, ateresztett, fo_mezo, fo_irany, fo_lepesek, ateresztett_lepesek = allapot
+        kodok, poziciok, szomszedok = self._kodok, self._poziciok, self._szomszedok
+        fo_utvonal, ateresztett_utvonal = self._fo_utvonal, self._ateresztett_utvonal
+        lepesek, elso_lepes, talalatok = self._lepesek, self._elso_lepes, self._talalatok
+        lepes_korlat = len(kodok) * 4
+
+        while True:
+            if ateresztett and (mezo < 0 or ateresztett_lepesek >= lepes_korlat):
+                # Az áteresztett lézer véget ért, a fő lézer folytatódik.
+                ateresztett = False
+                mezo, irany = fo_mezo, fo_irany
+            if not ateresztett and (mezo < 0 or fo_lepesek >= lepes_korlat):
+                break
+
+            elso_lepes.setdefault(mezo, len(lepesek))
+            lepesek.append((mezo, irany, ateresztett, fo_mezo, fo_irany, fo_lepesek, ateresztett_lepesek,
+                            len(fo_utvonal), len(ateresztett_utvonal)))
+            kod = kodok[mezo]
+
+            if ateresztett:
+                ateresztett_lepesek += 1
+                ateresztett_utvonal.append(poziciok[mezo])
+                if kod >= RAKETA_KOD:
+                    talalatok.append((len(lepesek) - 1, poziciok[mezo], irany))
+                irany = ATERESZTETT_ATMENETEK[kod * 4 + irany]
+                mezo = szomszedok[mezo * 4 + irany] if irany >= 0 else -1
+                continue
+
+            fo_lepesek += 1
+            fo_utvonal.append(poziciok[mezo])
+            uj_irany = FO_ATMENETEK[kod * 4 + irany]
+            if uj_irany < 0:
+                if kod >= RAKETA_KOD and fo_lepesek > 1:
+                    talalatok.append((len(lepesek) - 1, poziciok[mezo], irany))
+                fo_utvonal.append(poziciok[mezo])
+                break
+
+            if kod >= ATERESZTO_KOD:
+                # Az áteresztett lézer az ÁteresztőTükör mezőjéből indul az eredeti irányban.
+                fo_mezo, fo_irany = szomszedok[mezo * 4 + uj_irany], uj_irany
+                ateresztett = True
+                ateresztett_lepesek = 0
+            else:
+                irany = uj_irany
+                mezo = szomszedok[mezo * 4 + irany]
+
+
+    def utvonal(self, valtozott_poziciok = None) -> dict:
+        """
+        Visszaadja a lézer aktuális útvonalát. Ha a valtozott_poziciok meg van adva, csak ezeket a mezőket
+        kódolja újra, különben az egész táblát összeveti az előző állapottal.
+
+        :param valtozott_poziciok: Az utolsó hívás óta megváltozott pozíciók (például egy mozgatás
+                                   kiinduló és cél pozíciója), vagy None.
+        :type valtozott_poziciok: list[tuple] or None
+        :return: Az útvonalak (fo_utvonal és ateresztett_utvonal) és a raketa_talalatok (lásd lezer_utvonal).
+        :rtype: dict
+        """
+        kodok = self._kodok
+        matrix = self.tabla.matrix
+
+        if valtozott_poziciok is None:
+            mezok = range(len(kodok))
+        else:
+            mezok = [x * self.tabla.meret + y for x, y in valtozott_poziciok]
+
+        elso_valtozas = len(self._lepesek)
+        for mezo in mezok:
+            x, y = self._poziciok[mezo]
+            uj_kod = babu_kodolas(matrix[x][y])
+            if uj_kod != kodok[mezo]:
+                kodok[mezo] = uj_kod
+                elso_valtozas = min(elso_valtozas, self._elso_lepes.get(mezo, elso_valtozas))
+
+        if elso_valtozas < len(self._lepesek):
+            allapot = self._lepesek[elso_valtozas]
+            del self._lepesek[elso_valtozas:]
+            del self._fo_utvonal[allapot[7]:]
+            del self._ateresztett_utvonal[allapot[8]:]
+            self._elso_lepes = {mezo: lepes for mezo, lepes in self._elso_lepes.items() if lepes < elso_valtozas}
+            self._talalatok = [talalat for talalat in self._talalatok if talalat[0] < elso_valtozas]
+            self._kovetes(allapot[:7])
+
+        raketa_talalatok = {}
+        for _, pozicio, lezer_irany in self._talalatok:
+            raketa_talalatok.setdefault(pozicio, []).append(lezer_irany)
+
+        return {"fo_utvonal": list(self._fo_utvonal), "ateresztett_utvonal": list(self._ateresztett_utvonal),
+                "raketa_talalatok": raketa_talalatok}
+
+
+#Lézerfa
+
+def kodolt_lezerek_fa(kodok: list, lezerek = ALAP_LEZEREK) -> dict:
+    """
+    Munkalistás lézerkövetés tetszőleges számú ÁteresztőTükörrel és lézerforrással: minden lézer, amely
+    ÁteresztőTükörbe ütközik, tükröződve halad tovább, az áteresztett ága pedig új lézerként kerül a
+    munkalistára, így az áteresztett lézerek is tovább ágazhatnak. A források és az ágak közösen tartják
+    nyilván a bejárt (mező, irány) állapotokat egy jelzőtömbben, az ilyen állapotba érkező lézer megáll,
+    így egy követés legfeljebb ``4 * mezőszám`` lépés (plusz lézerenként a megállító mező), és a körbeérő
+    vagy egymást átfedő lézerek sem okoznak ismételt munkát.
+
+    :param kodok: A tábla mezőkódjai (lásd tabla_kodolas).
+    :param lezerek: A lézerforrások (kezdő pozíció, kezdő irány) párjai.
+    :type kodok: list[int]
+    :type lezerek: list[tuple]
+    :return: A források lézereinek útvonala egymás után (fo_utvonal), az ágak útvonalai egymás után
+             (ateresztett_utvonal), valamint a raketa_talalatok (lásd lezer_utvonal).
+    :rtype: dict
+    """
+    fo_atmenetek, alapkodok = FO_ATMENETEK, ALAPKODOK
+    meret = kodok_merete(kodok)
+    szomszedok, poziciok = meret_tablak(meret)
+    fo_utvonal = []
+    agak = []
+    raketa_talalatok = {}
+    bejart = bytearray(len(kodok) * 4)
+
+    # Munkalista: (mező, irány, az ág útvonala, kezdőmező); az ágak útvonala az ÁteresztőTükör mezőjével
+    # kezdődik, kezdőmezőjük nincs (-1). A forrásokat fordított sorrendben tesszük fel, így sorban futnak.
+    munkalista = []
+    for (x, y), irany in reversed(lezerek):
+        if 0 <= x < meret and 0 <= y < meret:
+            munkalista.append((x * meret + y, irany, fo_utvonal, x * meret + y))
+
+    while munkalista:
+        mezo, irany, utvonal, kezdo_mezo = munkalista.pop()
+
+        while mezo >= 0:
+            kod = kodok[mezo]
+            uj_irany = fo_atmenetek[kod * 4 + irany]
+            if uj_irany < 0:
+                # A megállító mezőknek nincs folytatása, ezeket nem jelöljük bejártnak: egy másik
+                # lézer is becsapódhat ugyanígy (például egy kezdőmezőn álló rakétába).
+                if kod >= RAKETA_KOD and mezo != kezdo_mezo:
+                    raketa_talalatok.setdefault(poziciok[mezo], []).append(irany)
+                utvonal.append(poziciok[mezo])
+                break
+
+            allapot = mezo * 4 + irany
+            if bejart[allapot]:
+                break
+            bejart[allapot] = 1
+            utvonal.append(poziciok[mezo])
+
+            if alapkodok[kod] == ATERESZTO_KOD:
+                ag = [poziciok[mezo]]
+                agak.append(ag)
+                munkalista.append((szomszedok[mezo * 4 + irany], irany, ag, -1))
+
+            kezdo_mezo = -1
+            irany = uj_irany
+            mezo = szomszedok[mezo * 4 + irany]
+
+    return {
+        "fo_utvonal": fo_utvonal,
+        "ateresztett_utvonal": [pozicio for ag in agak for pozicio in ag],
+        "raketa_talalatok": raketa_talalatok,
+    }
+
+
+def kodolt_lezer_fa(kodok: list, kezdo_pozicio = (1, 0), kezdo_irany = 1) -> dict:
+    """
+    Egyetlen lézerforrás lézerfája (lásd kodolt_lezerek_fa).
+
+    :param kodok: A tábla mezőkódjai (lásd tabla_kodolas).
+    :param kezdo_pozicio: A kezdő pozíció (x, y koordináták) (alapértelmezett: (1, 0)).
+    :param kezdo_irany: A kezdő lézer iránya (0, 1, 2 vagy 3) (alapértelmezett: 1).
+    :type kodok: list[int]
+    :type kezdo_pozicio: tuple
+    :type kezdo_irany: int
+    :return: A kezdő lézer útvonala (fo_utvonal), az ágak útvonalai egymás után (ateresztett_utvonal),
+             valamint a raketa_talalatok (lásd lezer_utvonal).
+    :rtype: dict
+    """
+    return kodolt_lezerek_fa(kodok, ((kezdo_pozicio, kezdo_irany),))
+
+
+def lezerek_fa(tabla: Tabla) -> dict:
+    """
+    A tábla összes lézerforrásának lézerfája (lásd kodolt_lezerek_fa).
+
+    :param tabla: A tábla objektum.
+    :type tabla: Tabla
+    :return: Az útvonalak (fo_utvonal és ateresztett_utvonal) és a raketa_talalatok.
+    :rtype: dict
+    """
+    return kodolt_lezerek_fa(tabla_kodolas(tabla), getattr(tabla, "lezerek", ALAP_LEZEREK))
+
+
+def elagazo_palya(tabla: Tabla, felhasznalhato_babuk: list) -> bool:
+    """
+    Eldönti, hogy a pályán egynél több ÁteresztőTükör lehet-e egyszerre, azaz az áteresztett lézerek is
+    elágazhatnak. A betöltött pályán hívandó: a táblán ekkor csak a fix bábuk állnak.
+
+    :param tabla: A betöltött tábla objektum.
+    :param felhasznalhato_babuk: A felhasználható bábuk listája.
+    :type tabla: Tabla
+    :type felhasznalhato_babuk: list
+    :return: True, ha a fix és a felhasználható ÁteresztőTükrök együtt egynél többen vannak.
+    :rtype: bool
+    """
+    if isinstance(tabla, RitkaTabla):
+        fix_babuk = list(tabla.babuk.values())
+    else:
+        fix_babuk = [tabla.melyik_babu((x, y)) for x in range(tabla.meret) for y in range(tabla.meret)]
+    felhasznalhatok = set(map(id, felhasznalhato_babuk))
+    darab = sum(isinstance(babu, AteresztoTukor) for babu in felhasznalhato_babuk)
+    darab += sum(isinstance(babu, AteresztoTukor) and id(babu) not in felhasznalhatok for babu in fix_babuk)
+    return darab > 1
+
+
+def lezer_fa(tabla: Tabla, kezdo_pozicio = (1, 0), kezdo_irany = 1) -> dict:
+    """
+    A kodolt_lezer_fa megfelelője objektumalapú táblára.
+
+    :param tabla: A tábla objektum.
+    :param kezdo_pozicio: A kezdő pozíció (x, y koordináták) (alapértelmezett: (1, 0)).
+    :param kezdo_irany: A kezdő lézer iránya (0, 1, 2 vagy 3) (alapértelmezett: 1).
+    :type tabla: Tabla
+    :type kezdo_pozicio: tuple
+    :type kezdo_irany: int
+    :return: Az útvonalak és a raketa_talalatok (lásd kodolt_lezer_fa).
+    :rtype: dict
+    """
+    return kodolt_lezer_fa(tabla_kodolas(tabla), kezdo_pozicio, kezdo_irany)
+
+
+#Ritka tábla szakaszos követése
+
+def _szel_pozicio(pozicio: tuple, irany: int, meret: int) -> tuple:
+    """
+    :param pozicio: A kiinduló pozíció (x, y koordináták).
+    :param irany: A haladási irány (0, 1, 2 vagy 3).
+    :param meret: A tábla oldalhossza.
+    :type pozicio: tuple
+    :type irany: int
+    :type meret: int
+    :return: A pozíció sorának vagy oszlopának utolsó mezője az adott irányban.
+    :rtype: tuple
+    """
+    x, y = pozicio
+
+    return ((0, y), (x, meret - 1), (meret - 1, y), (x, 0))[irany]
+
+
+def ritka_lezer_szakaszok(tabla: RitkaTabla, kezdo_pozicio = None, kezdo_irany = 1) -> dict:
+    """
+    Bábutól bábuig ugorva követi a lézert egy ritka táblán, így a követés ideje a lézer által érintett
+    bábuk számával arányos, nem a tábla méretével. A szabályok a lezer_utvonal szabályai; az útvonalak
+    cellalisták helyett (kezdő mező, utolsó mező, irány) szakaszokként adódnak vissza. Egy lézer
+    legfeljebb ``4 * (bábuk száma + 1)`` bábut érint, így a körbeérő lézer is véget ér.
+    Kezdő pozíció nélkül a tábla összes lézerforrását követi, a szakaszaikat a források sorrendjében
+    egymás után adva vissza (mint a kodolt_lezerek_utvonala).
+
+    :param tabla: A ritka tábla.
+    :param kezdo_pozicio: Egyetlen lézer kezdő pozíciója (x, y koordináták), vagy None a tábla lézerforrásaihoz (alapértelmezett: None).
+    :param kezdo_irany: Az egyetlen lézer kezdő iránya (0, 1, 2 vagy 3) (alapértelmezett: 1).
+    :type tabla: RitkaTabla
+    :type kezdo_pozicio: tuple | None
+    :type kezdo_irany: int
+    :return: A fo_szakaszok és az ateresztett_szakaszok listája, valamint a raketa_talalatok (lásd lezer_utvonal).
+    :rtype: dict
+    """
+    lezerek = tabla.lezerek if kezdo_pozicio is None else [(kezdo_pozicio, kezdo_irany)]
+    fo_szakaszok = []
+    ateresztett_szakaszok = []
+    raketa_talalatok = {}
+
+    for pozicio, irany in lezerek:
+        _ritka_lezer_kovetes(tabla, pozicio, irany, fo_szakaszok, ateresztett_szakaszok, raketa_talalatok)
+
+    return {"fo_szakaszok": fo_szakaszok, "ateresztett_szakaszok": ateresztett_szakaszok,
+            "raketa_talalatok": raketa_talalatok}
+
+
+def _ritka_lezer_kovetes(tabla: RitkaTabla, kezdo_pozicio: tuple, kezdo_irany: int, fo_szakaszok: list,
+                         ateresztett_szakaszok: list, raketa_talalatok: dict) -> None:
+    """
+    Egyetlen lézerforrás követése a ritka_lezer_szakaszok szabályai szerint; a szakaszokat és a
+    rakétatalálatokat a megadott gyűjtőkbe írja.
+
+    :param tabla: A ritka tábla.
+    :param kezdo_pozicio: A kezdő pozíció (x, y koordináták).
+    :param kezdo_irany: A kezdő lézer iránya (0, 1, 2 vagy 3).
+    :param fo_szakaszok: A fő szakaszok gyűjtője.
+    :param ateresztett_szakaszok: Az áteresztett szakaszok gyűjtője.
+    :param raketa_talalatok: A rakétatalálatok gyűjtője.
+    :type tabla: RitkaTabla
+    :type kezdo_pozicio: tuple
+    :type kezdo_irany: int
+    :type fo_szakaszok: list
+    :type ateresztett_szakaszok: list
+    :type raketa_talalatok: dict
+    """
+    meret, babuk = tabla.meret, tabla.babuk
+    lepes_korlat = 4 * (len(babuk) + 1)
+
+    x, y = kezdo_pozicio
+    if not (0 <= x < meret and 0 <= y < meret):
+        return
+
+    pozicio, irany = kezdo_pozicio, kezdo_irany
+    szakasz_kezdete = pozicio
+    babu = babuk.get(pozicio)
+    lepesek = 0
+
+    while True:
+        if babu is not None:
+            lepesek += 1
+            kod = babu_kodolas(babu)
+            uj_irany = FO_ATMENETEK[kod * 4 + irany]
+            if uj_irany < 0:
+                if kod >= RAKETA_KOD and pozicio != kezdo_pozicio:  # A kezdőmezőn álló rakétába nem csapódik be a lézer
+                    raketa_talalatok.setdefault(pozicio, []).append(irany)
+                fo_szakaszok.append((szakasz_kezdete, pozicio, irany))
+                break
+
+            if ALAPKODOK[kod] == ATERESZTO_KOD:
+                _ateresztett_szakaszok(tabla, pozicio, irany, lepes_korlat, ateresztett_szakaszok, raketa_talalatok)
+
+            if uj_irany != irany:
+                fo_szakaszok.append((szakasz_kezdete, pozicio, irany))
+                szakasz_kezdete, irany = pozicio, uj_irany
+
+            if lepesek >= lepes_korlat:
+                fo_szakaszok.append((szakasz_kezdete, pozicio, irany))
+                break
+
+        kovetkezo = tabla.kovetkezo_babu(pozicio, irany)
+        if kovetkezo is None:
+            fo_szakaszok.append((szakasz_kezdete, _szel_pozicio(pozicio, irany, meret), irany))
+            break
+        pozicio, babu = kovetkezo, babuk[kovetkezo]
+
+
+def _ateresztett_szakaszok(tabla: RitkaTabla, pozicio: tuple, irany: int, lepes_korlat: int,
+                           szakaszok: list, raketa_talalatok: dict) -> None:
+    """
+    Követi az ÁteresztőTükör mezőjéből az eredeti irányban induló áteresztett lézert (amely számára az
+    ÁteresztőTükrök átlátszók), és a szakaszait, rakétatalálatait a megadott gyűjtőkbe írja.
+
+    :param tabla: A ritka tábla.
+    :param pozicio: Az ÁteresztőTükör pozíciója.
+    :param irany: A beérkező lézer haladási iránya.
+    :param lepes_korlat: Az érinthető bábuk legnagyobb száma.
+    :param szakaszok: Az áteresztett szakaszok gyűjtője.
+    :param raketa_talalatok: A rakétatalálatok gyűjtője.
+    :type tabla: RitkaTabla
+    :type pozicio: tuple
+    :type irany: int
+    :type lepes_korlat: int
+    :type szakaszok: list
+    :type raketa_talalatok: dict
+    """
+    babuk = tabla.babuk
+    szakasz_kezdete = pozicio
+    lepesek = 0
+
+    while lepesek < lepes_korlat:
+        kovetkezo = tabla.kovetkezo_babu(pozicio, irany)
+        if kovetkezo is None:
+            szakaszok.append((szakasz_kezdete, _szel_pozicio(pozicio, irany, tabla.meret), irany))
+            return
+        pozicio = kovetkezo
+        kod = babu_kodolas(babuk[pozicio])
+        lepesek += 1
+
+        uj_irany = ATERESZTETT_ATMENETEK[kod * 4 + irany]
+        if uj_irany < 0:
+            if kod >= RAKETA_KOD:
+                raketa_talalatok.setdefault(pozicio, []).append(irany)
+            szakaszok.append((szakasz_kezdete, pozicio, irany))
+            return
+        if uj_irany != irany:
+            szakaszok.append((szakasz_kezdete, pozicio, irany))
+            szakasz_kezdete, irany = pozicio, uj_irany
+
+    szakaszok.append((szakasz_kezdete, pozicio, irany))
+
+
+def szakasz_mezok(szakasz: tuple) -> list:
+    """
+    Egy szakasz mezőinek listája a kezdő mezőtől az utolsóig (például megjelenítéshez).
+
+    :param szakasz: (kezdő mező, utolsó mező, irány).
+    :type szakasz: tuple
+    :return: A szakasz mezői a lézer haladási sorrendjében.
+    :rtype: list[tuple]
+    """
+    (x, y), (veg_x, veg_y), _ = szakasz
+    lepes_x = (veg_x > x) - (veg_x < x)
+    lepes_y = (veg_y > y) - (veg_y < y)
+    hossz = max(abs(veg_x - x), abs(veg_y - y))
+
+    return [(x + i * lepes_x, y + i * lepes_y) for i in range(hossz + 1)]
+
+
+#Bitboard
+
+# A bitboard az alapméretű (TABLA_MERET x TABLA_MERET) táblákhoz készült: a sugármaszkok mérete
+# a mezőszám négyzetével nő, ezért nagy táblákon a táblázatos követés használható. Más méretű
+# táblából a kodok_bitboard nem készít bitboardot.
+
+def _sugar_maszkok(meret: int) -> tuple:
+    """
+    Előre kiszámítja minden mezőre és irányra azoknak a mezőknek a bitmaszkját, amelyek a mezőtől
+    (kizárólag) a tábla széléig esnek az adott irányban, vagyis a sor- és oszlopsugarakat.
+
+    :param meret: A tábla oldalhossza.
+    :type meret: int
+    :return: A sugármaszkok táblája ``mezo * 4 + irany`` indexeléssel.
+    :rtype: tuple
+    """
+    sugarak = []
+    for x in range(meret):
+        for y in range(meret):
+            for irany in range(4):
+                maszk = 0
+                kov_x, kov_y = lezer_kovetkezo_szamitas((x, y), irany)
+                while 0 <= kov_x < meret and 0 <= kov_y < meret:
+                    maszk |= 1 << (kov_x * meret + kov_y)
+                    kov_x, kov_y = lezer_kovetkezo_szamitas((kov_x, kov_y), irany)
+                sugarak.append(maszk)
+
+    return tuple(sugarak)
+
+
+SUGARAK = _sugar_maszkok(TABLA_MERET)
+TELJES_MASZK = (1 << (TABLA_MERET * TABLA_MERET)) - 1
+_KOD_TIPUSOK = {SPACEROCK_KOD: SpaceRock, TUKOR_KOD: Tukor, ATERESZTO_KOD: AteresztoTukor, RAKETA_KOD: Raketa}
+
+
+def kodok_bitboard(kodok: list) -> tuple:
+    """
+    A mezőkódokból bitboardot készít: mezőkódonként egy egész számot, amelynek ``x * 5 + y`` bitje
+    jelzi, hogy az (x, y) mezőn ilyen kódú bábu áll. A bitboard hashelhető, így közvetlenül
+    használható szótárkulcsként (például transzpozíciós táblában).
+
+    :param kodok: A tábla mezőkódjai.
+    :type kodok: list[int]
+    :return: KODOK_SZAMA elemű tuple, az i. elem az i kódú mezők maszkja.
+    :rtype: tuple[int]
+    :raises ValueError: Ha a tábla nem TABLA_MERET x TABLA_MERET méretű.
+    """
+    if len(kodok) != TABLA_MERET * TABLA_MERET:
+        raise ValueError(f"A bitboard csak {TABLA_MERET}x{TABLA_MERET}-ös táblákhoz használható.")
+
+    maszkok = [0] * KODOK_SZAMA
+    for mezo, kod in enumerate(kodok):
+        maszkok[kod] |= 1 << mezo
+
+    return tuple(maszkok)
+
+
+def tabla_bitboard(tabla: Tabla) -> tuple:
+    """
+    A táblát bitboarddá alakítja (lásd kodok_bitboard). A tükrök tájolásából csak a paritás marad meg.
+
+    :param tabla: A tábla objektum.
+    :type tabla: Tabla
+    :return: A tábla bitboardja.
+    :rtype: tuple[int]
+    :raises ValueError: Ha a tábla nem TABLA_MERET x TABLA_MERET méretű.
+    """
+    return kodok_bitboard(tabla_kodolas(tabla))
+
+
+def bitboard_kodok(bitboard: tuple) -> list:
+    """
+    A bitboardból visszaállítja a mezőkódok listáját.
+
+    :param bitboard: A tábla bitboardja.
+    :type bitboard: tuple[int]
+    :return: A tábla mezőkódjai.
+    :rtype: list[int]
+    """
+    kodok = [URES_KOD] * (TABLA_MERET * TABLA_MERET)
+    for kod in range(1, KODOK_SZAMA):
+        maszk = bitboard[kod]
+        while maszk:
+            legalso = maszk & -maszk
+            kodok[legalso.bit_length() - 1] = kod
+            maszk ^= legalso
+
+    return kodok
+
+
+def bitboard_tabla(bitboard: tuple) -> Tabla:
+    """
+    A bitboardból objektumalapú táblát készít. A tükrök tájolása 0 vagy 1 lesz (a paritásuk szerint).
+
+    :param bitboard: A tábla bitboardja.
+    :type bitboard: tuple[int]
+    :return: Az objektumalapú tábla.
+    :rtype: Tabla
+    """
+    tabla = Tabla()
+    for mezo, kod in enumerate(bitboard_kodok(bitboard)):
+        if kod != URES_KOD:
+            alapkod = ALAPKODOK[kod]
+            pozicio = MEZO_POZICIOK[mezo]
+            tabla.babu_elhelyez(_KOD_TIPUSOK[alapkod](None, pozicio, kod - alapkod), pozicio)
+
+    return tabla
+
+
+def _legkozelebbi_mezo(maszk: int, irany: int) -> int:
+    """
+    Visszaadja a maszk azon mezőjét, amely a megadott irányban haladva a legközelebb van.
+    Keletre és délre a mezőindex nő (legalsó bit), északra és nyugatra csökken (legfelső bit).
+    """
+    if irany == 1 or irany == 2:
+        return (maszk & -maszk).bit_length() - 1
+
+    return maszk.bit_length() - 1
+
+
+def bitboard_lezer_kovetes(bitboard: tuple, kezdo_pozicio = (1, 0), kezdo_irany = 1) -> tuple:
+    """
+    Bitboardon követi a lézert: az üres mezőkön nem lépked végig, hanem a sor- és oszlopsugarak
+    és a foglalt mezők maszkja alapján egyből a következő bábuhoz ugrik. Az ÁteresztőTükröket az
+    áteresztett lézer a lezer_utvonal szabályai szerint átlátszónak tekinti. A rakéták aktiválása
+    a raketa_aktivalas_deaktivallas szabályait követi.
+
+    :param bitboard: A tábla bitboardja.
+    :param kezdo_pozicio: A kezdő pozíció (x, y koordináták) (alapértelmezett: (1, 0)).
+    :param kezdo_irany: A kezdő lézer iránya (0, 1, 2 vagy 3) (alapértelmezett: 1).
+    :type bitboard: tuple[int]
+    :type kezdo_pozicio: tuple
+    :type kezdo_irany: int
+    :return: Az aktivált rakéták és a lézer által érintett mezők bitmaszkja.
+    :rtype: tuple[int, int]
+    """
+    sugarak = SUGARAK
+    foglalt = TELJES_MASZK & ~bitboard[URES_KOD]
+    foglalt_ateresztett = foglalt & ~(bitboard[ATERESZTO_KOD] | bitboard[ATERESZTO_KOD + 1])
+    lepes_korlat = TABLA_MERET * TABLA_MERET * 4
+
+    aktivalt = 0
+    megvilagitott = 0
+
+    x, y = kezdo_pozicio
+    if not (0 <= x < TABLA_MERET and 0 <= y < TABLA_MERET):
+        return aktivalt, megvilagitott
+
+    # Állapot: a lézer az adott mezőn tartózkodik, és (ha a mezőn bábu áll) abba az irányba érkezett.
+    mezo, irany = x * TABLA_MERET + y, kezdo_irany
+    megvilagitott |= 1 << mezo
+    lepesek = 0
+    elso = True
+
+    while lepesek < lepes_korlat:
+        bit = 1 << mezo
+        if foglalt & bit:
+            kod = 1
+            while not bitboard[kod] & bit:
+                kod += 1
+            lepesek += 1
+            uj_irany = FO_ATMENETEK[kod * 4 + irany]
+            if uj_irany < 0:
+                if kod >= RAKETA_KOD and not elso and irany_inverter(irany) == kod - RAKETA_KOD:
+                    aktivalt |= bit
+                break
+
+            if kod >= ATERESZTO_KOD:
+                # Az áteresztett lézer az ÁteresztőTükörön át az eredeti irányban halad tovább.
+                ateresztett_mezo, ateresztett_irany = mezo, irany
+                ateresztett_lepesek = 0
+                while ateresztett_lepesek < lepes_korlat:
+                    sugar = sugarak[ateresztett_mezo * 4 + ateresztett_irany]
+                    cel = sugar & foglalt_ateresztett
+                    if not cel:
+                        megvilagitott |= sugar
+                        break
+                    ateresztett_mezo = _legkozelebbi_mezo(cel, ateresztett_irany)
+                    megvilagitott |= sugar & ~sugarak[ateresztett_mezo * 4 + ateresztett_irany]
+                    ateresztett_lepesek += 1
+
+                    bit = 1 << ateresztett_mezo
+                    ateresztett_kod = 1
+                    while not bitboard[ateresztett_kod] & bit:
+                        ateresztett_kod += 1
+                    uj_ateresztett_irany = ATERESZTETT_ATMENETEK[ateresztett_kod * 4 + ateresztett_irany]
+                    if uj_ateresztett_irany < 0:
+                        if ateresztett_kod >= RAKETA_KOD and irany_inverter(ateresztett_irany) == ateresztett_kod - RAKETA_KOD:
+                            aktivalt |= bit
+                        break
+                    ateresztett_irany = uj_ateresztett_irany
+
+            irany = uj_irany
+
+        elso = False
+        sugar = sugarak[mezo * 4 + irany]
+        cel = sugar & foglalt
+        if not cel:
+            megvilagitott |= sugar
+            break
+        mezo = _legkozelebbi_mezo(cel, irany)
+        megvilagitott |= sugar & ~sugarak[mezo * 4 + irany]
+
+    return aktivalt, megvilagitott
+
+
+#Zobrist-hash és lézer gyorsítótár
+
+def _zobrist_kulcsok(mezok_szama: int) -> tuple:
+    """
+    Rögzített seedből előállítja a (mező, mezőkód) párokhoz tartozó 64 bites véletlen kulcsokat.
+    Az üres mező kulcsa 0, így az üres tábla hashe 0.
+
+    :param mezok_szama: A tábla mezőinek száma.
+    :type mezok_szama: int
+    :return: A kulcsok táblája ``mezo * KODOK_SZAMA + kod`` indexeléssel.
+    :rtype: tuple[int]
+    """
+    generator = random.Random(0x1A5E2)
+
+    return tuple(0 if kod == URES_KOD else generator.getrandbits(64)
+                 for _ in range(mezok_szama) for kod in range(KODOK_SZAMA))
+
+
+ZOBRIST_KULCSOK = _zobrist_kulcsok(TABLA_MERET * TABLA_MERET)
+
+
+def zobrist_kulcs(mezo: int, kod: int) -> int:
+    """
+    Nagyobb táblák mezőihez a kulcstáblát bővíti; a rögzített seed miatt a meglévő kulcsok nem változnak.
+
+    :param mezo: A mező indexe (``x * meret + y``).
+    :param kod: A mezőn álló bábu mezőkódja.
+    :type mezo: int
+    :type kod: int
+    :return: A (mező, mezőkód) pár Zobrist-kulcsa.
+    :rtype: int
+    """
+    global ZOBRIST_KULCSOK
+    if mezo * KODOK_SZAMA >= len(ZOBRIST_KULCSOK):
+        ZOBRIST_KULCSOK = _zobrist_kulcsok(max(mezo + 1, 2 * len(ZOBRIST_KULCSOK) // KODOK_SZAMA))
+
+    return ZOBRIST_KULCSOK[mezo * KODOK_SZAMA + kod]
+
+
+def tabla_zobrist(tabla: Tabla) -> int:
+    """
+    Nulláról kiszámítja a tábla Zobrist-hashét. A Tabla.zobrist ezzel mindig megegyezik.
+    Mivel a hash a mezőkódokon alapul, a lézer szempontjából egyenértékű táblák (például
+    180 fokkal elforgatott tükör) hashe azonos.
+
+    :param tabla: A tábla objektum.
+    :type tabla: Tabla
+    :return: A tábla Zobrist-hashe.
+    :rtype: int
+    """
+    return kodok_zobrist(tabla_kodolas(tabla))
+
+
+def kodok_zobrist(kodok: list) -> int:
+    """
+    :param kodok: A tábla mezőkódjai (lásd tabla_kodolas).
+    :type kodok: list[int]
+    :return: A kódolt tábla Zobrist-hashe (lásd tabla_zobrist).
+    :rtype: int
+    """
+    zobrist = 0
+    for mezo, kod in enumerate(kodok):
+        zobrist ^= zobrist_kulcs(mezo, kod)
+
+    return zobrist
+
+
+class LezerGyorsitotar:
+    """
+    Korlátos méretű LRU gyorsítótár, amely a tábla méretéhez, lézerforrásaihoz és Zobrist-hashéhez a lézerek
+    útvonalát és az aktivált rakéták pozícióit rendeli. Ugyanarra az állásra visszatérve nem kell újra
+    követni a lézereket. A bejegyzés a kódolt táblát is tárolja, és találatkor összeveti vele az aktuálisat,
+    így két állás hashének 64 bites ütközése sem ad hibás eredményt.
+
+    :ivar meret: A tárolt állások legnagyobb száma.
+    :ivar talalatok: A gyorsítótárból kiszolgált lekérdezések száma.
+    :ivar hianyok: A lézerkövetést igénylő lekérdezések száma.
+    """
+
+    def __init__(self, meret: int = 4096) -> None:
+        self.meret = meret
+        self.talalatok = 0
+        self.hianyok = 0
+        self._tarolo = OrderedDict()
+
+
+    def __len__(self) -> int:
+        return len(self._tarolo)
+
+
+    def lekerdezes(self, tabla: Tabla) -> tuple:
+        """
+        Visszaadja a tábla lézerforrásainak együttes útvonalát és az aktivált rakéták pozícióit, szükség
+        esetén kiszámítva.
+
+        :param tabla: A tábla objektum (a meret, a lezerek és a Zobrist-hashe a kulcs; a zobrist attribútum
+                      nélküli táblák, például a TomorTabla és a RitkaTabla hashét a kódjaiból számítja).
+        :type tabla: Tabla or TomorTabla or RitkaTabla
+        :return: Az útvonalak (lásd kodolt_lezerek_utvonala) és az aktivált rakéták pozícióinak halmaza.
+        :rtype: tuple[dict, frozenset]
+        """
+        lezerek = tuple(getattr(tabla, "lezerek", ALAP_LEZEREK))
+        kodok = tabla_kodolas(tabla)
+        kodolt = bytes(kodok)
+        zobrist = getattr(tabla, "zobrist", None)
+        if zobrist is None:
+            zobrist = kodok_zobrist(kodok)
+        # Az üres tábla hashe mérettől függetlenül 0, ezért a méret is a kulcs része.
+        kulcs = (tabla.meret, lezerek, zobrist)
+        tarolt = self._tarolo.get(kulcs)
+        if tarolt is not None and tarolt[0] == kodolt:
+            eredmeny = tarolt[1]
+            self._tarolo.move_to_end(kulcs)
+            self.talalatok += 1
+        else:
+            self.hianyok += 1
+            utvonalak = kodolt_lezerek_utvonala(kodok, lezerek)
+            eredmeny = (
+                tuple(utvonalak["fo_utvonal"]),
+                tuple(utvonalak["ateresztett_utvonal"]),
+                tuple((pozicio, tuple(iranyok)) for pozicio, iranyok in utvonalak["raketa_talalatok"].items()),
+                frozenset(kodolt_aktivalt_raketak(kodok, utvonalak)),
+            )
+            self._tarolo[kulcs] = (kodolt, eredmeny)
+            self._tarolo.move_to_end(kulcs)
+            if len(self._tarolo) > self.meret:
+                self._tarolo.popitem(last=False)
+
+        fo_utvonal, ateresztett_utvonal, raketa_talalatok, aktivalt = eredmeny
+        utvonalak = {
+            "fo_utvonal": list(fo_utvonal),
+            "ateresztett_utvonal": list(ateresztett_utvonal),
+            "raketa_talalatok": {pozicio: list(iranyok) for pozicio, iranyok in raketa_talalatok},
+        }
+
+        return utvonalak, aktivalt
+
+
+    def raketa_aktivalas(self, tabla: Tabla) -> dict:
+        """
+        A lezerek_utvonala és a raketa_aktivalas_deaktivallas együttes megfelelője: beállítja a rakéták
+        aktiválási állapotát, és visszaadja a lézerek útvonalát.
+
+        :param tabla: A tábla objektum.
+        :type tabla: Tabla
+        :return: Az útvonalak (fo_utvonal és ateresztett_utvonal) a pozíciók listájaként.
+        :rtype: dict
+        """
+        utvonalak, aktivalt = self.lekerdezes(tabla)
+        for raketa in get_raketak(tabla):
+            raketa.aktivalva = raketa.pozicio in aktivalt
+
+        return utvonalak
+
+
+#Rakéta függvény kiegészítés
+
+def get_raketak(tabla: Tabla) -> Raketa:
+    """
+    Visszaadja az összes rakétát a tábláról egy listában.
+
+    :param tabla: A tábla objektum.
+    :type tabla: Tabla
+    :return: A rakéták listája.
+    :rtype: list[Raketa]
+    """
+    if isinstance(tabla, RitkaTabla):
+        return [babu for babu in tabla.babuk.values() if isinstance(babu, Raketa)]
+
+    raketak = []
+    for x in range(tabla.meret):
+        for y in range(tabla.meret):
+            piece = tabla.melyik_babu((x, y))
+            if isinstance(piece, Raketa):
+                raketak.append(piece)
+    return raketak
+
+
+def raketa_aktivalas_deaktivallas(tabla, lezer_utvonalak) -> Tabla:
+    """
+    Frissíti az összes rakéta aktiválási állapotát a táblán a lézer útvonalak raketa_talalatok
+    szótára alapján: egy rakéta akkor aktív, ha valamelyik lézer a tájolásával szemközti oldalról csapódott be.
+
+    :param tabla: A tábla objektum.
+    :param lezer_utvonalak: A lézer útvonalak eredménye (lásd lezer_utvonal).
+    :type tabla: Tabla
+    :type lezer_utvonalak: dict
+    :return: A frissített tábla objektum.
+    :rtype: Tabla
+    """
+    raketa_talalatok = lezer_utvonalak['raketa_talalatok']
+    for raketa in get_raketak(tabla):
+        raketa.aktivalva = any(irany_inverter(lezer_irany) == raketa.tajolas
+                               for lezer_irany in raketa_talalatok.get(raketa.pozicio, ()))
+
+    return tabla
+
+
+#Babus függvények
+
+def minden_babu_felhasznalva(tabla: Tabla, felhasznalhato_babuk: list) -> bool:
+    """
+    Ellenőrzi, hogy minden felhasználható bábu el lett-e helyezve a táblán.
+
+    :param tabla: A tábla objektum.
+    :param felhasznalhato_babuk: A felhasználható bábuk listája.
+    :type tabla: Tabla
+    :type felhasznalhato_babuk: list
+    :return: True, ha minden bábu el van helyezve, különben False.
+    :rtype: bool
+    """
+    for babu in felhasznalhato_babuk:
+        if babu.pozicio == (None, None):
+            return False
+    return True
+
+
+def interakcio_a_babukkal(tabla: Tabla, felhasznalhato_babuk: list) -> Tabla:
+    """
+    Kezeli a játékos interakcióját a felhasználható bábukkal a táblán.
+
+    :param tabla: A tábla objektum.
+    :param felhasznalhato_babuk: A felhasználható bábuk listája.
+    :type tabla: Tabla
+    :type felhasznalhato_babuk: list
+    :return: A frissített tábla objektum.
+    :rtype: Tabla
+    """
+    # Bábu kiválasztása
+    while True:
+        try:
+            valasztas = int(input("Add meg a bábu sorszámát: ")) - 1
+            if valasztas < 0 or valasztas >= len(felhasznalhato_babuk):
+                raise ValueError("Érvénytelen bábu sorszám.")
+            break
         except ValueError as e:
             print(f"Hiba: {e}")
 
@@ -753,6 +2611,45 @@ def interakcio_a_babukkal(tabla: Tabla, felhasznalhato_babuk: list) -> Tabla:
 
 #Profil függvények
 
+def dicsosegpontok(osszpontszam: int, teljesitett: int, osszido: int) -> int:
+    """
+    A dicsőséglista rangsorának alapja.
+
+    :param osszpontszam: A játékos összpontszáma.
+    :param teljesitett: A teljesített pályák száma.
+    :param osszido: A játékban eltöltött összes idő másodpercben.
+    :type osszpontszam: int
+    :type teljesitett: int
+    :type osszido: int
+    :return: A játékos dicsőségpontjai.
+    :rtype: int
+    """
+    return osszpontszam + teljesitett * 100 - osszido
+
+
+def palya_eleresi_ut(palya_id: int) -> None or str:
+    """
+    Megkeresi a pályát: elsőként a pályakatalógusban, majd a palyak mappa palyaN.txt fájlját, ennek hiányában a pályacsomagot nézi.
+
+    :param palya_id: A pálya azonosítója.
+    :type palya_id: int
+    :return: A pálya elérési útvonala vagy csomaghivatkozása, vagy None, ha nincs ilyen pálya.
+    :rtype: str or None
+    """
+    if palya_id in PALYA_KATALOGUS:
+        return PALYA_KATALOGUS[palya_id].hely
+
+    fajlnev = f"palyak/palya{palya_id}.txt"
+    if os.path.exists(fajlnev):
+        return fajlnev
+
+    csomag = palyacsomag.megnyitas()
+    if csomag is not None and palya_id in csomag:
+        return palyacsomag.hivatkozas(palya_id)
+
+    return None
+
+
 def kovetkezo_palya(profil: Profil) -> None or str:
     """
     Kiválasztja a következő játszandó pályát a játékos profilja alapján.
@@ -762,17 +2659,18 @@ def kovetkezo_palya(profil: Profil) -> None or str:
     :return: A következő pálya elérési útvonala vagy None, ha minden pálya már teljesítve van.
     :rtype: str or None
     """
+    if PALYA_KATALOGUS:
+        bejegyzes = PALYA_KATALOGUS.kovetkezo_nyitott(profil.gamertag, profil.teljesitett_palyak)
+
+        return bejegyzes.hely if bejegyzes is not None else None  # None, ha minden pálya teljesítve
+
     if not profil.teljesitett_palyak:
 
-        return "palyak/palya1.txt"
+        return palya_eleresi_ut(1)
     
-    utolso_teljesitett_palya_id = max(int(palya.id) for palya in profil.teljesitett_palyak)
-    if utolso_teljesitett_palya_id < 20:
-        kovetkezo_palya_szam = utolso_teljesitett_palya_id + 1
+    utolso_teljesitett_palya_id = max(profil.teljesitett_palyak)
 
-        return f"palyak/palya{kovetkezo_palya_szam}.txt"
-    
-    return None  # Minden pálya teljesítve
+    return palya_eleresi_ut(utolso_teljesitett_palya_id + 1)  # None, ha minden pálya teljesítve
 
 
 def korabbi_palyak_kivalasztasa(profil: Profil) -> None or str:
@@ -789,15 +2687,316 @@ def korabbi_palyak_kivalasztasa(profil: Profil) -> None or str:
         return None
 
     print("\n\nTeljesített pályák:")
-    for index, palya in enumerate(profil.teljesitett_palyak, start=1):
+    teljesitett_palyak = list(profil.teljesitett_palyak.values())
+    for index, palya in enumerate(teljesitett_palyak, start=1):
         print(f"{index}. Pálya: {palya.id}, Eltelt idő: {palya.ido}mp")
 
     valasztas = int(input("\nVálassz egy pályát a javításhoz (0 a visszalépéshez): "))
-    if valasztas == 0 or valasztas > len(profil.teljesitett_palyak):
+    if valasztas == 0 or valasztas > len(teljesitett_palyak):
+
+        return None
+
+    kivalasztott_palya = teljesitett_palyak[valasztas - 1]
+
+    return palya_eleresi_ut(kivalasztott_palya.id)
+
+
+#Pályamegoldó
+
+def _elso_nyitott_mezo(kodok: list, nyitott: set, lezerek = ALAP_LEZEREK) -> tuple:
+    """
+    Sorban végigköveti a lézerforrások lézereit a kódolt táblán a kodolt_lezer_utvonal bejárási
+    sorrendjében, és megkeresi az első olyan mezőt, amelyről a keresés még nem döntött. A rakéták
+    aktiválása a kodolt_aktivalt_raketak szabályát követi: bármelyik találat az elfogadó oldalról
+    aktivál, nem csak a rakéta első előfordulása az útvonalon.
+
+    :param kodok: A tábla mezőkódjai.
+    :param nyitott: Az eldöntetlen (üres) mezők indexeinek halmaza.
+    :param lezerek: A lézerforrások (kezdő pozíció, kezdő irány) párjai.
+    :type kodok: list[int]
+    :type nyitott: set[int]
+    :type lezerek: list[tuple]
+    :return: Az első eldöntetlen mező indexe (-1, ha a lézerek csak eldöntött mezőkön haladnak át), a lézer
+             haladási iránya ezen a mezőn, a fő lézer függőben lévő (mező, irány) állapota, ha a mezőt
+             egy áteresztett lézer érte el, különben None, az addig aktivált rakéták mezői, valamint
+             a mezőt elérő lézer után még következő lézerforrások száma.
+    :rtype: tuple
+    """
+    fo_atmenetek, ateresztett_atmenetek = FO_ATMENETEK, ATERESZTETT_ATMENETEK
+    meret = kodok_merete(kodok)
+    szomszedok = meret_tablak(meret)[0]
+    lepes_korlat = len(kodok) * 4
+    aktivalt = set()
+
+    for index, ((x, y), irany) in enumerate(lezerek):
+        hatralevo = len(lezerek) - index - 1
+        mezo = x * meret + y if 0 <= x < meret and 0 <= y < meret else -1
+        kezdo_mezo = mezo
+        lepesek = 0
+
+        while mezo >= 0 and lepesek < lepes_korlat:
+            lepesek += 1
+            if mezo in nyitott:
+                return mezo, irany, None, aktivalt, hatralevo
+
+            kod = kodok[mezo]
+            uj_irany = fo_atmenetek[kod * 4 + irany]
+            if uj_irany < 0:
+                if kod >= RAKETA_KOD and mezo != kezdo_mezo and irany_inverter(irany) == kod - RAKETA_KOD:
+                    aktivalt.add(mezo)
+                break
+
+            if kod >= ATERESZTO_KOD:
+                kovetkezo = szomszedok[mezo * 4 + uj_irany]
+                fuggo = (kovetkezo, uj_irany) if kovetkezo >= 0 else None
+                ateresztett_mezo, ateresztett_irany = mezo, irany
+                ateresztett_lepesek = 0
+                while ateresztett_mezo >= 0 and ateresztett_lepesek < lepes_korlat:
+                    ateresztett_lepesek += 1
+                    if ateresztett_mezo in nyitott:
+                        return ateresztett_mezo, ateresztett_irany, fuggo, aktivalt, hatralevo
+                    ateresztett_kod = kodok[ateresztett_mezo]
+                    # Az áteresztett lézer a rakétán is áthalad, így ugyanazt a rakétát többször is érheti.
+                    if ateresztett_kod >= RAKETA_KOD and irany_inverter(ateresztett_irany) == ateresztett_kod - RAKETA_KOD:
+                        aktivalt.add(ateresztett_mezo)
+                    ateresztett_irany = ateresztett_atmenetek[ateresztett_kod * 4 + ateresztett_irany]
+                    if ateresztett_irany < 0:
+                        break
+                    ateresztett_mezo = szomszedok[ateresztett_mezo * 4 + ateresztett_irany]
+
+            irany = uj_irany
+            mezo = szomszedok[mezo * 4 + irany]
+
+    return -1, None, None, aktivalt, 0
+
+
+def raketa_fenykupok(kodok: list, nyitott: set, fordito_babu: bool = True) -> dict:
+    """
+    Minden rakétához visszafelé követi a lézert az elfogadó oldaláról, és meghatározza azokat a
+    (mező, haladási irány) állapotokat, amelyekből egy lézer eljuthat a rakétához ("fénykúp").
+    A nyitott mezőkön a lézer egyenesen haladhat, vagy (ha van fordító bábu) egy tükörrel elfordulhat;
+    a rögzített ÁteresztőTükör átengedhet és tükrözhet is. Ez felső becslés: ami nincs a kúpban,
+    abból biztosan nem érhető el a rakéta.
+
+    :param kodok: A tábla mezőkódjai.
+    :param nyitott: Azok a mezők, amelyekre még kerülhet bábu.
+    :param fordito_babu: Van-e még elhelyezhető Tükör vagy ÁteresztőTükör.
+    :type kodok: list[int]
+    :type nyitott: set[int]
+    :type fordito_babu: bool
+    :return: Rakéta mezőnként egy szótár, amely a kúp állapotaihoz a szükséges fordulások minimális
+             számát rendeli (csak a nyitott mezőkön történő fordulásokat számolva).
+    :rtype: dict
+    """
+    fo_atmenetek, szomszedok = FO_ATMENETEK, meret_tablak(kodok_merete(kodok))[0]
+    fenykupok = {}
+
+    for raketa_mezo, raketa_kod in enumerate(kodok):
+        if raketa_kod < RAKETA_KOD:
+            continue
+
+        kezdo = (raketa_mezo, irany_inverter(raketa_kod - RAKETA_KOD))
+        kup = {kezdo: 0}
+        sor = deque([kezdo])
+        while sor:
+            mezo, irany = sor.popleft()
+            fordulasok = kup[(mezo, irany)]
+            # Az előző mező, ahonnan a lézer ebben az irányban kilépett.
+            elozo = szomszedok[mezo * 4 + irany_inverter(irany)]
+            if elozo < 0:
+                continue
+
+            kod = kodok[elozo]
+            elodok = []
+            if elozo in nyitott:
+                elodok.append((irany, 0))
+                if fordito_babu:
+                    elodok.append(((irany + 1) % 4, 1))
+                    elodok.append(((irany - 1) % 4, 1))
+            else:
+                for beerkezo in range(4):
+                    if fo_atmenetek[kod * 4 + beerkezo] == irany:
+                        elodok.append((beerkezo, 0))
+                    elif ALAPKODOK[kod] == ATERESZTO_KOD and beerkezo == irany:
+                        elodok.append((beerkezo, 0))
+
+            for beerkezo, koltseg in elodok:
+                allapot = (elozo, beerkezo)
+                uj_fordulasok = fordulasok + koltseg
+                if uj_fordulasok < kup.get(allapot, uj_fordulasok + 1):
+                    kup[allapot] = uj_fordulasok
+                    if koltseg:
+                        sor.append(allapot)
+                    else:
+                        sor.appendleft(allapot)
+
+        fenykupok[raketa_mezo] = kup
+
+    return fenykupok
+
+
+def kodolt_aktivalt_raketak(kodok: list, lezer_utvonalak: dict) -> set:
+    """
+    Meghatározza, mely rakéták aktiválódnak a kódolt táblán a raketa_aktivalas_deaktivallas szabályai szerint.
+
+    :param kodok: A tábla mezőkódjai.
+    :param lezer_utvonalak: A kodolt_lezer_utvonal eredménye.
+    :type kodok: list[int]
+    :type lezer_utvonalak: dict
+    :return: Az aktivált rakéták pozícióinak halmaza.
+    :rtype: set[tuple]
+    """
+    meret = kodok_merete(kodok)
+    aktivalt = set()
+    for pozicio, iranyok in lezer_utvonalak["raketa_talalatok"].items():
+        x, y = pozicio
+        tajolas = kodok[x * meret + y] - RAKETA_KOD
+        if any(irany_inverter(lezer_irany) == tajolas for lezer_irany in iranyok):
+            aktivalt.add(pozicio)
+
+    return aktivalt
+
+
+def _megoldas_kereses(kodok: list, nyitott: set, keszlet: dict, raketa_mezok: set, fenykupok: dict,
+                      fordulas_keret: int, lezerek = ALAP_LEZEREK) -> bool:
+    """
+    Rekurzív keresés a lézer mentén: mindig az első eldöntetlen mezőről dönt, amelyen a lézer áthalad.
+    Az azonos típusú bábukat egy készletként kezeli, a tükröknél csak a tájolás paritását próbálja ki.
+    Azokat az ágakat, ahonnan valamelyik még inaktív rakéta fénykúpja nem érhető el, azonnal elveti
+    (csak az utolsó lézerforrás követésekor, mert addig a későbbi források még aktiválhatják a rakétát).
+    Siker esetén a kodok a lézer útjába helyezett bábukat tartalmazzák, a nyitott pedig a szabad mezőket.
+
+    :param kodok: A tábla mezőkódjai (a keresés közben módosul).
+    :param nyitott: Az eldöntetlen üres mezők halmaza (a keresés közben módosul).
+    :param keszlet: A még elhelyezendő bábuk száma alapkódonként (a keresés közben módosul).
+    :param raketa_mezok: Az aktiválandó rakéták mezői.
+    :param fenykupok: A raketa_fenykupok eredménye.
+    :param fordulas_keret: A fénykúpokban megengedett fordulások legnagyobb száma.
+    :param lezerek: A lézerforrások (kezdő pozíció, kezdő irány) párjai.
+    :type kodok: list[int]
+    :type nyitott: set[int]
+    :type keszlet: dict
+    :type raketa_mezok: set[int]
+    :type fenykupok: dict
+    :type fordulas_keret: int
+    :type lezerek: list[tuple]
+    :return: True, ha a részleges elrendezés kiegészíthető megoldássá.
+    :rtype: bool
+    """
+    mezo, irany, fuggo, aktivalt, hatralevo = _elso_nyitott_mezo(kodok, nyitott, lezerek)
+
+    if mezo < 0:
+        # A lézer útja lezárult: a maradék bábuk az útvonalon kívüli szabad mezőkre kerülhetnek.
+        if sum(keszlet.values()) > len(nyitott):
+            return False
+        poziciok = meret_tablak(kodok_merete(kodok))[1]
+        raketa_poziciok = {poziciok[raketa_mezo] for raketa_mezo in raketa_mezok}
+        return raketa_poziciok <= kodolt_aktivalt_raketak(kodok, kodolt_lezerek_utvonala(kodok, lezerek))
+
+    # A későbbi lézerforrások még aktiválhatják a rakétákat, ezért csak az utolsó forrásnál vágunk.
+    hatralevo_raketak = raketa_mezok - aktivalt if not hatralevo else ()
+    for raketa_mezo in hatralevo_raketak:
+        kup = fenykupok[raketa_mezo]
+        if kup.get((mezo, irany), fordulas_keret + 1) > fordulas_keret:
+            if fuggo is None or kup.get(fuggo, fordulas_keret + 1) > fordulas_keret:
+                return False
 
+    nyitott.remove(mezo)
+
+    if sum(keszlet.values()) <= len(nyitott) and _megoldas_kereses(kodok, nyitott, keszlet, raketa_mezok, fenykupok, fordulas_keret, lezerek):
+        return True
+
+    for alapkod in keszlet:
+        if not keszlet[alapkod]:
+            continue
+        keszlet[alapkod] -= 1
+        for tajolas in range(TAJOLASOK_SZAMA[alapkod]):
+            kodok[mezo] = alapkod + tajolas
+            if _megoldas_kereses(kodok, nyitott, keszlet, raketa_mezok, fenykupok, fordulas_keret, lezerek):
+                return True
+        kodok[mezo] = URES_KOD
+        keszlet[alapkod] += 1
+
+    nyitott.add(mezo)
+
+    return False
+
+
+def solve(tabla: Tabla, felhasznalhato_babuk: list) -> list or None:
+    """
+    Megkeresi a felhasználható bábuk egy olyan elhelyezését, amelyben minden rakéta aktiválódik és
+    minden bábu a táblára kerül. A táblán már elhelyezett felhasználható bábukat a keresés
+    szabadon áthelyezi, a tábla és a bábuk nem módosulnak.
+
+    :param tabla: A pálya táblája (például a fajlkezeles.beolvas_palyat eredménye).
+    :param felhasznalhato_babuk: A felhasználható bábuk listája.
+    :type tabla: Tabla
+    :type felhasznalhato_babuk: list
+    :return: A bábuk sorrendjében a (pozicio, tajolas) párok listája, vagy None, ha a pálya nem oldható meg.
+    :rtype: list[tuple] or None
+    """
+    felhasznalhato_azonositok = {id(babu) for babu in felhasznalhato_babuk}
+    kodok = [URES_KOD if id(babu) in felhasznalhato_azonositok else babu_kodolas(babu)
+             for sor in tabla.matrix for babu in sor]
+    nyitott = {mezo for mezo, kod in enumerate(kodok) if kod == URES_KOD}
+    raketa_mezok = {mezo for mezo, kod in enumerate(kodok) if kod >= RAKETA_KOD}
+    ures_mezok = sorted(nyitott)
+
+    keszlet = {}
+    for babu in felhasznalhato_babuk:
+        alapkod = ALAPKODOK[babu_kodolas(babu)]
+        keszlet[alapkod] = keszlet.get(alapkod, 0) + 1
+
+    # A fénykúpok a kezdeti üres mezőkre számolódnak, ezért a fordulások keretét is a teljes készlet adja:
+    # egy elhelyezett tükör egy lézert legfeljebb kétszer fordít el (a két oldalán).
+    fordito_babuk = keszlet.get(TUKOR_KOD, 0) + keszlet.get(ATERESZTO_KOD, 0)
+    fenykupok = raketa_fenykupok(kodok, nyitott, fordito_babuk > 0)
+    fordulas_keret = 2 * fordito_babuk
+    lezerek = getattr(tabla, "lezerek", ALAP_LEZEREK)
+
+    if not _megoldas_kereses(kodok, nyitott, keszlet, raketa_mezok, fenykupok, fordulas_keret, lezerek):
         return None
 
-    kivalasztott_palya = profil.teljesitett_palyak[valasztas - 1]
+    # A lézer útjába helyezett bábuk típusonként, a maradék bábuk a szabad mezőkre kerülnek.
+    elhelyezett = {}
+    for mezo in ures_mezok:
+        if kodok[mezo] != URES_KOD:
+            elhelyezett.setdefault(ALAPKODOK[kodok[mezo]], []).append(mezo)
+    szabad_mezok = sorted(nyitott)
+    poziciok = meret_tablak(tabla.meret)[1]
+
+    megoldas = []
+    for babu in felhasznalhato_babuk:
+        alapkod = ALAPKODOK[babu_kodolas(babu)]
+        if elhelyezett.get(alapkod):
+            mezo = elhelyezett[alapkod].pop(0)
+            megoldas.append((poziciok[mezo], kodok[mezo] - alapkod))
+        else:
+            megoldas.append((poziciok[szabad_mezok.pop(0)], 0))
+
+    return megoldas
+
+
+def megoldas_alkalmazasa(tabla: Tabla, felhasznalhato_babuk: list, megoldas: list) -> Tabla:
+    """
+    Elhelyezi a felhasználható bábukat a táblán a solve által visszaadott megoldás szerint.
+
+    :param tabla: A tábla objektum.
+    :param felhasznalhato_babuk: A felhasználható bábuk listája.
+    :param megoldas: A solve eredménye.
+    :type tabla: Tabla
+    :type felhasznalhato_babuk: list
+    :type megoldas: list[tuple]
+    :return: A frissített tábla objektum.
+    :rtype: Tabla
+    """
+    for babu in felhasznalhato_babuk:
+        if babu.pozicio != (None, None) and tabla.melyik_babu(babu.pozicio) is babu:
+            tabla.babu_torol(babu.pozicio)
 
-    return f"palyak/palya{kivalasztott_palya.id}.txt"
+    for babu, (pozicio, tajolas) in zip(felhasznalhato_babuk, megoldas):
+        babu.mozgatas(pozicio)
+        babu.tajolas = tajolas
+        tabla.babu_elhelyez(babu, pozicio)
 
+    return tabla
@@ -3,6 +3,8 @@ import time
 import logika
 import fajlkezeles
 
+DICSOSEGLISTA_OLDALMERET = 10
+
 
 def print_fejlec(profil: logika.Profil = None, palya_id: int = None, palya_nehezseg: str = None) -> None:
     """
@@ -43,46 +45,50 @@ def print_tabla_lezzerrel(tabla: logika.Tabla, laser_utvonalak) -> None:
     :rtype: None
     """
 
+    meret = tabla.meret
+    index_szelesseg = len(str(meret - 1))
+    cella_szelesseg = max(3, index_szelesseg + 1)  # Az oszlopindexek is kif?rjenek egy sz?k?zzel
+    lezer_mezok = set(laser_utvonalak["fo_utvonal"]) | set(laser_utvonalak["ateresztett_utvonal"])
     con.textcolor(con.White)
 
     # Fels? indexek (oszlopok)
-    print("   ", end="")
-    for oszlop in range(5):
-        print(f" {oszlop} ", end="")
+    print(" " * (index_szelesseg + 2), end="")
+    for oszlop in range(meret):
+        print(f"{oszlop:>{cella_szelesseg - 1}} ", end="")
     print()
 
     # Fels? szeg?ly
-    print("  +" + "---" * 5 + "+")
+    print(" " * (index_szelesseg + 1) + "+" + "-" * (cella_szelesseg * meret) + "+")
 
-    for x in range(5):
+    for x in range(meret):
         # Oldals? indexek (sorok)
-        print(f"{x} |", end="")
+        print(f"{x:>{index_szelesseg}} |", end="")
 
-        for y in range(5):
+        for y in range(meret):
             piece = tabla.melyik_babu((x, y))
             con.textcolor(con.White)  # Alap?rtelmezett sz?n be?ll?t?sa
 
             if isinstance(piece, logika.SpaceRock):
                 con.textcolor(con.White)
-                print(" S ", end="")
+                print(f"{'S':^{cella_szelesseg}}", end="")
             elif isinstance(piece, logika.Tukor):
                 con.textcolor(con.Magenta)
-                print(" T ", end="")
+                print(f"{'T':^{cella_szelesseg}}", end="")
             elif isinstance(piece, logika.AteresztoTukor):
                 con.textcolor(con.Green)
-                print(" A ", end="")
+                print(f"{'A':^{cella_szelesseg}}", end="")
             elif isinstance(piece, logika.Raketa):
                 if piece.aktivalva:  
                     con.textcolor(con.LightGreen)
                 else:
                     con.textcolor(con.Yellow)
-                print(" R ", end="")
-            elif any((x, y) in ut for ut in laser_utvonalak.values()):
+                print(f"{'R':^{cella_szelesseg}}", end="")
+            elif (x, y) in lezer_mezok:
                 con.textcolor(con.Red)
-                print(" L ", end="")
+                print(f"{'L':^{cella_szelesseg}}", end="")
             else:
                 con.textcolor(con.White)
-                print(" * ", end="")
+                print(f"{'*':^{cella_szelesseg}}", end="")
 
         # Jobb oldali szeg?ly
         con.textcolor(con.White)
@@ -90,34 +96,49 @@ def print_tabla_lezzerrel(tabla: logika.Tabla, laser_utvonalak) -> None:
 
     # Als? szeg?ly
     con.textcolor(con.White)
-    print("  +" + "---" * 5 + "+")
+    print(" " * (index_szelesseg + 1) + "+" + "-" * (cella_szelesseg * meret) + "+")
 
 
-def print_dicsoseglista() -> None:
+def print_dicsoseglista(profil: logika.Profil = None) -> None:
     """
-    A dics?s?glist?t jelen?ti meg, amely rangsorolja a j?t?kosokat a teljes?tm?ny?k alapj?n.
-    Az els? h?rom helyezett kiemelt sz?nnel jelenik meg. Ha a lista nem tal?lhat?, hiba?zenet jelenik meg.
+    A dics?s?glist?t jelen?ti meg, amely rangsorolja a j?t?kosokat a teljes?tm?ny?k alapj?n. Csak az els?
+    DICSOSEGLISTA_OLDALMERET helyez?st ?rja ki, ?s ha a profil meg van adva, a j?t?kos hely?t ?s k?rnyezet?t is.
+    A k?zz?tett rangsorf?jlb?l olvas, ?gy nem kell a dics?s?glist?t fel?p?teni.
+    Az els? h?rom helyezett kiemelt sz?nnel jelenik meg. Ha a lista ?res, ?zenet jelenik meg.
 
+    :param logika.Profil profil: A j?t?kos profilja, akinek a helyez?s?t is mutatjuk.
     :return: Nincs visszat?r?si ?rt?k.
     :rtype: None
     """
 
-    try:
-        with open('dicsoseglista.txt', 'r') as f:
-            dicsoseglista = f.readlines()
+    fajlkezeles.mentesek_uritese()
+    rangsor = fajlkezeles.rangsor_megnyitasa()
+    if rangsor is None or not len(rangsor):
+        print("A dics?s?glista m?g ?res.")
+        return
 
-        print("\nDics?s?glista:\n")
-        for index, sor in enumerate(dicsoseglista, start=1):
-            if index <= 3:  # Top 3 helyez?s kiemel?se
-                con.textcolor(con.Yellow)
-            else:
-                con.textcolor(con.White)
+    sorok = rangsor.elso(DICSOSEGLISTA_OLDALMERET)
+    if profil is not None:
+        kornyezet = rangsor.kornyezet(profil.gamertag, profil.dicsosegpontok())
+        sorok += [sor for sor in kornyezet if sor[0] > sorok[-1][0]]
+
+    print("\nDics?s?glista:\n")
+    elozo_helyezes = 0
+    for helyezes, gamertag, *adatok in sorok:
+        if helyezes > elozo_helyezes + 1:
+            con.textcolor(con.White)
+            print("   ...")
+        if profil is not None and gamertag == profil.gamertag:
+            con.textcolor(con.Green)
+        elif helyezes <= 3:  # Top 3 helyez?s kiemel?se
+            con.textcolor(con.Yellow)
+        else:
+            con.textcolor(con.White)
 
-            print(f"{index}. Helyezet:  {sor.strip()}")
+        print(f"{helyezes}. Helyezet:  {fajlkezeles.dicsoseglista_sor(gamertag, *adatok)}")
+        elozo_helyezes = helyezes
 
-        con.textcolor(con.White)  # Vissza?ll?tjuk az alap?rtelmezett sz?nt
-    except FileNotFoundError:
-        print("A dics?s?glista m?g nem l?tezik, vagy nem tal?lhat?.")
+    con.textcolor(con.White)  # Vissza?ll?tjuk az alap?rtelmezett sz?nt
 
 
 def print_raketak_info(raketak: list) -> None:
@@ -167,13 +188,25 @@ def jatek_futtatas(profil: logika.Profil, palya_fajlnev: str):
 
     tabla, felhasznalhato_babuk, (palya_id, palya_nehezseg) = fajlkezeles.beolvas_palyat(palya_fajlnev)
     raketak = logika.get_raketak(tabla)
+    # T?bb ?tereszt?T?k?rn?l a l?zerfa k?vet (az ?teresztett l?zerek is el?gaznak), k?l?nben egy
+    # l?zerforr?sn?l a n?vekm?nyes k?vet?s, t?bbn?l az egy?ttes k?vet?s fut minden k?rben.
+    lezerfa = logika.elagazo_palya(tabla, felhasznalhato_babuk)
+    lezer_kovetes = None
+    if not lezerfa and len(tabla.lezerek) == 1:
+        lezer_kovetes = logika.LezerKovetes(tabla, *tabla.lezerek[0])
+    tabla.valtozasok_atvetele()  # A k?vet? m?r a bet?lt?tt ?ll?sb?l indul
     kezdesi_ido = time.time()
 
     while True:
         jelenlegi_ido = time.time()
         print_fejlec(profil, palya_id, palya_nehezseg)
 
-        lezer_ut = logika.lezer_utvonal(tabla)
+        if lezerfa:
+            lezer_ut = logika.lezerek_fa(tabla)
+        elif lezer_kovetes is not None:
+            lezer_ut = lezer_kovetes.utvonal(tabla.valtozasok_atvetele())
+        else:
+            lezer_ut = logika.lezerek_utvonala(tabla)
         tabla = logika.raketa_aktivalas_deaktivallas(tabla, lezer_ut)
         
         print_tabla_lezzerrel(tabla, lezer_ut)
@@ -188,9 +221,7 @@ def jatek_futtatas(profil: logika.Profil, palya_fajlnev: str):
                 # Friss?tj?k a teljes?tett p?lya adatait a profilban
                 van_mar_ilyen_palya = profil.frissit_palya_eredmenyt(palya_id, palya_nehezseg, eltelt_ido)
 
-                profil.frissit_osszertekeket()
-                profil.mentes_frissites()
-                fajlkezeles.dicsoseglista_keszitese_frissites()
+                fajlkezeles.eredmeny_mentese(profil)  # A h?tt?rsz?l ?rja ki, a j?t?k nem v?r a lemezre
 
                 con.textcolor(con.Green)
                 uzenet = "Sikeresen jav?tottad az id?det!" if van_mar_ilyen_palya else "Sikeresen teljes?tetted a p?ly?t!"
@@ -291,7 +322,8 @@ def profil_menu(profil: logika.Profil):
                 print_fejlec(profil)
                 print("\n")
                 print(profil)
-                print("Visszat?r?shez nyomdd meg a 0-?t!")
+                print_dicsoseglista(profil)
+                print("\nVisszat?r?shez nyomdd meg a 0-?t!")
                 visszateres = con.getch()
                 if visszateres == '0':
                     continue
@@ -310,6 +342,12 @@ def main():
     :rtype: None
     """
 
+    fajlkezeles.palyak_betoltese()
+    fajlkezeles.katalogus_betoltese()
+    if fajlkezeles.adatbazis_beallitasa() is None:
+        fajlkezeles.profilok_migralasa()
+    fajlkezeles.hatter_iro_inditasa()
+
     while True:
         print_fejlec()
         con.textcolor(con.White)
@@ -339,7 +377,8 @@ def main():
                 if gamertag.lower() == 'vissza':
                     break  # Visszat?r a f?men?be
 
-                if gamertag in logika.Profil.profilok_listazasa():
+                fajlkezeles.mentesek_uritese()
+                if logika.Profil.letezik(gamertag):
                     print("Ez a gamertag m?r l?tezik. K?rlek, v?lassz egy m?sikat.")
                     time.sleep(2)
                     continue
@@ -348,6 +387,7 @@ def main():
                 profil_menu(profil)
 
         elif key == '2':
+            fajlkezeles.mentesek_uritese()
             profil = logika.Profil.menus_betoltes()
             if profil:
                 profil_menu(profil)
@@ -360,6 +400,8 @@ def main():
                 continue
 
         elif key == '4':
+            fajlkezeles.mentesek_uritese()
+            fajlkezeles.dicsoseglista_szoveg_iras(csak_ha_valtozott=True)
             break  # Kil?p?s a programb?l
 
     return 0
@@ -368,4 +410,5 @@ def main():
 
     
 
-main()
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,270 @@
+import mmap
+import os
+import struct
+import uuid
+
+# Csomagfájl: fejléc (azonosító, verzió, pályák száma), azonosító szerint rendezett index
+# (pálya azonosító, bájteltolás, hossz, nehézség, fix és felhasználható bábuk száma) bejegyzésekkel,
+# majd a pályák UTF-8 szövegei egymás után. Az index a katalógusadatokat is tartalmazza, így a
+# katalógushoz nem kell a pályákat feldolgozni. Az 1. verzió indexe csak az első három mezőt tartalmazta.
+CSOMAG_AZONOSITO = b"LMCS"
+CSOMAG_VERZIO = 2
+NEHEZSEG_HOSSZ = 16   # A nehézség neve legfeljebb ennyi bájton (UTF-8) kerül az indexbe
+_FEJLEC = struct.Struct("<4sHI")
+_BEJEGYZES = struct.Struct(f"<IQI{NEHEZSEG_HOSSZ}sHH")
+_BEJEGYZES_FORMATUMOK = {1: struct.Struct("<IQI"), CSOMAG_VERZIO: _BEJEGYZES}
+
+PALYACSOMAG_FAJL = os.path.join("palyak", "palyak.lmp")
+HIVATKOZAS_JEL = "#"
+
+# Fájlnév -> (módosítási idő, megnyitott csomag)
+_megnyitott_csomagok = {}
+
+
+class Palyacsomag:
+    """
+    Sok pályát tartalmazó csomagfájl memórialeképezéssel megnyitva. Megnyitáskor csak a fejlécet olvassa;
+    egy pálya szövegét az indexben végzett bináris kereséssel éri el, így a csomag méretétől független
+    idő alatt, a többi pálya beolvasása nélkül.
+
+    :ivar fajlnev: A csomagfájl neve.
+    """
+
+    def __init__(self, fajlnev: str) -> None:
+
+        self.fajlnev = fajlnev
+        with open(fajlnev, 'rb') as f:
+            self._adat = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        azonosito, verzio, self._darab = _FEJLEC.unpack_from(self._adat, 0)
+        if azonosito != CSOMAG_AZONOSITO or verzio not in _BEJEGYZES_FORMATUMOK:
+            self._adat.close()
+            raise ValueError(f"Ismeretlen pályacsomag formátum: {fajlnev}")
+        self._bejegyzes_formatum = _BEJEGYZES_FORMATUMOK[verzio]
+
+
+    def __len__(self) -> int:
+        return self._darab
+
+
+    def __contains__(self, palya_id: int) -> bool:
+        return self._kereses(palya_id) is not None
+
+
+    def __enter__(self) -> "Palyacsomag":
+        return self
+
+
+    def __exit__(self, *kivetel) -> None:
+        self.bezaras()
+
+
+    def _bejegyzes(self, index: int) -> tuple:
+        """
+        :param index: A bejegyzés sorszáma az indexben.
+        :type index: int
+        :return: A bejegyzés mezői (pálya azonosító, bájteltolás, hossz, majd a 2. verziótól a
+                 katalógusadatok).
+        :rtype: tuple
+        """
+        formatum = self._bejegyzes_formatum
+
+        return formatum.unpack_from(self._adat, _FEJLEC.size + index * formatum.size)
+
+
+    def _kereses(self, palya_id: int) -> tuple or None:
+        """
+        Bináris kereséssel megkeresi a pálya indexbejegyzését.
+
+        :param palya_id: A pálya azonosítója.
+        :type palya_id: int
+        :return: A pálya bájteltolása és hossza, vagy None, ha a pálya nincs a csomagban.
+        :rtype: tuple or None
+        """
+        also, felso = 0, self._darab
+        while also < felso:
+            kozep = (also + felso) // 2
+            azonosito, eltolas, hossz = self._bejegyzes(kozep)[:3]
+            if azonosito == palya_id:
+                return eltolas, hossz
+            if azonosito < palya_id:
+                also = kozep + 1
+            else:
+                felso = kozep
+
+        return None
+
+
+    def azonositok(self):
+        """
+        :return: A csomag pályáinak azonosítói növekvő sorrendben.
+        :rtype: Iterator[int]
+        """
+        for index in range(self._darab):
+            yield self._bejegyzes(index)[0]
+
+
+    def katalogus_adatok(self):
+        """
+        A csomag pályáinak katalógusadatai az indexből, a pályák szövegének beolvasása nélkül.
+
+        :return: Pályánként a (pálya azonosító, nehézség, fix bábuk száma, felhasználható bábuk száma)
+                 négyes, növekvő azonosító szerint. Az 1. verziójú csomagokban az utolsó három elem None.
+        :rtype: Iterator[tuple]
+        """
+        for index in range(self._darab):
+            bejegyzes = self._bejegyzes(index)
+            if len(bejegyzes) == 3:
+                yield bejegyzes[0], None, None, None
+                continue
+            palya_id, _, _, nehezseg, fix_babuk, felhasznalhato_babuk = bejegyzes
+            yield palya_id, nehezseg.rstrip(b"\0").decode("Utf-8") or None, fix_babuk, felhasznalhato_babuk
+
+
+    def szoveg(self, palya_id: int) -> str:
+        """
+        Visszaadja egy pálya szövegét (a pályafájlok formátumában).
+
+        :param palya_id: A pálya azonosítója.
+        :type palya_id: int
+        :return: A pálya szövege.
+        :rtype: str
+        :raises KeyError: Ha a pálya nincs a csomagban.
+        """
+        talalat = self._kereses(palya_id)
+        if talalat is None:
+            raise KeyError(palya_id)
+        eltolas, hossz = talalat
+
+        return self._adat[eltolas:eltolas + hossz].decode("Utf-8")
+
+
+    def bezaras(self) -> None:
+        """
+        Megszünteti a memórialeképezést.
+        """
+        self._adat.close()
+
+
+def _nehezseg_bajtok(nehezseg: str or None) -> bytes:
+    """
+    :param nehezseg: A nehézség neve, vagy None.
+    :type nehezseg: str or None
+    :return: A nehézség UTF-8 kódolása NEHEZSEG_HOSSZ bájtra vágva, karakterhatáron.
+    :rtype: bytes
+    """
+    if nehezseg is None:
+        return b""
+
+    return nehezseg.encode("Utf-8")[:NEHEZSEG_HOSSZ].decode("Utf-8", "ignore").encode("Utf-8")
+
+
+def csomag_keszites(palyak, cel_fajl: str = PALYACSOMAG_FAJL) -> int:
+    """
+    Pályacsomagot ír a megadott pályaszövegekből. A szövegeket sorban, egyenként írja ki, így a
+    pályák nem kell, hogy egyszerre a memóriában legyenek; az indexet a végén a fejléc után írja be.
+    A csomag egyedi nevű átmeneti fájlba készül (így az egyszerre futó csomagolások nem írják felül
+    egymás félkész fájljait), és csak elkészülte után cseréli le a régit.
+
+    :param palyak: (pálya azonosító, pálya szövege, nehézség, fix bábuk száma, felhasználható bábuk
+                   száma) ötösök; az azonosítók egyediek.
+    :param cel_fajl: A csomagfájl neve.
+    :type palyak: Iterable[tuple[int, str, str, int, int]]
+    :type cel_fajl: str
+    :return: A csomagba írt pályák száma.
+    :rtype: int
+    :raises ValueError: Ha egy azonosító többször szerepel.
+    """
+    # Az index helyét előbb ki kell hagyni, ezért a pályákat előbb egy átmeneti adatfájlba írjuk.
+    egyedi = uuid.uuid4().hex
+    atmeneti = f"{cel_fajl}.{egyedi}.tmp"
+    adat_fajl = f"{cel_fajl}.{egyedi}.adat.tmp"
+    index = []
+    try:
+        with open(adat_fajl, 'xb') as adat:
+            for palya_id, szoveg, nehezseg, fix_babuk, felhasznalhato_babuk in palyak:
+                bajtok = szoveg.encode("Utf-8")
+                index.append((palya_id, adat.tell(), len(bajtok), _nehezseg_bajtok(nehezseg),
+                              fix_babuk, felhasznalhato_babuk))
+                adat.write(bajtok)
+
+        index.sort()
+        for elozo, kovetkezo in zip(index, index[1:]):
+            if elozo[0] == kovetkezo[0]:
+                raise ValueError(f"A {kovetkezo[0]}. pálya többször szerepel.")
+
+        adat_kezdete = _FEJLEC.size + len(index) * _BEJEGYZES.size
+        with open(atmeneti, 'xb') as f:
+            f.write(_FEJLEC.pack(CSOMAG_AZONOSITO, CSOMAG_VERZIO, len(index)))
+            for palya_id, eltolas, hossz, *katalogus_adatok in index:
+                f.write(_BEJEGYZES.pack(palya_id, adat_kezdete + eltolas, hossz, *katalogus_adatok))
+            with open(adat_fajl, 'rb') as adat:
+                while True:
+                    darab = adat.read(1 << 20)
+                    if not darab:
+                        break
+                    f.write(darab)
+
+        os.replace(atmeneti, cel_fajl)
+    finally:
+        # A sikertelen csomagolás (például hibás pálya) sem hagy maga után átmeneti fájlokat.
+        for fajlnev in (adat_fajl, atmeneti):
+            try:
+                os.remove(fajlnev)
+            except FileNotFoundError:
+                pass
+
+    return len(index)
+
+
+def megnyitas(fajlnev: str = PALYACSOMAG_FAJL) -> Palyacsomag or None:
+    """
+    Megnyitja (vagy a korábban megnyitottat adja vissza) a csomagfájlt; ha a fájl azóta megváltozott,
+    újra megnyitja, és a korábbi változat leképezését megszünteti.
+
+    :param fajlnev: A csomagfájl neve.
+    :type fajlnev: str
+    :return: A megnyitott csomag, vagy None, ha a fájl nem létezik.
+    :rtype: Palyacsomag or None
+    """
+    try:
+        modositva = os.stat(fajlnev).st_mtime_ns
+    except OSError:
+        return None
+
+    tarolt = _megnyitott_csomagok.get(fajlnev)
+    if tarolt is not None and tarolt[0] == modositva:
+        return tarolt[1]
+
+    csomag = Palyacsomag(fajlnev)
+    _megnyitott_csomagok[fajlnev] = (modositva, csomag)
+    if tarolt is not None:
+        tarolt[1].bezaras()
+
+    return csomag
+
+
+def hivatkozas(palya_id: int, fajlnev: str = PALYACSOMAG_FAJL) -> str:
+    """
+    :param palya_id: A pálya azonosítója.
+    :param fajlnev: A csomagfájl neve.
+    :type palya_id: int
+    :type fajlnev: str
+    :return: A csomagbeli pályára mutató, a pályafájlnevek helyén használható hivatkozás (``csomag#id``).
+    :rtype: str
+    """
+    return f"{fajlnev}{HIVATKOZAS_JEL}{palya_id}"
+
+
+def hivatkozas_bontas(palya_fajlnev: str) -> tuple or None:
+    """
+    :param palya_fajlnev: Pályafájl neve vagy csomaghivatkozás.
+    :type palya_fajlnev: str
+    :return: Csomaghivatkozás esetén a (csomagfájl, pálya azonosító) pár, különben None.
+    :rtype: tuple or None
+    """
+    fajlnev, jel, azonosito = palya_fajlnev.rpartition(HIVATKOZAS_JEL)
+    if not jel or not azonosito.isdigit():
+        return None
+
+    return fajlnev, int(azonosito)
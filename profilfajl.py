@@ -0,0 +1,129 @@
+import os
+import struct
+import uuid
+
+# Profilfájl: fejléc (azonosító, verzió, gamertag hossza, pályák száma, összpontszám, összidő), a gamertag
+# UTF-8 bájtjai, majd pályánként egy (pálya azonosító, nehézségi sorszám, idő) bejegyzés.
+# Az összértékek a fejlécben vannak, így a dicsőséglistához elég a fejlécet beolvasni.
+PROFIL_AZONOSITO = b"LMPR"
+PROFIL_VERZIO = 1
+_FEJLEC = struct.Struct("<4sHHIIQ")
+_BEJEGYZES = struct.Struct("<IBI")
+
+PROFIL_KITERJESZTES = ".prf"
+
+
+def kodolas(gamertag: str, palyak: list, osszpontszam: int, osszido: int) -> bytes:
+    """
+    :param gamertag: A játékos felhasználóneve.
+    :param palyak: A teljesített pályák (pálya azonosító, nehézségi sorszám, idő) hármasai.
+    :param osszpontszam: A játékos összpontszáma.
+    :param osszido: A játékban eltöltött összes idő másodpercben.
+    :type gamertag: str
+    :type palyak: list[tuple[int, int, int]]
+    :type osszpontszam: int
+    :type osszido: int
+    :return: A profil bináris alakja.
+    :rtype: bytes
+    """
+    nev = gamertag.encode("Utf-8")
+    adat = bytearray(_FEJLEC.size + len(nev) + len(palyak) * _BEJEGYZES.size)
+    _FEJLEC.pack_into(adat, 0, PROFIL_AZONOSITO, PROFIL_VERZIO, len(nev), len(palyak), osszpontszam, osszido)
+    eltolas = _FEJLEC.size
+    adat[eltolas:eltolas + len(nev)] = nev
+    eltolas += len(nev)
+    for palya in palyak:
+        _BEJEGYZES.pack_into(adat, eltolas, *palya)
+        eltolas += _BEJEGYZES.size
+
+    return bytes(adat)
+
+
+def _fejlec(adat: bytes, fajlnev: str = "") -> tuple:
+    """
+    :param adat: A profil bináris alakja (legalább a fejléc és a gamertag).
+    :param fajlnev: A hibaüzenethez használt fájlnév.
+    :type adat: bytes
+    :type fajlnev: str
+    :return: A gamertag, a pályák száma, az összpontszám, az összidő és a bejegyzések kezdete.
+    :rtype: tuple
+    :raises ValueError: Ha az adat nem ismert verziójú profil.
+    """
+    if len(adat) < _FEJLEC.size:
+        raise ValueError(f"Csonka profilfájl: {fajlnev}")
+    azonosito, verzio, nev_hossz, darab, osszpontszam, osszido = _FEJLEC.unpack_from(adat, 0)
+    if azonosito != PROFIL_AZONOSITO or verzio != PROFIL_VERZIO:
+        raise ValueError(f"Ismeretlen profil formátum: {fajlnev}")
+    gamertag = bytes(adat[_FEJLEC.size:_FEJLEC.size + nev_hossz]).decode("Utf-8")
+
+    return gamertag, darab, osszpontszam, osszido, _FEJLEC.size + nev_hossz
+
+
+def dekodolas(adat: bytes, fajlnev: str = "") -> tuple:
+    """
+    :param adat: A profil bináris alakja.
+    :param fajlnev: A hibaüzenethez használt fájlnév.
+    :type adat: bytes
+    :type fajlnev: str
+    :return: A gamertag, a teljesített pályák (pálya azonosító, nehézségi sorszám, idő) hármasai,
+             az összpontszám és az összidő.
+    :rtype: tuple
+    :raises ValueError: Ha az adat nem ismert verziójú vagy csonka profil.
+    """
+    gamertag, darab, osszpontszam, osszido, eltolas = _fejlec(adat, fajlnev)
+    if len(adat) < eltolas + darab * _BEJEGYZES.size:
+        raise ValueError(f"Csonka profilfájl: {fajlnev}")
+    palyak = [_BEJEGYZES.unpack_from(adat, eltolas + index * _BEJEGYZES.size) for index in range(darab)]
+
+    return gamertag, palyak, osszpontszam, osszido
+
+
+def beolvasas(fajlnev: str) -> tuple:
+    """
+    :param fajlnev: A profilfájl neve.
+    :type fajlnev: str
+    :return: Lásd dekodolas.
+    :rtype: tuple
+    """
+    with open(fajlnev, 'rb') as f:
+        return dekodolas(f.read(), fajlnev)
+
+
+def osszesites(fajlnev: str) -> tuple:
+    """
+    Csak a profilfájl fejlécét olvassa be, a pályák bejegyzéseit nem.
+
+    :param fajlnev: A profilfájl neve.
+    :type fajlnev: str
+    :return: A gamertag, az összpontszám, a teljesített pályák száma és az összidő.
+    :rtype: tuple
+    """
+    with open(fajlnev, 'rb') as f:
+        fejlec = f.read(_FEJLEC.size)
+        nev_hossz = _FEJLEC.unpack_from(fejlec, 0)[2] if len(fejlec) == _FEJLEC.size else 0
+        gamertag, darab, osszpontszam, osszido, _ = _fejlec(fejlec + f.read(nev_hossz), fajlnev)
+
+    return gamertag, osszpontszam, darab, osszido
+
+
+def iras(fajlnev: str, adat: bytes) -> None:
+    """
+    Kiírja a profilt; egyedi nevű átmeneti fájlba ír, és csak utána cseréli le a régit, így egy
+    megszakadt vagy egyidejű mentés nem hagy sérült profilt.
+
+    :param fajlnev: A profilfájl neve.
+    :param adat: A profil bináris alakja.
+    :type fajlnev: str
+    :type adat: bytes
+    """
+    atmeneti = f"{fajlnev}.{uuid.uuid4().hex}.tmp"
+    try:
+        with open(atmeneti, 'xb') as f:
+            f.write(adat)
+        os.replace(atmeneti, fajlnev)
+    except BaseException:
+        try:
+            os.remove(atmeneti)
+        except OSError:
+            pass
+        raise
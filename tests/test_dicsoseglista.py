@@ -0,0 +1,103 @@
+import multiprocessing
+import random
+
+import dicsoseglista
+import logika
+
+
+def _referencia_rangsor(referencia: dict) -> list:
+    """
+    :param referencia: Gamertag -> (összpontszám, teljesített pályák száma, összidő).
+    :type referencia: dict
+    :return: A bejegyzések a Dicsoseglista sorrendjében, teljes rendezéssel előállítva.
+    :rtype: list[tuple[str, int, int, int]]
+    """
+    return sorted(((gamertag, *ertekek) for gamertag, ertekek in referencia.items()),
+                  key=lambda bejegyzes: (-logika.dicsosegpontok(*bejegyzes[1:]), bejegyzes[0]))
+
+
+def _veletlen_eredmeny(veletlen: random.Random, jatekosok: int) -> tuple:
+    """
+    :return: Egy véletlen játékos gamertagje és véletlen (összpontszám, teljesített, összidő) eredménye.
+    :rtype: tuple[str, tuple[int, int, int]]
+    """
+    gamertag = f"j{veletlen.randrange(jatekosok)}"
+    return gamertag, (veletlen.randrange(5000), veletlen.randrange(50), veletlen.randrange(3000))
+
+
+def test_veletlen_frissitesek_a_referenciaval_egyeznek():
+    veletlen = random.Random(22)
+    lista = dicsoseglista.Dicsoseglista()
+    referencia = {}
+
+    for lepes in range(30000):
+        gamertag, ertekek = _veletlen_eredmeny(veletlen, 2000)
+        lista.frissites(gamertag, *ertekek)
+        referencia[gamertag] = ertekek
+
+        if lepes % 3000 == 2999:
+            vart = _referencia_rangsor(referencia)
+            assert list(lista) == vart
+            for helyezes, bejegyzes in enumerate(vart, start=1):
+                assert lista.helyezes(bejegyzes[0]) == helyezes
+            assert [bejegyzes[1:] for bejegyzes in lista.oldal(3, 7)] == vart[14:21]
+            assert lista.reszlet(len(vart), 5) == [(len(vart), *vart[-1])]
+            assert [bejegyzes[1:] for bejegyzes in lista.kornyezet(vart[5][0], 2)] == vart[3:8]
+            assert [bejegyzes[1:] for bejegyzes in lista.kornyezet(vart[0][0], 2)] == vart[0:3]
+
+    assert lista.helyezes("nincs ilyen") is None
+    assert lista.reszlet(len(referencia) + 1, 3) == []
+    assert lista.elso(0) == []
+
+
+def test_naplo_kovetese_es_tomoritese(tmp_path):
+    naplo_fajl = str(tmp_path / "dicsoseglista.naplo")
+    veletlen = random.Random(21)
+    lista = dicsoseglista.Dicsoseglista(naplo_fajl)
+    referencia = {}
+    kovetok = []
+
+    for lepes in range(20000):
+        gamertag, ertekek = _veletlen_eredmeny(veletlen, 3000)
+        lista.frissites(gamertag, *ertekek)
+        referencia[gamertag] = ertekek
+        if lepes % 5000 == 0:
+            kovetok.append(dicsoseglista.betoltes(naplo_fajl))
+
+    # A napló közben többször is tömörült (lecserélődött), a követőknek ezt is észlelniük kell.
+    vart = _referencia_rangsor(referencia)
+    assert list(lista) == vart
+    for koveto in kovetok:
+        koveto.naplo_kovetes()
+        assert list(koveto) == vart
+    assert list(dicsoseglista.betoltes(naplo_fajl)) == vart
+
+    lista.tomorites()
+    kovetok[0].frissites("uj jatekos", 1, 1, 1)
+    referencia["uj jatekos"] = (1, 1, 1)
+    lista.naplo_kovetes()
+    assert list(lista) == _referencia_rangsor(referencia)
+
+
+def _iro_folyamat(naplo_fajl: str, folyamat: int) -> None:
+    lista = dicsoseglista.Dicsoseglista(naplo_fajl)
+    for lepes in range(400):
+        lista.frissites(f"f{folyamat}-{lepes % 100}", lepes, 1, 0)
+
+
+def test_parhuzamos_folyamatok_nem_veszitenek_bejegyzest(tmp_path):
+    naplo_fajl = str(tmp_path / "dicsoseglista.naplo")
+    dicsoseglista.felepites([], naplo_fajl)
+
+    folyamatok = [multiprocessing.Process(target=_iro_folyamat, args=(naplo_fajl, folyamat)) for folyamat in range(4)]
+    for folyamat in folyamatok:
+        folyamat.start()
+    for folyamat in folyamatok:
+        folyamat.join()
+    assert all(folyamat.exitcode == 0 for folyamat in folyamatok)
+
+    # Minden játékos utolsó eredménye megmaradt, pedig a folyamatok közben tömörítették is a naplót.
+    lista = dicsoseglista.betoltes(naplo_fajl)
+    vart = {f"f{folyamat}-{index}": (300 + index, 1, 0) for folyamat in range(4) for index in range(100)}
+    assert lista.bejegyzesek == vart
+    assert list(lista) == _referencia_rangsor(vart)
@@ -0,0 +1,163 @@
+import numpy as np
+
+import logika
+
+_FO_ATMENETEK = np.array(logika.FO_ATMENETEK, dtype=np.int8)
+_ATERESZTETT_ATMENETEK = np.array(logika.ATERESZTETT_ATMENETEK, dtype=np.int8)
+_SZOMSZEDOK = np.array(logika.SZOMSZEDOK, dtype=np.int16)
+_ALAPKODOK = np.array(logika.ALAPKODOK, dtype=np.int8)
+_MEZO_BITEK = np.left_shift(np.int64(1), np.arange(logika.TABLA_MERET * logika.TABLA_MERET, dtype=np.int64))
+
+
+def tablak_tombbe(tablak: list) -> np.ndarray:
+    """
+    Táblák listáját (N, 5, 5) alakú mezőkód tömbbé alakítja a tomeges_raketa_aktivalas számára.
+
+    :param tablak: A táblák listája.
+    :type tablak: list[logika.Tabla]
+    :return: A táblák mezőkódjai (lásd logika.tabla_kodolas).
+    :rtype: numpy.ndarray
+    :raises ValueError: Ha valamelyik tábla nem 5x5-ös.
+    """
+    meret = logika.TABLA_MERET
+    if any(tabla.meret != meret for tabla in tablak):
+        raise ValueError(f"A tömeges követés csak {meret}x{meret}-ös táblákhoz használható.")
+
+    tomb = np.array([logika.tabla_kodolas(tabla) for tabla in tablak], dtype=np.int8)
+
+    return tomb.reshape(len(tablak), meret, meret)
+
+
+def raketa_maszkok(tablak: np.ndarray) -> np.ndarray:
+    """
+    Táblánként visszaadja a rakéták mezőinek bitmaszkját (az ``x * 5 + y`` bit jelzi az (x, y) mezőt).
+
+    :param tablak: A táblák (N, 5, 5) alakú mezőkód tömbje.
+    :type tablak: numpy.ndarray
+    :return: A rakéták bitmaszkjai.
+    :rtype: numpy.ndarray
+    """
+    kodok = tablak.reshape(len(tablak), -1)
+
+    return np.where(kodok >= logika.RAKETA_KOD, _MEZO_BITEK, 0).sum(axis=1)
+
+
+def tomeges_raketa_aktivalas(tablak: np.ndarray, kezdo_pozicio = (1, 0), kezdo_irany = 1) -> np.ndarray:
+    """
+    Egyszerre követi a lézert N táblán, és táblánként visszaadja az aktivált rakéták bitmaszkját.
+    Minden lépésben az összes még futó tábla lézere egy mezőt halad. Az eredmény megegyezik azzal,
+    amit a lezer_utvonal és a raketa_aktivalas_deaktivallas egymás utáni hívása adna, a lépéskorlát
+    pedig a logika.kodolt_lezer_utvonal korlátjával azonos.
+
+    :param tablak: A táblák (N, 5, 5) alakú mezőkód tömbje (lásd logika.tabla_kodolas).
+    :param kezdo_pozicio: A kezdő pozíció (x, y koordináták) (alapértelmezett: (1, 0)).
+    :param kezdo_irany: A kezdő lézer iránya (0, 1, 2 vagy 3) (alapértelmezett: 1).
+    :type tablak: numpy.ndarray
+    :type kezdo_pozicio: tuple
+    :type kezdo_irany: int
+    :return: Az aktivált rakéták bitmaszkjai (az ``x * 5 + y`` bit jelzi az (x, y) mezőt).
+    :rtype: numpy.ndarray
+    :raises ValueError: Ha a táblák nem 5x5-ösek.
+    """
+    meret = logika.TABLA_MERET
+    if tablak.shape[1:] != (meret, meret):
+        raise ValueError(f"A tömeges követés csak {meret}x{meret}-ös táblákhoz használható.")
+
+    darab = len(tablak)
+    kodok = tablak.reshape(darab, -1).astype(np.intp)
+    lepes_korlat = kodok.shape[1] * 4
+
+    x, y = kezdo_pozicio
+    kezdo_mezo = x * meret + y if 0 <= x < meret and 0 <= y < meret else -1
+
+    mezo = np.full(darab, kezdo_mezo, dtype=np.intp)
+    irany = np.full(darab, kezdo_irany, dtype=np.intp)
+    ateresztett = np.zeros(darab, dtype=bool)      # Az aktuális lézer áteresztett-e
+    fo_mezo = np.full(darab, -1, dtype=np.intp)    # A fő lézer folytatása áteresztett lézer közben
+    fo_irany = np.zeros(darab, dtype=np.intp)
+    fo_lepesek = np.zeros(darab, dtype=np.intp)
+    ateresztett_lepesek = np.zeros(darab, dtype=np.intp)
+    aktivalt = np.zeros(darab, dtype=np.int64)
+
+    while True:
+        futo = np.flatnonzero(mezo >= 0)
+        if futo.size == 0:
+            break
+
+        m = mezo[futo]
+        d = irany[futo]
+        k = kodok[futo, m]
+        bit = _MEZO_BITEK[m]
+        raketa_jo_iranybol = (k >= logika.RAKETA_KOD) & ((d + 2) % 4 == k - logika.RAKETA_KOD)
+
+        # Fő lézer
+        fo = ~ateresztett[futo]
+        fo_idx = futo[fo]
+        fo_lepesek[fo_idx] += 1
+        fo_k, fo_d, fo_m = k[fo], d[fo], m[fo]
+        uj_irany = _FO_ATMENETEK[fo_k * 4 + fo_d].astype(np.intp)
+
+        megall = uj_irany < 0
+        talalat = megall & raketa_jo_iranybol[fo] & (fo_lepesek[fo_idx] > 1)
+        aktivalt[fo_idx[talalat]] |= bit[fo][talalat]
+
+        halad = ~megall
+        kovetkezo = np.where(halad, _SZOMSZEDOK[fo_m * 4 + np.maximum(uj_irany, 0)], -1)
+        tul_hosszu = fo_lepesek[fo_idx] >= lepes_korlat
+        kovetkezo[tul_hosszu] = -1
+
+        oszto = halad & (_ALAPKODOK[fo_k] == logika.ATERESZTO_KOD)
+        oszto_idx = fo_idx[oszto]
+        fo_mezo[oszto_idx] = kovetkezo[oszto]
+        fo_irany[oszto_idx] = uj_irany[oszto]
+        ateresztett[oszto_idx] = True
+        ateresztett_lepesek[oszto_idx] = 0
+        # Az áteresztett lézer az ÁteresztőTükör mezőjéből indul az eredeti irányban.
+        mezo[oszto_idx] = fo_m[oszto]
+        irany[oszto_idx] = fo_d[oszto]
+
+        tovabb = ~oszto
+        mezo[fo_idx[tovabb]] = kovetkezo[tovabb]
+        irany[fo_idx[tovabb]] = uj_irany[tovabb]
+
+        # Áteresztett lézer
+        at = ~fo
+        at_idx = futo[at]
+        ateresztett_lepesek[at_idx] += 1
+        at_k, at_d, at_m, at_bit = k[at], d[at], m[at], bit[at]
+        uj_irany = _ATERESZTETT_ATMENETEK[at_k * 4 + at_d].astype(np.intp)
+
+        megall = uj_irany < 0
+        talalat = megall & raketa_jo_iranybol[at]
+        aktivalt[at_idx[talalat]] |= at_bit[talalat]
+
+        kovetkezo = np.where(megall, -1, _SZOMSZEDOK[at_m * 4 + np.maximum(uj_irany, 0)])
+        vege = (kovetkezo < 0) | (ateresztett_lepesek[at_idx] >= lepes_korlat)
+
+        folytat = ~vege
+        mezo[at_idx[folytat]] = kovetkezo[folytat]
+        irany[at_idx[folytat]] = uj_irany[folytat]
+
+        # A véget ért áteresztett lézer után a fő lézer folytatódik.
+        vissza_idx = at_idx[vege]
+        mezo[vissza_idx] = fo_mezo[vissza_idx]
+        irany[vissza_idx] = fo_irany[vissza_idx]
+        ateresztett[vissza_idx] = False
+
+    return aktivalt
+
+
+def tomeges_megoldott(tablak: np.ndarray, kezdo_pozicio = (1, 0), kezdo_irany = 1) -> np.ndarray:
+    """
+    Táblánként megadja, hogy a lézer minden rakétát aktivál-e.
+
+    :param tablak: A táblák (N, 5, 5) alakú mezőkód tömbje.
+    :param kezdo_pozicio: A kezdő pozíció (x, y koordináták) (alapértelmezett: (1, 0)).
+    :param kezdo_irany: A kezdő lézer iránya (0, 1, 2 vagy 3) (alapértelmezett: 1).
+    :type tablak: numpy.ndarray
+    :type kezdo_pozicio: tuple
+    :type kezdo_irany: int
+    :return: Logikai tömb, True ott, ahol minden rakéta aktiválva van.
+    :rtype: numpy.ndarray
+    """
+    return tomeges_raketa_aktivalas(tablak, kezdo_pozicio, kezdo_irany) == raketa_maszkok(tablak)